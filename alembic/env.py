@@ -3,8 +3,12 @@ from logging.config import fileConfig
 from sqlalchemy import pool
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from alembic import context
-from models import Base  # Adjust import based on where your Base model is defined
-from core.config import DATABASE_URL  # Import your database URL from config
+from core.database import Base, to_async_url
+from core.config import settings
+# Import the models so their tables are registered on Base.metadata
+import models.user  # noqa: F401
+import models.refresh_token  # noqa: F401
+import models.token_revocation  # noqa: F401
 
 # This is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -18,9 +22,9 @@ if config.config_file_name is not None:
 # Target metadata will be the base metadata from SQLAlchemy
 target_metadata = Base.metadata
 
-# This is used to configure the database URL (from alembic.ini or directly from config)
+# This is used to configure the database URL (from the environment, falling back to alembic.ini)
 def get_database_url():
-    return config.get_main_option("sqlalchemy.url") or DATABASE_URL
+    return to_async_url(settings.DATABASE_URL or config.get_main_option("sqlalchemy.url"))
 
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
@@ -39,21 +43,25 @@ def run_migrations_offline() -> None:
         context.run_migrations()
 
 
+def do_run_migrations(connection) -> None:
+    context.configure(connection=connection, target_metadata=target_metadata)
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
 async def run_migrations_online() -> None:
     """Run migrations in 'online' mode.
     In this mode, we create an Engine and associate a connection with the context.
     """
     # Create an async engine
-    connectable = create_async_engine(get_database_url(), echo=True)
+    connectable = create_async_engine(get_database_url(), poolclass=pool.NullPool)
 
     async with connectable.connect() as connection:
-        # We need to use the connection for async migrations
-        context.configure(
-            connection=connection, target_metadata=target_metadata
-        )
+        # Alembic itself is synchronous; run it on the connection's sync facade
+        await connection.run_sync(do_run_migrations)
 
-        async with connection.begin():
-            await context.run_migrations()
+    await connectable.dispose()
 
 
 def run_migrations():
@@ -0,0 +1,41 @@
+"""tenant-scoped indexes on users
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTIVE = sa.text('is_active IS true')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction; building the
+    # indexes this way does not block writes to users on a live database
+    with op.get_context().autocommit_block():
+        op.create_index('ix_users_tenant_id_email', 'users', ['tenant_id', 'email'], postgresql_concurrently=True)
+        op.create_index('ix_users_tenant_id_role', 'users', ['tenant_id', 'role'], postgresql_concurrently=True)
+        op.create_index(
+            'ix_users_tenant_id_active', 'users', ['tenant_id', 'id'],
+            postgresql_where=ACTIVE, sqlite_where=sa.text('is_active IS 1'), postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_users_tenant_id_active', table_name='users', postgresql_concurrently=True)
+        op.drop_index('ix_users_tenant_id_role', table_name='users', postgresql_concurrently=True)
+        op.drop_index('ix_users_tenant_id_email', table_name='users', postgresql_concurrently=True)
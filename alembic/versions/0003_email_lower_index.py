@@ -0,0 +1,57 @@
+"""case-insensitive unique index on users.email
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Dict, List, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _case_duplicates(bind) -> List[List[str]]:
+    """Groups of existing emails that only differ in case or surrounding whitespace."""
+    rows = bind.execute(sa.text(
+        "SELECT email, lower(trim(email)) AS normalized FROM users WHERE lower(trim(email)) IN ("
+        "  SELECT lower(trim(email)) FROM users GROUP BY lower(trim(email)) HAVING count(*) > 1"
+        ") ORDER BY normalized, email"
+    ))
+    groups: Dict[str, List[str]] = {}
+    for email, normalized in rows:
+        groups.setdefault(normalized, []).append(email)
+    return list(groups.values())
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Both the normalizing UPDATE and the new index would fail on these
+    # with a bare unique violation; name them so they can be merged first
+    duplicates = _case_duplicates(op.get_bind())
+    if duplicates:
+        listing = "\n".join("  " + ", ".join(repr(email) for email in group) for group in duplicates)
+        raise RuntimeError(
+            f"{len(duplicates)} email address(es) are registered more than once when case and "
+            f"surrounding whitespace are ignored; merge or rename these accounts and rerun:\n{listing}"
+        )
+    # Store existing emails in the canonical form signup now uses
+    op.execute("UPDATE users SET email = lower(trim(email)) WHERE email <> lower(trim(email))")
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'uq_users_email_lower', 'users', [sa.text('lower(email)')],
+            unique=True, postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('uq_users_email_lower', table_name='users', postgresql_concurrently=True)
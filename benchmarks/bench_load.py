@@ -0,0 +1,278 @@
+# benchmarks/bench_load.py
+"""
+Load-test the auth and user endpoints in-process through httpx's ASGI transport.
+
+Seeds a scratch database with users, runs the app's lifespan, then drives
+each scenario with concurrent clients and reports RPS and latency
+percentiles. Run from the project root:
+
+    python -m benchmarks.bench_load [--users-per-tenant 200] [--duration 10]
+    python -m benchmarks.bench_load --output run.json --baseline baseline.json
+
+A --database-url that already holds users is refused unless --reset is
+given, which drops all of its tables first.
+
+The client runs on the same event loop as the app, so absolute numbers
+include client overhead; compare runs on the same machine. With
+--baseline the exit status is 1 when any scenario regressed by more than
+--tolerance.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+SCENARIOS = ("login", "token", "me", "admin")
+PASSWORD = "benchmark-password"
+
+
+def configure_environment(database_url: str) -> None:
+    # Settings are read at import time, so this must run before the app is imported
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+    os.environ.setdefault("ALGORITHM", "HS256")
+    os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+    # Every request comes from one client address; the throttle would
+    # turn the login scenarios into a 429 benchmark
+    os.environ["LOGIN_RATE_LIMIT_ENABLED"] = "false"
+
+
+def seed(
+    tenants: int, users_per_tenant: int, random_seed: int = 0, reset: bool = False
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Create the schema and users; returns customers and tenant admins.
+
+    Customers are spread uniformly over the tenants and all active. Every
+    user shares one password hash, computed once, so seeding stays fast
+    while logins still verify a full-cost bcrypt hash.
+
+    Existing tables are dropped only with ``reset``; otherwise a database
+    that already holds users is refused rather than added to.
+    """
+    from sqlalchemy import func, inspect, select
+
+    from benchmarks.dataset import generate_users, load_users, password_hashes
+    from core.database import Base, engine
+    import models.refresh_token  # noqa: F401
+    import models.token_revocation  # noqa: F401
+    from models.user import User
+
+    if reset:
+        Base.metadata.drop_all(bind=engine)
+    elif inspect(engine).has_table(User.__tablename__):
+        with engine.connect() as conn:
+            if conn.scalar(select(func.count()).select_from(User)):
+                raise SystemExit(
+                    f"{engine.url.render_as_string(hide_password=True)} already holds users; "
+                    "pass --reset to drop its tables and reseed"
+                )
+    Base.metadata.create_all(bind=engine)
+    rows = generate_users(
+        tenants * users_per_tenant, tenants, password_hashes(PASSWORD, 1), skew=0, inactive_ratio=0, seed=random_seed
+    )
+    load_users(engine, rows)
+    with engine.connect() as conn:
+        users = [dict(r._mapping) for r in conn.execute(select(User.id, User.email, User.role, User.tenant_id))]
+    return {
+        "customer": [u for u in users if u["role"] == "customer"],
+        "tenant_admin": [u for u in users if u["role"] == "tenant_admin"],
+    }
+
+
+def bearer(user: Dict[str, Any]) -> Dict[str, str]:
+    from core.security import create_access_token
+
+    token = create_access_token({"sub": str(user["id"]), "role": user["role"], "tenant_id": user["tenant_id"]})
+    return {"Authorization": f"Bearer {token}"}
+
+
+def request_factories(users: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Callable]:
+    """Scenario name -> function returning (method, url, request kwargs)."""
+    customers = users["customer"]
+    customer_headers = [bearer(u) for u in customers]
+    admin_headers = [bearer(u) for u in users["tenant_admin"]]
+    return {
+        "login": lambda: ("POST", "/auth/login", {
+            "json": {"email": random.choice(customers)["email"], "password": PASSWORD},
+        }),
+        "token": lambda: ("POST", "/auth/token", {
+            "data": {"username": random.choice(customers)["email"], "password": PASSWORD},
+        }),
+        "me": lambda: ("GET", "/api/v1/users/me", {"headers": random.choice(customer_headers)}),
+        "admin": lambda: ("GET", "/api/v1/users/admin", {"headers": random.choice(admin_headers)}),
+    }
+
+
+def percentile(ordered: List[float], q: float) -> float:
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def run_scenario(client, make_request: Callable, concurrency: int, duration: float, warmup: float) -> Dict[str, Any]:
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    recording = False
+
+    async def worker(deadline: float) -> None:
+        while time.perf_counter() < deadline:
+            method, url, kwargs = make_request()
+            started = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            elapsed = time.perf_counter() - started
+            if recording:
+                latencies.append(elapsed)
+                statuses[response.status_code] += 1
+
+    if warmup > 0:
+        await asyncio.gather(*(worker(time.perf_counter() + warmup) for _ in range(concurrency)))
+    recording = True
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(started + duration) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    total = len(latencies)
+    return {
+        "requests": total,
+        "errors": sum(n for status, n in statuses.items() if status >= 400),
+        "status_counts": {str(status): n for status, n in sorted(statuses.items())},
+        "rps": total / elapsed if elapsed else 0.0,
+        "mean_ms": sum(latencies) / total * 1000 if total else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": latencies[-1] * 1000 if latencies else 0.0,
+    }
+
+
+async def run(args: argparse.Namespace, users: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+    import httpx
+
+    from main import app
+
+    factories = request_factories(users)
+    results = {}
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for name in args.scenarios:
+                results[name] = await run_scenario(
+                    client, factories[name], args.concurrency, args.duration, args.warmup
+                )
+                print_row(name, results[name])
+    return results
+
+
+def print_row(name: str, result: Dict[str, Any]) -> None:
+    print(
+        f"{name:<8}{result['requests']:>9}{result['errors']:>8}{result['rps']:>10,.0f}"
+        f"{result['p50_ms']:>9.1f}{result['p95_ms']:>9.1f}{result['p99_ms']:>9.1f}"
+    )
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], tolerance: float) -> bool:
+    """Print changes against ``baseline``; returns whether anything regressed."""
+    regressed = False
+    print()
+    print(f"{'scenario':<10}{'rps':>18}{'p95 ms':>20}")
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]
+        rps_change = result["rps"] / before["rps"] - 1 if before["rps"] else 0.0
+        p95_change = result["p95_ms"] / before["p95_ms"] - 1 if before["p95_ms"] else 0.0
+        bad = rps_change < -tolerance or p95_change > tolerance
+        regressed |= bad
+        print(
+            f"{name:<10}{before['rps']:>8,.0f} {rps_change:>+8.1%}"
+            f"{before['p95_ms']:>10.1f} {p95_change:>+8.1%}{'  REGRESSION' if bad else ''}"
+        )
+    return regressed
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database-url", help="database to seed and test against (default: scratch SQLite file)")
+    parser.add_argument("--reset", action="store_true",
+                        help="drop all tables in --database-url before seeding (needed if it holds users)")
+    parser.add_argument("--tenants", type=int, default=5)
+    parser.add_argument("--users-per-tenant", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32, help="concurrent clients per scenario")
+    parser.add_argument("--duration", type=float, default=10.0, help="measured seconds per scenario")
+    parser.add_argument("--warmup", type=float, default=1.0, help="unmeasured seconds before each scenario")
+    parser.add_argument("--scenarios", type=lambda s: s.split(","), default=list(SCENARIOS),
+                        help=f"comma-separated subset of {','.join(SCENARIOS)}")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for the dataset and user selection")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON from an earlier --output run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="allowed RPS drop / p95 increase before a scenario counts as regressed")
+    args = parser.parse_args()
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    scratch = None
+    if args.database_url is None:
+        scratch = tempfile.TemporaryDirectory()
+        args.database_url = f"sqlite:///{scratch.name}/bench.db"
+    configure_environment(args.database_url)
+    random.seed(args.seed)
+
+    users = seed(args.tenants, args.users_per_tenant, args.seed, reset=args.reset)
+    print(f"{'scenario':<8}{'requests':>9}{'errors':>8}{'rps':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    results = asyncio.run(run(args, users))
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "database": args.database_url.split(":", 1)[0],
+            "tenants": args.tenants,
+            "users_per_tenant": args.users_per_tenant,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+
+    regressed = False
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressed = compare(results, json.load(f)["results"], args.tolerance)
+
+    if scratch is not None:
+        scratch.cleanup()
+    sys.exit(1 if regressed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+# benchmarks/bench_security.py
+"""
+Microbenchmark the core/security primitives and the role check.
+
+Reports ops/s plus, from tracemalloc, the peak memory a call allocates
+and the memory blocks it leaves behind (growing caches or leaks). With
+--sweep it also times bcrypt verify at each cost factor and recommends
+the highest BCRYPT_ROUNDS that stays under --target-ms. Run it on the
+production CPU, from the project root:
+
+    python -m benchmarks.bench_security [--number 5000] [--sweep --target-ms 250]
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+import timeit
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+
+def configure_environment() -> None:
+    # Settings are read at import time; the role checker pulls in the
+    # database module, which needs some URL to build its engines from
+    os.environ.setdefault("DATABASE_URL", "sqlite://")
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+    os.environ.setdefault("ALGORITHM", "HS256")
+    os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+
+
+def ops_per_second(fn: Callable[[], Any], number: int) -> float:
+    seconds = min(timeit.repeat(fn, number=number, repeat=3))
+    return number / seconds
+
+
+def allocations(fn: Callable[[], Any], number: int) -> Dict[str, float]:
+    """Peak bytes allocated during one call and blocks retained per call."""
+    fn()  # first-call caches are not per-call cost
+    tracemalloc.start()
+    try:
+        baseline, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+        before = tracemalloc.take_snapshot()
+        for _ in range(number):
+            fn()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    retained = sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+    return {"peak_bytes": peak - baseline, "retained_blocks_per_call": retained / number}
+
+
+def cases(number: int) -> List[Dict[str, Any]]:
+    from fastapi import HTTPException
+
+    from core.deps import RoleChecker
+    from core.principal import Principal
+    from core.security import (
+        create_access_token, decode_token, get_password_hash, token_cache, verify_password,
+    )
+
+    claims = {"sub": "123456", "role": "customer", "tenant_id": 42}
+    token = create_access_token(claims)
+    hashed = get_password_hash("benchmark-password")
+    principal = Principal(id=123456, role="customer", tenant_id=42)
+    allow_customer = RoleChecker(["customer"])
+    allow_admin = RoleChecker(["tenant_admin", "platform_admin"])
+
+    def decode_uncached():
+        token_cache.clear()
+        decode_token(token)
+
+    def role_denied():
+        try:
+            allow_admin(principal)
+        except HTTPException:
+            pass
+
+    # bcrypt runs take a quarter second each; far fewer of them
+    slow = max(1, number // 1000)
+    return [
+        {"name": "get_password_hash", "fn": lambda: get_password_hash("benchmark-password"), "number": slow},
+        {"name": "verify_password", "fn": lambda: verify_password("benchmark-password", hashed), "number": slow},
+        {"name": "create_access_token", "fn": lambda: create_access_token(claims), "number": number},
+        {"name": "decode_token (cached)", "fn": lambda: decode_token(token), "number": number},
+        {"name": "decode_token (uncached)", "fn": decode_uncached, "number": number},
+        {"name": "RoleChecker (allowed)", "fn": lambda: allow_customer(principal), "number": number},
+        {"name": "RoleChecker (denied)", "fn": role_denied, "number": number},
+    ]
+
+
+def run_cases(number: int) -> Dict[str, Dict[str, float]]:
+    results = {}
+    print(f"{'operation':<26}{'ops/s':>14}{'peak bytes':>12}{'retained/call':>15}")
+    for case in cases(number):
+        fn, n = case["fn"], case["number"]
+        result = {"ops_per_second": ops_per_second(fn, n), **allocations(fn, min(n, 1000))}
+        results[case["name"]] = result
+        print(
+            f"{case['name']:<26}{result['ops_per_second']:>14,.1f}"
+            f"{result['peak_bytes']:>12,}{result['retained_blocks_per_call']:>15.2f}"
+        )
+    return results
+
+
+def sweep(min_rounds: int, max_rounds: int, target_ms: float, samples: int) -> Dict[str, Any]:
+    """Median verify latency per bcrypt cost, and the costliest one within target."""
+    from passlib.context import CryptContext
+
+    from core.config import settings
+
+    latencies = {}
+    print()
+    print(f"{'rounds':<8}{'verify ms':>10}")
+    for rounds in range(min_rounds, max_rounds + 1):
+        context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=rounds)
+        hashed = context.hash("benchmark-password")
+        timings = []
+        for _ in range(samples):
+            started = time.perf_counter()
+            context.verify("benchmark-password", hashed)
+            timings.append((time.perf_counter() - started) * 1000)
+        latencies[rounds] = statistics.median(timings)
+        marker = "  (current)" if rounds == settings.BCRYPT_ROUNDS else ""
+        print(f"{rounds:<8}{latencies[rounds]:>10.1f}{marker}")
+        # Each extra round doubles the cost; no point timing past the target
+        if latencies[rounds] > target_ms * 2:
+            break
+
+    within = [r for r, ms in latencies.items() if ms <= target_ms]
+    recommended = max(within) if within else None
+    if recommended is None:
+        print(f"\nNo cost factor verifies within {target_ms:g} ms on this CPU")
+    else:
+        print(f"\nBCRYPT_ROUNDS={recommended} verifies in {latencies[recommended]:.1f} ms (target {target_ms:g} ms)")
+    return {"target_ms": target_ms, "verify_ms": latencies, "recommended_rounds": recommended}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--number", type=int, default=5000, help="calls per timing run for fast operations")
+    parser.add_argument("--sweep", action="store_true", help="time bcrypt verify across cost factors")
+    parser.add_argument("--min-rounds", type=int, default=8)
+    parser.add_argument("--max-rounds", type=int, default=15)
+    parser.add_argument("--target-ms", type=float, default=250.0, help="verify latency budget for the sweep")
+    parser.add_argument("--samples", type=int, default=5, help="verify calls per cost factor")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    configure_environment()
+    report: Dict[str, Any] = {"operations": run_cases(args.number)}
+    if args.sweep:
+        report["bcrypt_sweep"] = sweep(args.min_rounds, args.max_rounds, args.target_ms, args.samples)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
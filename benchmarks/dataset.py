@@ -0,0 +1,222 @@
+# benchmarks/dataset.py
+"""
+Generate a deterministic multi-tenant user dataset for capacity testing.
+
+Tenant sizes follow a Zipf-like distribution (--skew; 0 is uniform), so a
+few tenants hold most users as in production. Every tenant gets one
+tenant admin. Passwords use a handful of bcrypt hashes computed up front
+instead of one per row; every user's password is --password. Rows are
+loaded with COPY on PostgreSQL and batched executemany on SQLite. Run
+from the project root:
+
+    python -m benchmarks.dataset --database-url postgresql://... --users 10000000 --tenants 5000 \\
+        --create-schema --truncate --defer-indexes
+
+The same --seed always produces the same rows, apart from the bcrypt salts.
+Only users exist in the schema today; products and orders can be added as
+further generators.
+"""
+import argparse
+import csv
+import io
+import itertools
+import os
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# email, phone_number, password, tenant_id, role, is_active, created_at
+UserRow = Tuple[str, Optional[str], str, int, str, bool, datetime]
+USER_COLUMNS = ("email", "phone_number", "password", "tenant_id", "role", "is_active", "created_at")
+
+# Rows drawn per call to random.choices when assigning tenants
+_CHUNK = 10000
+_EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+_YEAR_SECONDS = 365 * 24 * 3600
+
+
+def configure_environment(database_url: str) -> None:
+    # Settings are read at import time, so this must run before core is imported
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+    os.environ.setdefault("ALGORITHM", "HS256")
+    os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+
+
+def password_hashes(password: str, variants: int) -> List[str]:
+    """``variants`` bcrypt hashes of ``password``, each with its own salt."""
+    from core.security import get_password_hash
+
+    return [get_password_hash(password) for _ in range(variants)]
+
+
+def generate_users(
+    users: int,
+    tenants: int,
+    hashes: Sequence[str],
+    skew: float = 1.1,
+    inactive_ratio: float = 0.05,
+    seed: int = 42,
+) -> Iterator[UserRow]:
+    """
+    Yield one tenant admin per tenant, then ``users`` customers.
+
+    Tenant ``t`` receives customers in proportion to ``1 / t ** skew``.
+    """
+    rng = random.Random(seed)
+
+    def created_at() -> datetime:
+        return _EPOCH + timedelta(seconds=rng.randrange(_YEAR_SECONDS))
+
+    for tenant in range(1, tenants + 1):
+        yield (f"admin@t{tenant}.example", None, hashes[0], tenant, "tenant_admin", True, created_at())
+
+    tenant_ids = range(1, tenants + 1)
+    cum_weights = list(itertools.accumulate(1 / t ** skew for t in tenant_ids))
+    for start in range(0, users, _CHUNK):
+        chosen = rng.choices(tenant_ids, cum_weights=cum_weights, k=min(_CHUNK, users - start))
+        for i, tenant in enumerate(chosen, start):
+            phone = f"+1555{i:07d}" if rng.random() < 0.6 else None
+            yield (
+                f"user{i}@t{tenant}.example",
+                phone,
+                hashes[i % len(hashes)],
+                tenant,
+                "customer",
+                rng.random() >= inactive_ratio,
+                created_at(),
+            )
+
+
+def batches(rows: Iterable[UserRow], size: int) -> Iterator[List[UserRow]]:
+    iterator = iter(rows)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _copy_postgres(raw_connection, batch: List[UserRow]) -> None:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for email, phone, password, tenant_id, role, active, created in batch:
+        writer.writerow((email, phone, password, tenant_id, role, "t" if active else "f", created.isoformat()))
+    buffer.seek(0)
+    with raw_connection.cursor() as cursor:
+        # Unquoted empty fields are NULL in CSV COPY
+        cursor.copy_expert(f"COPY users ({', '.join(USER_COLUMNS)}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+
+def _insert_sqlite(raw_connection, batch: List[UserRow]) -> None:
+    raw_connection.executemany(
+        f"INSERT INTO users ({', '.join(USER_COLUMNS)}) VALUES ({', '.join('?' * len(USER_COLUMNS))})",
+        [
+            (email, phone, password, tenant_id, role, int(active), created.strftime("%Y-%m-%d %H:%M:%S.%f"))
+            for email, phone, password, tenant_id, role, active, created in batch
+        ],
+    )
+
+
+def load_users(
+    engine,
+    rows: Iterable[UserRow],
+    batch_size: int = 50000,
+    progress: Optional[Callable[[int], None]] = None,
+) -> int:
+    """
+    Load rows into users, committing once per batch.
+
+    Returns:
+        The number of rows loaded
+    """
+    dialect = engine.dialect.name
+    if dialect == "postgresql":
+        load_batch = _copy_postgres
+    elif dialect == "sqlite":
+        load_batch = _insert_sqlite
+    else:
+        raise ValueError(f"Unsupported database for loading: {dialect}")
+
+    loaded = 0
+    raw_connection = engine.raw_connection()
+    try:
+        if dialect == "sqlite":
+            # Scratch data: trade durability for load speed on this connection
+            raw_connection.execute("PRAGMA synchronous = OFF")
+        for batch in batches(rows, batch_size):
+            load_batch(raw_connection, batch)
+            raw_connection.commit()
+            loaded += len(batch)
+            if progress is not None:
+                progress(loaded)
+    finally:
+        raw_connection.close()
+    return loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database-url", required=True)
+    parser.add_argument("--users", type=int, default=1000000, help="customers to create (plus one admin per tenant)")
+    parser.add_argument("--tenants", type=int, default=1000)
+    parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent for tenant sizes; 0 = uniform")
+    parser.add_argument("--inactive-ratio", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--password", default="benchmark-password")
+    parser.add_argument("--hash-variants", type=int, default=8, help="distinct precomputed bcrypt hashes")
+    parser.add_argument("--batch-size", type=int, default=50000)
+    parser.add_argument("--create-schema", action="store_true", help="create missing tables first")
+    parser.add_argument("--truncate", action="store_true", help="delete existing users first")
+    parser.add_argument("--defer-indexes", action="store_true",
+                        help="drop the users indexes during the load and rebuild them afterwards")
+    args = parser.parse_args()
+
+    configure_environment(args.database_url)
+    from sqlalchemy import text
+
+    from core.database import Base, engine
+    import models.refresh_token  # noqa: F401
+    import models.token_revocation  # noqa: F401
+    from models.user import User
+
+    if args.create_schema:
+        Base.metadata.create_all(bind=engine)
+    if args.truncate:
+        with engine.begin() as conn:
+            if engine.dialect.name == "postgresql":
+                conn.execute(text("TRUNCATE users RESTART IDENTITY CASCADE"))
+            else:
+                conn.execute(text("DELETE FROM users"))
+    indexes = list(User.__table__.indexes) if args.defer_indexes else []
+    with engine.begin() as conn:
+        for index in indexes:
+            # Index.drop(checkfirst=True) can't see expression indexes
+            conn.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+
+    hashes = password_hashes(args.password, args.hash_variants)
+    total = args.users + args.tenants
+    started = time.perf_counter()
+
+    def progress(loaded: int) -> None:
+        elapsed = time.perf_counter() - started
+        print(f"\r{loaded:,}/{total:,} rows  {loaded / elapsed:,.0f} rows/s", end="", flush=True)
+
+    rows = generate_users(args.users, args.tenants, hashes, args.skew, args.inactive_ratio, args.seed)
+    loaded = load_users(engine, rows, args.batch_size, progress)
+    print(f"\nloaded {loaded:,} rows in {time.perf_counter() - started:.1f}s")
+
+    if indexes:
+        step = time.perf_counter()
+        with engine.begin() as conn:
+            for index in indexes:
+                index.create(conn)
+        print(f"rebuilt {len(indexes)} indexes in {time.perf_counter() - step:.1f}s")
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as conn:
+            conn.execute(text("ANALYZE users"))
+
+
+if __name__ == "__main__":
+    main()
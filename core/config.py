@@ -11,4 +11,134 @@ class Settings:
     ALGORITHM = os.getenv("ALGORITHM")
     ACCESS_TOKEN_EXPIRE_MINUTES = os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES")
 
+    # Refresh tokens; hashed with REFRESH_TOKEN_SECRET (defaults to SECRET_KEY)
+    REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "30"))
+    REFRESH_TOKEN_SECRET = os.getenv("REFRESH_TOKEN_SECRET") or SECRET_KEY
+    # Expired refresh tokens are deleted this long after expiry, so reuse of
+    # a recently expired token is still detected; 0 interval disables the purge
+    REFRESH_TOKEN_PURGE_GRACE_DAYS = int(os.getenv("REFRESH_TOKEN_PURGE_GRACE_DAYS", "7"))
+    REFRESH_TOKEN_PURGE_INTERVAL_SECONDS = float(os.getenv("REFRESH_TOKEN_PURGE_INTERVAL_SECONDS", "3600"))
+
+    # How often each worker polls token_revocations for access tokens
+    # revoked by other workers; 0 disables loading and polling
+    TOKEN_REVOCATION_POLL_SECONDS = float(os.getenv("TOKEN_REVOCATION_POLL_SECONDS", "1"))
+
+    # Asymmetric signing (RS*/ES* ALGORITHM): <kid>.pem keys and the signing kid
+    JWT_SIGNING_KEYS_DIR = os.getenv("JWT_SIGNING_KEYS_DIR")
+    JWT_ACTIVE_KID = os.getenv("JWT_ACTIVE_KID")
+    JWKS_CACHE_MAX_AGE = int(os.getenv("JWKS_CACHE_MAX_AGE", "3600"))
+
+    # Mint access tokens with short claim names and no email
+    JWT_COMPACT_CLAIMS = os.getenv("JWT_COMPACT_CLAIMS", "false").lower() in ("1", "true", "yes")
+
+    # Build the current user from verified token claims, skipping the DB
+    AUTH_CLAIMS_ONLY = os.getenv("AUTH_CLAIMS_ONLY", "false").lower() in ("1", "true", "yes")
+
+    # Principal cache in front of the user-by-id lookup
+    USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "30"))
+    USER_CACHE_MAX_SIZE = int(os.getenv("USER_CACHE_MAX_SIZE", "10000"))
+
+    # Verified-token cache in front of jwt.decode
+    TOKEN_CACHE_TTL_SECONDS = float(os.getenv("TOKEN_CACHE_TTL_SECONDS", "900"))
+    TOKEN_CACHE_MAX_SIZE = int(os.getenv("TOKEN_CACHE_MAX_SIZE", "20000"))
+
+    # Connection pool sizing, applied per engine in every worker process
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    DB_POOL_USE_LIFO = os.getenv("DB_POOL_USE_LIFO", "true").lower() in ("1", "true", "yes")
+    # "idle": ping connections idle longer than DB_POOL_LIVENESS_INTERVAL
+    # seconds on checkout; "checkout": ping on every checkout; "off"
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "idle").lower()
+    DB_POOL_LIVENESS_INTERVAL = float(os.getenv("DB_POOL_LIVENESS_INTERVAL", "30"))
+    # Worker processes per host, used to budget connections against max_connections
+    WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+    # Postgres connections this host may open in total (0 = no limit); caps
+    # the worker count server.py picks automatically
+    DB_MAX_CONNECTIONS = int(os.getenv("DB_MAX_CONNECTIONS", "0"))
+
+    # server.py: recycle a worker after about WEB_MAX_REQUESTS requests (0 =
+    # never), plus up to WEB_MAX_REQUESTS_JITTER more so workers restart at
+    # different times; SIGTERM waits WEB_GRACEFUL_TIMEOUT s for open requests
+    WEB_MAX_REQUESTS = int(os.getenv("WEB_MAX_REQUESTS", "0"))
+    WEB_MAX_REQUESTS_JITTER = int(os.getenv("WEB_MAX_REQUESTS_JITTER", "0"))
+    WEB_GRACEFUL_TIMEOUT = float(os.getenv("WEB_GRACEFUL_TIMEOUT", "30"))
+
+    # Read replicas: comma-separated URLs, "round_robin" or "least_connections"
+    # selection, and how long reads about a fresh write stay on the primary
+    DATABASE_REPLICA_URLS = [u.strip() for u in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if u.strip()]
+    DB_REPLICA_SELECTION = os.getenv("DB_REPLICA_SELECTION", "round_robin").lower()
+    DB_READ_YOUR_WRITES_SECONDS = float(os.getenv("DB_READ_YOUR_WRITES_SECONDS", "5"))
+
+    # Statements asyncpg keeps prepared per connection
+    DB_PREPARED_STATEMENT_CACHE_SIZE = int(os.getenv("DB_PREPARED_STATEMENT_CACHE_SIZE", "256"))
+
+    # SQL instrumentation: debug response headers, slow-query log and N+1 flagging
+    SQL_DEBUG_HEADERS = os.getenv("SQL_DEBUG_HEADERS", "false").lower() in ("1", "true", "yes")
+    SQL_SLOW_QUERY_MS = float(os.getenv("SQL_SLOW_QUERY_MS", "200"))
+    SQL_N_PLUS_ONE_THRESHOLD = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", "5"))
+
+    # /metrics is served to these client addresses (comma-separated) and to
+    # requests with "Authorization: Bearer <METRICS_TOKEN>"; everyone else
+    # gets 403. Behind a proxy, run with --forwarded-allow-ips set to it.
+    METRICS_ALLOWED_IPS = [
+        ip.strip() for ip in os.getenv("METRICS_ALLOWED_IPS", "127.0.0.1,::1").split(",") if ip.strip()
+    ]
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+    # bcrypt cost for new hashes (existing hashes keep theirs); pick one with
+    # python -m benchmarks.bench_security --sweep
+    BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+    # Password hashing worker pool
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+
+    # Login brute-force throttle: attempts allowed per email and per client
+    # address within the given seconds. RATE_LIMIT_BACKEND is "memory"
+    # (per worker) or "redis" (shared, needs the redis package).
+    LOGIN_RATE_LIMIT_ENABLED = os.getenv("LOGIN_RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+    LOGIN_RATE_LIMIT_EMAIL = int(os.getenv("LOGIN_RATE_LIMIT_EMAIL", "10"))
+    LOGIN_RATE_LIMIT_EMAIL_SECONDS = float(os.getenv("LOGIN_RATE_LIMIT_EMAIL_SECONDS", "300"))
+    LOGIN_RATE_LIMIT_IP = int(os.getenv("LOGIN_RATE_LIMIT_IP", "50"))
+    LOGIN_RATE_LIMIT_IP_SECONDS = float(os.getenv("LOGIN_RATE_LIMIT_IP_SECONDS", "60"))
+    RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory").lower()
+    RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL", "redis://localhost:6379/0")
+    RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+
+    # Startup warmup and shutdown drain. WARMUP_POOL_CONNECTIONS connections
+    # are opened per engine (defaults to DB_POOL_SIZE); with WARMUP_STRICT a
+    # database error fails startup instead of being logged.
+    WARMUP_POOL_CONNECTIONS = int(os.getenv("WARMUP_POOL_CONNECTIONS", str(DB_POOL_SIZE)))
+    WARMUP_STRICT = os.getenv("WARMUP_STRICT", "false").lower() in ("1", "true", "yes")
+    WARMUP_PASSWORD_HASHING = os.getenv("WARMUP_PASSWORD_HASHING", "true").lower() in ("1", "true", "yes")
+    SHUTDOWN_DRAIN_SECONDS = float(os.getenv("SHUTDOWN_DRAIN_SECONDS", "10"))
+
+    # Event-loop lag monitor: heartbeat period and the lag at which the
+    # blocking stack is captured and logged
+    LOOP_MONITOR_ENABLED = os.getenv("LOOP_MONITOR_ENABLED", "true").lower() in ("1", "true", "yes")
+    LOOP_MONITOR_INTERVAL_MS = float(os.getenv("LOOP_MONITOR_INTERVAL_MS", "50"))
+    LOOP_LAG_THRESHOLD_MS = float(os.getenv("LOOP_LAG_THRESHOLD_MS", "100"))
+
+    # Server-Timing breakdown: share of requests timed (0 = off, 1 = all),
+    # and whether sampled requests get the header and/or a log line
+    SERVER_TIMING_SAMPLE_RATE = float(os.getenv("SERVER_TIMING_SAMPLE_RATE", "0"))
+    SERVER_TIMING_HEADER = os.getenv("SERVER_TIMING_HEADER", "true").lower() in ("1", "true", "yes")
+    SERVER_TIMING_LOG = os.getenv("SERVER_TIMING_LOG", "false").lower() in ("1", "true", "yes")
+
+    # Traffic capture for replay: share of requests recorded (0 to 1) and
+    # the rotating NDJSON file they go to (one per worker, with the pid
+    # before the extension, when WEB_CONCURRENCY > 1)
+    TRAFFIC_CAPTURE_ENABLED = os.getenv("TRAFFIC_CAPTURE_ENABLED", "false").lower() in ("1", "true", "yes")
+    TRAFFIC_CAPTURE_SAMPLE_RATE = float(os.getenv("TRAFFIC_CAPTURE_SAMPLE_RATE", "1"))
+    TRAFFIC_CAPTURE_PATH = os.getenv("TRAFFIC_CAPTURE_PATH", "traffic.ndjson")
+    TRAFFIC_CAPTURE_MAX_BYTES = int(os.getenv("TRAFFIC_CAPTURE_MAX_BYTES", str(100 * 1024 * 1024)))
+    TRAFFIC_CAPTURE_BACKUPS = int(os.getenv("TRAFFIC_CAPTURE_BACKUPS", "5"))
+
+    # Bulk user import: rows per INSERT/commit and the separate hashing pool
+    # that keeps imports from starving logins
+    BULK_IMPORT_BATCH_SIZE = int(os.getenv("BULK_IMPORT_BATCH_SIZE", "500"))
+    BULK_IMPORT_HASH_WORKERS = int(os.getenv("BULK_IMPORT_HASH_WORKERS", str(os.cpu_count() or 4)))
+
 settings = Settings()
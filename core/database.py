@@ -1,21 +1,244 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from sqlalchemy.sql.dml import UpdateBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
 from dotenv import load_dotenv
+from typing import Any, Dict, Hashable, List, Optional
+import itertools
 import os
+import time
 import urllib.parse
 
+from core.cache import TTLCache
+from core.config import settings
+from core.sql_instrumentation import instrument_engine
+from core.timing import record
+
 # Load environment variables from .env file
 load_dotenv()
 
 # Get DATABASE_URL from the environment variables
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-# If DATABASE_URL contains asyncpg, replace it with psycopg2 for now
+# Async drivers for each backend the app runs against
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def to_async_url(url: str) -> str:
+    """Return ``url`` rewritten to use the async driver for its backend."""
+    parsed = make_url(url)
+    drivername = ASYNC_DRIVERS.get(parsed.get_backend_name(), parsed.drivername)
+    return parsed.set(drivername=drivername).render_as_string(hide_password=False)
+
+# The async engine serves the request path; keep the original driver if it
+# is already async (e.g. postgresql+asyncpg)
+ASYNC_DATABASE_URL = to_async_url(DATABASE_URL)
+
+# If DATABASE_URL contains asyncpg, replace it with psycopg2 for the sync engine
 if DATABASE_URL and "asyncpg" in DATABASE_URL:
     DATABASE_URL = DATABASE_URL.replace("postgresql+asyncpg", "postgresql")
 
+class _CheckoutTimingMixin:
+    """
+    Records how long checkouts wait for a connection (including connecting).
+
+    Counters are plain attributes updated without a lock; an occasional lost
+    update under thread contention is acceptable for monitoring.
+    """
+    def __init__(self, *args, **kw):
+        super().__init__(*args, **kw)
+        self.checkout_count = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - start
+            record("db-wait", waited)
+            self.checkout_count += 1
+            self.wait_seconds_total += waited
+            if waited > self.wait_seconds_max:
+                self.wait_seconds_max = waited
+
+class TimedQueuePool(_CheckoutTimingMixin, QueuePool):
+    pass
+
+class TimedAsyncQueuePool(_CheckoutTimingMixin, AsyncAdaptedQueuePool):
+    pass
+
+def pool_status(pool: Pool) -> Dict[str, Any]:
+    """Occupancy and checkout wait counters of a connection pool."""
+    status = {}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+        )
+    if isinstance(pool, _CheckoutTimingMixin):
+        status.update(
+            checkout_count=pool.checkout_count,
+            wait_seconds_total=pool.wait_seconds_total,
+            wait_seconds_max=pool.wait_seconds_max,
+        )
+    return status
+
+def pool_options() -> Dict[str, Any]:
+    """Pool arguments for create_engine/create_async_engine from settings."""
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_use_lifo": settings.DB_POOL_USE_LIFO,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING == "checkout",
+    }
+
+def max_connections_per_worker() -> int:
+    """
+    Most connections one worker can open to the primary: pool_size plus
+    max_overflow for each of the sync and async engines.
+    """
+    return (settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW) * 2
+
+def install_idle_ping(engine: Engine, interval: float) -> None:
+    """
+    Ping connections on checkout only when they sat idle for ``interval`` s.
+
+    Busy connections are reused without the extra round trip that
+    pool_pre_ping costs on every checkout; ones that may have been dropped
+    by the server or a proxy while idle are checked first. A failed ping
+    makes the pool discard the connection and hand out a fresh one.
+    """
+    @event.listens_for(engine, "checkin")
+    def _record_checkin(dbapi_connection, connection_record):
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def _ping_if_idle(dbapi_connection, connection_record, connection_proxy):
+        checked_in_at = connection_record.info.get("checked_in_at")
+        if checked_in_at is None or time.monotonic() - checked_in_at < interval:
+            return
+        try:
+            engine.dialect.do_ping(dbapi_connection)
+        except Exception:
+            raise exc.DisconnectionError()
+
 # Create the SQLAlchemy engine
-engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+engine = create_engine(DATABASE_URL, poolclass=TimedQueuePool, **pool_options())
+
+def _async_connect_args(url: str) -> dict:
+    if make_url(url).drivername == "postgresql+asyncpg":
+        # asyncpg keeps an LRU of prepared statements per connection keyed
+        # by SQL text, so the fixed lookups in crud/ skip the parse/plan step
+        return {"prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE}
+    return {}
+
+def _create_async_engine(url: str) -> AsyncEngine:
+    async_url = to_async_url(url)
+    new_engine = create_async_engine(
+        async_url,
+        poolclass=TimedAsyncQueuePool,
+        connect_args=_async_connect_args(async_url),
+        **pool_options(),
+    )
+    if settings.DB_POOL_PRE_PING == "idle":
+        install_idle_ping(new_engine.sync_engine, settings.DB_POOL_LIVENESS_INTERVAL)
+    # Per-request SQL counts/timings and the slow-query log
+    instrument_engine(new_engine.sync_engine)
+    return new_engine
+
+_async_engine: Optional[AsyncEngine] = None
+
+def get_async_engine() -> AsyncEngine:
+    """
+    The async engine used by the request handlers, created on first use.
+
+    Creating it loads the async driver (asyncpg or aiosqlite), so code
+    that only needs the sync engine, like migrations and data loading,
+    can import this module without one.
+    """
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = _create_async_engine(ASYNC_DATABASE_URL)
+    return _async_engine
+
+# Read-only replicas of the primary
+replica_engines = [_create_async_engine(url) for url in settings.DATABASE_REPLICA_URLS]
+
+if settings.DB_POOL_PRE_PING == "idle":
+    install_idle_ping(engine, settings.DB_POOL_LIVENESS_INTERVAL)
+instrument_engine(engine)
+
+
+class ReplicaSelector:
+    """Pick a replica engine round-robin or by fewest checked-out connections."""
+    def __init__(self, engines: List[AsyncEngine], strategy: str = "round_robin"):
+        if strategy not in ("round_robin", "least_connections"):
+            raise ValueError(f"Unknown replica selection strategy: {strategy}")
+        self.engines = engines
+        self.strategy = strategy
+        self._cycle = itertools.cycle(engines)
+
+    def choose(self) -> AsyncEngine:
+        if self.strategy == "least_connections":
+            return min(self.engines, key=lambda e: e.sync_engine.pool.checkedout())
+        return next(self._cycle)
+
+replica_selector = (
+    ReplicaSelector(replica_engines, settings.DB_REPLICA_SELECTION) if replica_engines else None
+)
+
+# Keys (e.g. ("email", ...), ("user", id)) written on the primary within the
+# read-your-writes window; reads about them skip the lagging replicas. The
+# window is per process: with several workers (server.py) a follow-up
+# request on another worker does not see it. Login therefore also retries a
+# replica miss on the primary (see reads_from_replica), which covers the
+# writes clients read back right away: signups and imported users.
+recent_writes = TTLCache(max_size=100000, ttl_seconds=settings.DB_READ_YOUR_WRITES_SECONDS)
+
+def mark_recent_write(key: Hashable) -> None:
+    """Route reads about ``key`` to the primary for the read-your-writes window."""
+    if replica_engines:
+        recent_writes.set(key, True)
+
+def written_recently(key: Hashable) -> bool:
+    return recent_writes.get(key, False)
+
+
+class RoutingSession(Session):
+    """
+    Session that reads from ``info["replica"]`` when one is set.
+
+    Flushes, INSERT/UPDATE/DELETE statements and sessions marked with
+    use_primary() always go to the session's own bind, the primary.
+    """
+    def get_bind(self, mapper=None, clause=None, **kw):
+        replica = self.info.get("replica")
+        if (
+            replica is None
+            or self._flushing
+            or self.info.get("use_primary")
+            or isinstance(clause, UpdateBase)
+        ):
+            return super().get_bind(mapper, clause=clause, **kw)
+        return replica
+
+def use_primary(db: AsyncSession) -> None:
+    """Send the rest of this read session's queries to the primary."""
+    db.info["use_primary"] = True
+
+def reads_from_replica(db: AsyncSession) -> bool:
+    """Whether this session's next read goes to a replica."""
+    return db.info.get("replica") is not None and not db.info.get("use_primary")
 
 # Declare Base class
 Base = declarative_base()
@@ -25,10 +248,45 @@ SessionLocal = sessionmaker(
     autocommit=False, autoflush=False, bind=engine
 )
 
+# Async session factory; objects stay usable after commit so handlers can
+# read them without another round trip. Bound to get_async_engine() per session.
+AsyncSessionLocal = async_sessionmaker(autoflush=False, expire_on_commit=False)
+
 # Dependency to get the db session
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def reset_pools_after_fork() -> None:
+    """
+    Drop pool state inherited from a parent process without closing it.
+
+    Call first thing in a forked worker; the parent's connections (if any)
+    must not be shared, and closing them here would close the parent's too.
+    """
+    engine.dispose(close=False)
+    if _async_engine is not None:
+        _async_engine.sync_engine.dispose(close=False)
+    for replica in replica_engines:
+        replica.sync_engine.dispose(close=False)
+
+# Sessions whose reads may be served by a replica
+AsyncReadSessionLocal = async_sessionmaker(
+    sync_session_class=RoutingSession, autoflush=False, expire_on_commit=False
+)
+
+# Dependency to get an async db session
+async def get_async_db():
+    async with AsyncSessionLocal(bind=get_async_engine()) as db:
+        yield db
+
+# Dependency for read-mostly handlers: reads go to a replica when any are
+# configured, writes still go to the primary
+async def get_async_read_db():
+    async with AsyncReadSessionLocal(bind=get_async_engine()) as db:
+        if replica_selector is not None:
+            db.info["replica"] = replica_selector.choose().sync_engine
+        yield db
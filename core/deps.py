@@ -2,12 +2,16 @@
 from typing import Annotated, List, Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from jose import jwt, JWTError
 from datetime import datetime, timezone
 
-from core.database import get_db
-from core.security import decode_token
+from core.database import get_async_read_db, use_primary, written_recently
+from core.security import decode_token, revocation_list
+from core.principal import Principal
+from core.timing import phase
+from core.user_cache import user_cache
+from crud.user import get_user_by_id
 from models.user import User
 from core.config import settings
 
@@ -15,12 +19,16 @@ from core.config import settings
 # OAuth2 Bearer token scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
 
-def get_current_user(
+async def get_current_user(
     token: Annotated[str, Depends(oauth2_scheme)],
-    db: Session = Depends(get_db)
-) -> User:
+    db: AsyncSession = Depends(get_async_read_db)
+) -> Principal:
     """
     Validate token and return current user
+
+    The user is looked up through the principal cache. With AUTH_CLAIMS_ONLY
+    enabled it is built from the verified claims and no query is issued; use
+    get_current_user_record when the row is needed.
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -31,11 +39,8 @@ def get_current_user(
     try:
         # Decode JWT token
         try:
-            payload = jwt.decode(
-                token, 
-                key=settings.SECRET_KEY, 
-                algorithms=[settings.ALGORITHM]
-            )
+            with phase("jwt"):
+                payload = decode_token(token)
         except jwt.ExpiredSignatureError:
             # Handle expired tokens specifically
             raise HTTPException(
@@ -50,19 +55,37 @@ def get_current_user(
         if user_id is None:
             raise credentials_exception
         
-        # Get user from database
-        user = db.query(User).filter(User.id == int(user_id)).first()
-        if user is None:
+        # Reject tokens revoked before their expiry
+        if revocation_list.is_revoked(payload):
             raise credentials_exception
+        
+        if settings.AUTH_CLAIMS_ONLY:
+            try:
+                return Principal.from_claims(payload)
+            except (KeyError, TypeError, ValueError):
+                raise credentials_exception
+        
+        # Get user from the principal cache, falling back to the database
+        user_id = int(user_id)
+        with phase("user"):
+            principal = user_cache.get(user_id)
+            if principal is None:
+                if written_recently(("user", user_id)):
+                    use_primary(db)
+                user = await get_user_by_id(db, user_id)
+                if user is None:
+                    raise credentials_exception
+                principal = Principal.from_user(user)
+                user_cache.set(user_id, principal)
             
-        return user
+        return principal
         
     except JWTError:
         raise credentials_exception
 
 def get_current_active_user(
-    current_user: Annotated[User, Depends(get_current_user)]
-) -> User:
+    current_user: Annotated[Principal, Depends(get_current_user)]
+) -> Principal:
     """
     Check if current user is active
     """
@@ -73,6 +96,24 @@ def get_current_active_user(
         )
     return current_user
 
+async def get_current_user_record(
+    current_user: Annotated[Principal, Depends(get_current_active_user)],
+    db: AsyncSession = Depends(get_async_read_db)
+) -> User:
+    """
+    Return the live User row for handlers that need more than the token claims
+    """
+    if written_recently(("user", current_user.id)):
+        use_primary(db)
+    user = await get_user_by_id(db, current_user.id)
+    if user is None or not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user
+
 class RoleChecker:
     """
     Role-based permission checker
@@ -80,7 +121,9 @@ class RoleChecker:
     def __init__(self, allowed_roles: List[str]):
         self.allowed_roles = allowed_roles
         
-    def __call__(self, user: User = Depends(get_current_active_user)) -> User:
+    def __call__(
+        self, user: Principal = Depends(get_current_active_user)
+    ) -> Principal:
         if user.role not in self.allowed_roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -0,0 +1,65 @@
+# core/keys.py
+import json
+import os
+from typing import Any, Dict, Optional
+
+from jose import jwk
+from jose.backends.base import Key
+
+# Algorithms signed with a private key and verifiable from the JWKS
+ASYMMETRIC_ALGORITHMS = frozenset(("RS256", "RS384", "RS512", "ES256", "ES384", "ES512"))
+
+
+class SigningKeyRing:
+    """
+    Asymmetric signing keys addressed by ``kid``.
+
+    Tokens are signed with the active key and verified with whichever key
+    their ``kid`` header names. To rotate: add the new key, wait for the
+    JWKS cache max-age, make it active, and drop the old key once tokens
+    signed with it have expired. Retired keys may be kept as public PEMs.
+    """
+    def __init__(self, algorithm: str, keys: Dict[str, Key], active_kid: str):
+        if algorithm not in ASYMMETRIC_ALGORITHMS:
+            raise ValueError(f"Unsupported signing algorithm: {algorithm}")
+        if active_kid not in keys:
+            raise ValueError(f"Active key id {active_kid!r} is not in the key ring")
+        if keys[active_kid].is_public():
+            raise ValueError(f"Active key {active_kid!r} is a public key and cannot sign tokens")
+        self.algorithm = algorithm
+        self.active_kid = active_kid
+        self._keys = keys
+        self._verification_keys = {kid: key.public_key() for kid, key in keys.items()}
+        # Serialized once; the JWKS endpoint serves these bytes as-is
+        self.jwks_bytes = json.dumps(self.jwks(), separators=(",", ":")).encode()
+
+    @classmethod
+    def from_directory(cls, path: str, algorithm: str, active_kid: str) -> "SigningKeyRing":
+        """Load ``<kid>.pem`` files (private or public) from ``path``."""
+        # os.listdir(None) would quietly read the working directory
+        if not path:
+            raise ValueError(f"{algorithm} needs a signing key directory (JWT_SIGNING_KEYS_DIR)")
+        keys = {}
+        for filename in sorted(os.listdir(path)):
+            kid, ext = os.path.splitext(filename)
+            if ext != ".pem":
+                continue
+            with open(os.path.join(path, filename)) as f:
+                keys[kid] = jwk.construct(f.read(), algorithm)
+        return cls(algorithm, keys, active_kid)
+
+    @property
+    def signing_key(self) -> Key:
+        return self._keys[self.active_kid]
+
+    def verification_key(self, kid: Optional[str]) -> Optional[Key]:
+        return self._verification_keys.get(kid)
+
+    def jwks(self) -> Dict[str, Any]:
+        """Public keys as a JSON Web Key Set."""
+        keys = []
+        for kid, key in self._verification_keys.items():
+            entry = key.to_dict()
+            entry.update({"kid": kid, "use": "sig", "alg": self.algorithm})
+            keys.append(entry)
+        return {"keys": keys}
@@ -0,0 +1,244 @@
+# core/lifecycle.py
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Dict, List
+
+from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+
+from core.config import settings
+from core.database import engine, get_async_engine, replica_engines
+from core.loop_monitor import loop_monitor
+from core.metrics import http_requests_in_flight
+from core.security import (
+    bulk_hash_pool, get_password_hash, get_token_codec, password_hash_pool, revocation_list,
+    revoke_user_tokens, verify_password,
+)
+from core.traffic_capture import traffic_capture
+from crud.refresh_token import purge_refresh_tokens, token_with_user_stmt
+from crud.token_revocation import purge_token_revocations, revocations_since
+from crud.user import get_user_by_email, get_user_by_id
+
+logger = logging.getLogger(__name__)
+
+# Never matches a real account; used to exercise the login queries
+WARMUP_EMAIL = "warmup@localhost.invalid"
+
+# Each poll reads revocations back this far before the previous one, so a
+# revocation whose transaction committed a while after it was stamped is
+# still seen; applying one twice is harmless
+REVOCATION_POLL_OVERLAP_SECONDS = 60.0
+REVOCATION_PURGE_SECONDS = 3600.0
+
+
+async def _warm_connection(conn: AsyncConnection) -> None:
+    # Run the hot statements once so SQLAlchemy's compiled cache holds them
+    # and asyncpg has prepared them on this connection
+    async with AsyncSession(bind=conn) as db:
+        await get_user_by_email(db, WARMUP_EMAIL)
+        await get_user_by_id(db, 0)
+        await db.execute(token_with_user_stmt, {"token_hash": ""})
+
+
+async def prefill_pool(target: AsyncEngine, count: int) -> int:
+    """
+    Open up to ``count`` pool connections at once, warm each one and return
+    them to the pool idle.
+
+    Returns:
+        How many connections were opened
+    """
+    if count <= 0:
+        return 0
+    conns: List[AsyncConnection] = []
+    try:
+        for _ in range(count):
+            conns.append(target.connect())
+        # Concurrently, so a remote database costs one round trip of latency
+        await asyncio.gather(*(conn.start() for conn in conns))
+        await asyncio.gather(*(_warm_connection(conn) for conn in conns))
+    finally:
+        await asyncio.gather(*(conn.close() for conn in conns), return_exceptions=True)
+    return len(conns)
+
+
+async def warm_password_hashing() -> None:
+    """
+    Hash and verify a throwaway password on the hashing pool.
+
+    Loads passlib's bcrypt backend and starts the pool's first worker
+    thread, instead of on the first login.
+    """
+    hashed = await password_hash_pool.run(get_password_hash, "warmup")
+    await password_hash_pool.run(verify_password, "warmup", hashed)
+
+
+def preload_caches(app: FastAPI) -> None:
+    """Build the token codec/JWKS and the OpenAPI schema ahead of first use."""
+    get_token_codec()
+    app.openapi()
+
+
+async def purge_refresh_tokens_periodically(interval: float) -> None:
+    """
+    Delete expired refresh tokens every ``interval`` seconds or so. The
+    jitter keeps the workers of one deployment from purging in lockstep.
+    """
+    while True:
+        await asyncio.sleep(interval * random.uniform(0.5, 1.5))
+        try:
+            async with AsyncSession(get_async_engine()) as db:
+                deleted = await purge_refresh_tokens(db)
+            if deleted:
+                logger.info("Purged %d expired refresh tokens", deleted)
+        except Exception:
+            logger.warning("Refresh token purge failed", exc_info=True)
+
+
+async def load_token_revocations(since: float) -> float:
+    """
+    Apply the revocations in token_revocations from ``since`` on to this
+    worker's revocation list.
+
+    Returns:
+        The ``since`` for the next call
+    """
+    started = time.time()
+    async with AsyncSession(get_async_engine()) as db:
+        rows = await revocations_since(db, since)
+    for user_id, not_before in rows:
+        revoke_user_tokens(user_id, at=not_before)
+    return started - REVOCATION_POLL_OVERLAP_SECONDS
+
+
+async def poll_token_revocations(since: float, interval: float) -> None:
+    """
+    Pick up access token revocations written by other workers every
+    ``interval`` seconds, and about once an hour delete the ones older than
+    any token they could still match.
+    """
+    purged = time.monotonic()
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            since = await load_token_revocations(since)
+            max_age = revocation_list.max_token_age_seconds
+            if max_age > 0 and time.monotonic() - purged >= REVOCATION_PURGE_SECONDS:
+                async with AsyncSession(get_async_engine()) as db:
+                    await purge_token_revocations(db, time.time() - max_age)
+                purged = time.monotonic()
+        except Exception:
+            logger.warning("Token revocation poll failed", exc_info=True)
+
+
+async def startup(app: FastAPI) -> Dict[str, Any]:
+    """
+    Warm the process before it reports ready on /api/v1/ready.
+
+    A failing database is logged and skipped unless WARMUP_STRICT is set,
+    so a worker can still start while the database is briefly down.
+
+    Returns:
+        Timings and connection counts of each step
+    """
+    report: Dict[str, Any] = {}
+    started = time.perf_counter()
+
+    step = time.perf_counter()
+    # Connections beyond pool_size would be closed again on checkin
+    count = min(settings.WARMUP_POOL_CONNECTIONS, settings.DB_POOL_SIZE)
+    # Outside the try: a missing async driver is a deployment error, not
+    # a database that is briefly down
+    primary = get_async_engine()
+    try:
+        report["pool_connections"] = 0
+        for pool_engine in (primary, *replica_engines):
+            report["pool_connections"] += await prefill_pool(pool_engine, count)
+    except Exception:
+        if settings.WARMUP_STRICT:
+            raise
+        logger.warning("Connection pool prefill failed", exc_info=True)
+    report["pool_seconds"] = time.perf_counter() - step
+
+    if settings.WARMUP_PASSWORD_HASHING:
+        step = time.perf_counter()
+        await warm_password_hashing()
+        report["hashing_seconds"] = time.perf_counter() - step
+
+    step = time.perf_counter()
+    preload_caches(app)
+    report["caches_seconds"] = time.perf_counter() - step
+
+    if settings.TOKEN_REVOCATION_POLL_SECONDS > 0:
+        # Revocations made before this process started, including by
+        # workers that have since exited
+        max_age = revocation_list.max_token_age_seconds
+        since = time.time() - max_age if max_age > 0 else 0.0
+        try:
+            since = await load_token_revocations(since)
+        except Exception:
+            if settings.WARMUP_STRICT:
+                raise
+            logger.warning("Loading token revocations failed", exc_info=True)
+        app.state.token_revocation_poll = asyncio.create_task(
+            poll_token_revocations(since, settings.TOKEN_REVOCATION_POLL_SECONDS),
+            name="token-revocation-poll",
+        )
+
+    # Started last so warmup's own blocking work isn't reported
+    if settings.LOOP_MONITOR_ENABLED:
+        await loop_monitor.start()
+    if settings.TRAFFIC_CAPTURE_ENABLED:
+        # WEB_CONCURRENCY, or server.py --workers (set before the fork)
+        traffic_capture.start(per_process=settings.WEB_CONCURRENCY > 1)
+    if settings.REFRESH_TOKEN_PURGE_INTERVAL_SECONDS > 0:
+        app.state.refresh_token_purge = asyncio.create_task(
+            purge_refresh_tokens_periodically(settings.REFRESH_TOKEN_PURGE_INTERVAL_SECONDS),
+            name="refresh-token-purge",
+        )
+
+    report["total_seconds"] = time.perf_counter() - started
+    app.state.ready = True
+    logger.info("Startup warmup finished", extra={"warmup": report})
+    return report
+
+
+async def drain(timeout: float, poll_interval: float = 0.05) -> bool:
+    """
+    Wait until no HTTP requests are in flight, for at most ``timeout``.
+
+    Returns:
+        Whether all requests finished in time
+    """
+    deadline = time.monotonic() + timeout
+    while http_requests_in_flight.value() > 0:
+        if time.monotonic() >= deadline:
+            return False
+        await asyncio.sleep(poll_interval)
+    return True
+
+
+async def shutdown(app: FastAPI) -> None:
+    """
+    Stop reporting ready, let in-flight requests finish, then release
+    hashing threads and every database connection.
+    """
+    app.state.ready = False
+    if not await drain(settings.SHUTDOWN_DRAIN_SECONDS):
+        logger.warning("Shutting down with requests still in flight")
+
+    for name in ("refresh_token_purge", "token_revocation_poll"):
+        task = getattr(app.state, name, None)
+        if task is not None:
+            task.cancel()
+            setattr(app.state, name, None)
+    await loop_monitor.stop()
+    traffic_capture.stop()
+    password_hash_pool.shutdown()
+    bulk_hash_pool.shutdown()
+    for replica in replica_engines:
+        await replica.dispose()
+    await get_async_engine().dispose()
+    engine.dispose()
@@ -0,0 +1,134 @@
+# core/loop_monitor.py
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from types import FrameType
+from typing import Any, Dict, List, Optional
+
+from core.config import settings
+from core.metrics import Counter, Histogram, registry
+
+logger = logging.getLogger(__name__)
+
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+event_loop_lag = registry.register(Histogram(
+    "event_loop_lag_seconds",
+    "How late the event loop ran a timer scheduled by the lag monitor",
+    buckets=LAG_BUCKETS,
+))
+event_loop_blocked = registry.register(Counter(
+    "event_loop_blocked_total",
+    "Times the event loop was blocked for longer than the lag threshold",
+))
+
+# Frames under here but outside the virtualenv are ours; used to point at
+# the handler that blocked rather than at the library it called
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_LIBRARY_DIRS = ("site-packages", "dist-packages", os.sep + "env" + os.sep)
+
+
+def _is_project_frame(filename: str) -> bool:
+    return filename.startswith(PROJECT_ROOT) and not any(d in filename for d in _LIBRARY_DIRS)
+
+
+class LoopMonitor:
+    """
+    Measures event-loop lag and catches what blocks the loop.
+
+    A heartbeat task sleeps ``interval`` seconds at a time and records how
+    late it wakes up. A watchdog thread notices when the heartbeat is
+    overdue by more than ``threshold`` and snapshots the loop thread's
+    stack while it is still stuck, i.e. inside the blocking call. When the
+    loop recovers, one warning with the lag and that stack is logged and
+    event_loop_blocked_total is incremented.
+    """
+    def __init__(self, interval: float = 0.05, threshold: float = 0.1, max_frames: int = 40):
+        self.interval = interval
+        self.threshold = threshold
+        self.max_frames = max_frames
+        self.blocked = 0
+        self.last_report: Optional[Dict[str, Any]] = None
+        self._last_beat = time.monotonic()
+        self._captured: Optional[List[str]] = None
+        self._loop_thread: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    async def start(self) -> None:
+        """Start monitoring the running loop."""
+        self._loop_thread = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._heartbeat(), name="loop-monitor")
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    async def stop(self) -> None:
+        self._stopping.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    async def _heartbeat(self) -> None:
+        while True:
+            before = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - before - self.interval)
+            self._last_beat = now
+            stack, self._captured = self._captured, None
+            event_loop_lag.observe(lag)
+            if lag >= self.threshold:
+                self._report(lag, stack)
+
+    def _watch(self) -> None:
+        # Poll twice per heartbeat so a block is caught while it is happening
+        while not self._stopping.wait(self.interval / 2):
+            overdue = time.monotonic() - self._last_beat - self.interval
+            if overdue > self.threshold and self._captured is None:
+                frame = sys._current_frames().get(self._loop_thread)
+                if frame is not None:
+                    self._captured = self.format_stack(frame)
+
+    def format_stack(self, frame: FrameType) -> List[str]:
+        """Innermost-last ``file:line in function`` entries for ``frame``."""
+        entries = traceback.extract_stack(frame, limit=self.max_frames)
+        return [f"{e.filename}:{e.lineno} in {e.name}" for e in entries]
+
+    def _report(self, lag: float, stack: Optional[List[str]]) -> None:
+        self.blocked += 1
+        event_loop_blocked.inc()
+        location = None
+        for entry in reversed(stack or []):
+            if _is_project_frame(entry.rsplit(":", 1)[0]):
+                location = entry
+                break
+        self.last_report = {
+            "event_loop_lag_ms": round(lag * 1000, 1),
+            "blocking_location": location,
+            "blocking_stack": stack,
+        }
+        logger.warning(
+            "event loop blocked for %.1f ms at %s",
+            lag * 1000, location or "unknown location",
+            extra=self.last_report,
+        )
+
+
+loop_monitor = LoopMonitor(
+    interval=settings.LOOP_MONITOR_INTERVAL_MS / 1000,
+    threshold=settings.LOOP_LAG_THRESHOLD_MS / 1000,
+)
@@ -0,0 +1,226 @@
+# core/metrics.py
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# (name suffix, labels, value) for each sample of one metric family
+Samples = List[Tuple[str, Dict[str, str], float]]
+# (name, type, help, samples) produced by a collector at scrape time
+Family = Tuple[str, str, str, Samples]
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """
+    Base for metrics updated on the request path.
+
+    Updates are plain dict operations made from the event loop thread, so
+    no lock is taken; rendering copies the values it reads.
+    """
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def _labels(self, labelvalues: Tuple[str, ...]) -> Dict[str, str]:
+        return dict(zip(self.labelnames, labelvalues))
+
+    def collect(self) -> Iterable[Family]:
+        samples = [("", self._labels(k), v) for k, v in list(self._values.items())]
+        yield self.name, self.type, self.documentation, samples
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, *labelvalues: str, amount: float = 1) -> None:
+        self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def inc(self, *labelvalues: str, amount: float = 1) -> None:
+        self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def dec(self, *labelvalues: str, amount: float = 1) -> None:
+        self._values[labelvalues] = self._values.get(labelvalues, 0) - amount
+
+    def set(self, value: float, *labelvalues: str) -> None:
+        self._values[labelvalues] = value
+
+    def value(self, *labelvalues: str) -> float:
+        return self._values.get(labelvalues, 0)
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labelvalues -> [per-bucket counts..., +Inf count, sum]
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        series = self._series.get(labelvalues)
+        if series is None:
+            series = self._series[labelvalues] = [0] * (len(self.buckets) + 1) + [0.0]
+        # Non-cumulative on the hot path; accumulated when rendering
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def collect(self) -> Iterable[Family]:
+        samples: Samples = []
+        for labelvalues, series in list(self._series.items()):
+            labels = self._labels(labelvalues)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                samples.append(("_bucket", {**labels, "le": _format_value(bound)}, cumulative))
+            samples.append(("_sum", labels, series[-1]))
+            samples.append(("_count", labels, cumulative))
+        yield self.name, self.type, self.documentation, samples
+
+
+class Registry:
+    """Metrics plus callbacks that report other components' stats at scrape time."""
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], Iterable[Family]]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector: Callable[[], Iterable[Family]]) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Text exposition format."""
+        lines = []
+        families = [f for m in self._metrics for f in m.collect()]
+        families += [f for c in self._collectors for f in c()]
+        for name, kind, documentation, samples in families:
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {kind}")
+            for suffix, labels, value in samples:
+                lines.append(f"{name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_request_duration = registry.register(Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ("method", "route", "status"),
+))
+http_requests_in_flight = registry.register(Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being handled",
+))
+
+
+class MetricsMiddleware:
+    """Record in-flight requests and latency per route template."""
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_requests_in_flight.dec()
+            # The router stores the matched route in the scope; raw paths
+            # would give one series per user id
+            route = scope.get("route")
+            http_request_duration.observe(
+                time.perf_counter() - start,
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                str(status_code),
+            )
+
+
+def _component_stats() -> Iterable[Family]:
+    # Imported here so core.metrics stays importable on its own
+    from core.database import engine, get_async_engine, pool_status, replica_engines
+    from core.security import bulk_hash_pool, password_hash_pool, token_cache
+    from core.user_cache import user_cache
+
+    pools = {"sync": pool_status(engine.pool), "async": pool_status(get_async_engine().sync_engine.pool)}
+    for i, replica in enumerate(replica_engines):
+        pools[f"replica-{i}"] = pool_status(replica.sync_engine.pool)
+    for key, kind, documentation in (
+        ("size", "gauge", "Configured pool size"),
+        ("checked_out", "gauge", "Connections currently checked out"),
+        ("overflow", "gauge", "Overflow connections beyond the pool size"),
+        ("checkout_count", "counter", "Connection checkouts"),
+        ("wait_seconds_total", "counter", "Time spent waiting for a connection"),
+        ("wait_seconds_max", "gauge", "Longest wait for a connection"),
+    ):
+        samples = [("", {"engine": name}, status[key]) for name, status in pools.items() if key in status]
+        yield f"db_pool_{key}", kind, documentation, samples
+
+    # Logins and signups use the interactive pool, bulk imports their own
+    hashing = {"interactive": password_hash_pool.stats(), "bulk": bulk_hash_pool.stats()}
+    for name, key, kind, documentation in (
+        ("queue_depth", "queued", "gauge", "bcrypt jobs waiting for a worker"),
+        ("active", "active", "gauge", "bcrypt jobs running"),
+        ("completed_total", "completed", "counter", "bcrypt jobs completed"),
+        ("rejected_total", "rejected", "counter", "bcrypt jobs rejected by admission control"),
+        ("wait_seconds_total", "wait_seconds_total", "counter", "Time bcrypt jobs spent queued"),
+    ):
+        yield f"password_hash_{name}", kind, documentation, [("", {"pool": pool}, s[key]) for pool, s in hashing.items()]
+
+    caches = {"token": token_cache.stats(), "user": user_cache.stats()}
+    for key, kind, documentation in (
+        ("hits", "counter", "Cache hits"),
+        ("misses", "counter", "Cache misses"),
+        ("hit_ratio", "gauge", "Cache hit ratio since start"),
+        ("evictions", "counter", "Entries evicted by the size bound"),
+        ("size", "gauge", "Entries currently cached"),
+    ):
+        suffix = "_total" if kind == "counter" else ""
+        yield f"cache_{key}{suffix}", kind, documentation, [("", {"cache": name}, s[key]) for name, s in caches.items()]
+
+registry.register_collector(_component_stats)
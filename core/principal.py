@@ -0,0 +1,48 @@
+# core/principal.py
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from models.user import User
+
+
+@dataclass(frozen=True)
+class Principal:
+    """
+    Authenticated caller built without loading the User row.
+
+    Exposes the same attributes handlers read from ``User`` (id, email,
+    role, tenant_id, is_active) so either can be returned by the auth deps.
+    """
+    id: int
+    role: str
+    tenant_id: Optional[int]
+    email: Optional[str] = None
+    is_active: bool = True
+
+    @classmethod
+    def from_claims(cls, payload: Dict[str, Any]) -> "Principal":
+        """
+        Build a principal from verified token claims.
+
+        Raises:
+            KeyError, TypeError, ValueError: If ``sub`` or ``role`` is missing
+            or malformed
+        """
+        return cls(
+            id=int(payload["sub"]),
+            role=payload["role"],
+            tenant_id=payload.get("tenant_id"),
+            email=payload.get("email"),
+        )
+
+    @classmethod
+    def from_user(cls, user: "User") -> "Principal":
+        """Snapshot the fields of a User row."""
+        return cls(
+            id=user.id,
+            role=user.role,
+            tenant_id=user.tenant_id,
+            email=user.email,
+            is_active=bool(user.is_active),
+        )
@@ -0,0 +1,185 @@
+# core/rate_limit.py
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Protocol, Tuple
+
+from core.config import settings
+from core.metrics import Counter, registry
+
+login_throttled = registry.register(Counter(
+    "login_throttled_total",
+    "Login attempts rejected by the brute-force throttle",
+    ["key"],
+))
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a caller is over its limit; maps to 429."""
+    def __init__(self, retry_after: float):
+        super().__init__(f"Rate limit exceeded, retry in {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+class RateLimitBackend(Protocol):
+    """
+    Storage for token buckets.
+
+    ``consume`` takes one token from the bucket ``key`` (``capacity``
+    tokens, refilled at ``rate`` per second) and returns 0 if it was
+    available, or the seconds until one will be.
+    """
+    async def consume(self, key: str, capacity: int, rate: float) -> float: ...
+
+    async def reset(self) -> None: ...
+
+
+class MemoryBackend:
+    """
+    Per-process token buckets.
+
+    Only the ``max_keys`` most recently used buckets are kept, so a flood of
+    distinct keys cannot grow memory without bound. Each worker counts on
+    its own; use a shared backend to enforce limits across workers.
+    """
+    def __init__(self, max_keys: int = 100000, clock: Callable[[], float] = time.monotonic):
+        self.max_keys = max_keys
+        self._clock = clock
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def consume(self, key: str, capacity: int, rate: float) -> float:
+        now = self._clock()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / rate
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+    async def reset(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+# Atomic refill-and-take on one Redis hash; returns the wait in milliseconds
+_REDIS_TOKEN_BUCKET = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return math.ceil(wait * 1000)
+"""
+
+
+class RedisBackend:
+    """
+    Token buckets shared by every worker through Redis.
+
+    Requires the ``redis`` package. Buckets expire once they would be full
+    again, so idle keys cost nothing.
+    """
+    def __init__(self, url: str, prefix: str = "ratelimit:"):
+        import redis.asyncio
+
+        self.prefix = prefix
+        self._redis = redis.asyncio.Redis.from_url(url)
+        self._script = self._redis.register_script(_REDIS_TOKEN_BUCKET)
+
+    async def consume(self, key: str, capacity: int, rate: float) -> float:
+        wait_ms = await self._script(keys=[self.prefix + key], args=[capacity, rate, time.time()])
+        return int(wait_ms) / 1000
+
+    async def reset(self) -> None:
+        async for key in self._redis.scan_iter(match=self.prefix + "*"):
+            await self._redis.delete(key)
+
+
+class LoginThrottle:
+    """
+    Brute-force protection for the password endpoints.
+
+    Every attempt takes a token from a bucket for the email and one for
+    the client address, so both guessing one account from many addresses
+    and stuffing many accounts from one address run dry. Check it before
+    loading the user or verifying the password; rejected attempts then
+    cost no database or bcrypt work.
+    """
+    def __init__(
+        self,
+        backend: RateLimitBackend,
+        limits: Dict[str, Tuple[int, float]],
+        enabled: bool = True,
+    ):
+        """
+        Args:
+            limits: Key kind ("email", "ip") -> (attempts, per seconds)
+        """
+        self.backend = backend
+        self.limits = limits
+        self.enabled = enabled
+
+    async def check(self, **keys: Optional[str]) -> None:
+        """
+        Count one attempt for each given key, e.g. ``check(email=..., ip=...)``.
+
+        Raises:
+            RateLimitExceeded: If any key is over its limit
+        """
+        if not self.enabled:
+            return
+        retry_after = 0.0
+        for kind, value in keys.items():
+            if value is None or kind not in self.limits:
+                continue
+            attempts, per_seconds = self.limits[kind]
+            wait = await self.backend.consume(f"login:{kind}:{value}", attempts, attempts / per_seconds)
+            if wait > 0:
+                login_throttled.inc(kind)
+                retry_after = max(retry_after, wait)
+        if retry_after > 0:
+            raise RateLimitExceeded(retry_after)
+
+    async def reset(self) -> None:
+        await self.backend.reset()
+
+
+def retry_after_header(exc: RateLimitExceeded) -> str:
+    return str(max(1, math.ceil(exc.retry_after)))
+
+
+def _create_backend() -> RateLimitBackend:
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        return RedisBackend(settings.RATE_LIMIT_REDIS_URL)
+    if settings.RATE_LIMIT_BACKEND != "memory":
+        raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {settings.RATE_LIMIT_BACKEND}")
+    return MemoryBackend(settings.RATE_LIMIT_MAX_KEYS)
+
+
+login_throttle = LoginThrottle(
+    _create_backend(),
+    {
+        "email": (settings.LOGIN_RATE_LIMIT_EMAIL, settings.LOGIN_RATE_LIMIT_EMAIL_SECONDS),
+        "ip": (settings.LOGIN_RATE_LIMIT_IP, settings.LOGIN_RATE_LIMIT_IP_SECONDS),
+    },
+    enabled=settings.LOGIN_RATE_LIMIT_ENABLED,
+)
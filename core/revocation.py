@@ -0,0 +1,69 @@
+# core/revocation.py
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+class TokenRevocationList:
+    """
+    Per-user "not before" timestamps for access tokens.
+
+    Revoking a user rejects every token issued to them before that moment,
+    which works like a per-user token version. Times are
+    compared with sub-second precision, so a token issued just after a
+    revocation is accepted.
+
+    This is the per-process index checked on every request. The shared
+    record is the token_revocations table; each worker loads it at startup
+    and then polls it (see core/lifecycle.py).
+    """
+    def __init__(self, max_token_age_seconds: int):
+        self.max_token_age_seconds = max_token_age_seconds
+        self._not_before: Dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    def revoke_user(self, user_id: int, at: Optional[float] = None) -> None:
+        """
+        Reject all tokens for ``user_id`` issued before ``at`` (default now).
+
+        A time earlier than the one already recorded is ignored, so the same
+        revocations can be applied again and in any order.
+        """
+        now = time.time()
+        at = now if at is None else at
+        user_id = int(user_id)
+        with self._lock:
+            current = self._not_before.get(user_id)
+            if current is None or at > current:
+                self._not_before[user_id] = at
+            self._prune(now)
+
+    def is_revoked(self, payload: Dict[str, Any]) -> bool:
+        """Check decoded claims against the revocation list."""
+        if not self._not_before:
+            return False
+        try:
+            not_before = self._not_before.get(int(payload.get("sub")))
+        except (TypeError, ValueError):
+            return False
+        if not_before is None:
+            return False
+        issued_at = payload.get("iat")
+        # Tokens without iat predate revocation support, treat them as stale
+        return issued_at is None or issued_at < not_before
+
+    def clear(self) -> None:
+        with self._lock:
+            self._not_before.clear()
+
+    def _prune(self, now: float) -> None:
+        # Entries older than the longest token lifetime cannot match anything
+        if self.max_token_age_seconds <= 0:
+            return
+        cutoff = now - self.max_token_age_seconds
+        stale = [uid for uid, ts in self._not_before.items() if ts < cutoff]
+        for uid in stale:
+            del self._not_before[uid]
+
+    def __len__(self) -> int:
+        return len(self._not_before)
@@ -1,12 +1,29 @@
-from datetime import datetime, timedelta, timezone
-from typing import Optional, Dict, Any
+import asyncio
+import base64
+import binascii
+import functools
+import hashlib
+import hmac
+import json
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Optional, Dict, Any, Callable, TypeVar
 
-from jose import jwt, JWTError
+from jose import jwt, jwk, JWTError, ExpiredSignatureError
 from passlib.context import CryptContext
 from core.config import settings
+from core.cache import TTLCache
+from core.keys import ASYMMETRIC_ALGORITHMS, SigningKeyRing
+from core.revocation import TokenRevocationList
+from core.timing import phase
+
+T = TypeVar("T")
 
 # Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash."""
@@ -16,6 +33,251 @@ def get_password_hash(password: str) -> str:
     """Generate a password hash."""
     return pwd_context.hash(password)
 
+
+class HashingQueueFull(Exception):
+    """Raised when the password hashing pool has no room for more work."""
+
+
+class PasswordHashPool:
+    """
+    Bounded worker pool for bcrypt work.
+
+    bcrypt releases the GIL while hashing, so a small thread pool keeps the
+    event loop free and still uses several cores. Submissions beyond
+    ``max_pending`` (running + queued) are rejected with HashingQueueFull
+    instead of queueing without bound.
+    """
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._active = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix="password-hash",
+                    )
+        return self._executor
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run ``fn(*args)`` on the pool, or raise HashingQueueFull."""
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise HashingQueueFull()
+            self._pending += 1
+        submitted = time.perf_counter()
+
+        def job() -> T:
+            waited = time.perf_counter() - submitted
+            with self._lock:
+                self._active += 1
+                self.wait_seconds_total += waited
+                if waited > self.wait_seconds_max:
+                    self.wait_seconds_max = waited
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self._active -= 1
+                    self.completed += 1
+
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), job)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of queue depth and wait-time counters."""
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "active": self._active,
+                "queued": self._pending - self._active,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "wait_seconds_total": self.wait_seconds_total,
+                "wait_seconds_max": self.wait_seconds_max,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+password_hash_pool = PasswordHashPool(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
+
+# Bulk imports hash whole batches at once; their own pool leaves
+# password_hash_pool free for interactive logins
+bulk_hash_pool = PasswordHashPool(
+    max_workers=settings.BULK_IMPORT_HASH_WORKERS,
+    max_pending=settings.BULK_IMPORT_BATCH_SIZE,
+)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against a hash on the hashing pool."""
+    with phase("bcrypt"):
+        return await password_hash_pool.run(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """Generate a password hash on the hashing pool."""
+    with phase("bcrypt"):
+        return await password_hash_pool.run(get_password_hash, password)
+
+# Long claim name -> short name used in compact tokens
+COMPACT_CLAIM_NAMES = {"role": "rol", "tenant_id": "tid"}
+
+# Registered claims the HS256 fast path leaves to python-jose to validate
+_JOSE_VALIDATED_CLAIMS = frozenset(("nbf", "aud", "iss", "jti", "at_hash"))
+
+def _b64encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+def _b64decode(data: bytes) -> bytes:
+    return base64.urlsafe_b64decode(data + b"=" * (-len(data) % 4))
+
+def _json_dumps(value: Dict[str, Any]) -> bytes:
+    # Same serialization python-jose uses, so tokens are byte-identical
+    return json.dumps(value, separators=(",", ":")).encode()
+
+
+class TokenCodec:
+    """
+    Access token encoder/decoder with the per-call setup done once.
+
+    The signing key object, header segment and default lifetime are built at
+    construction. HS256 tokens are signed and verified with hmac directly;
+    anything the fast path does not handle goes through python-jose. With a
+    key ring, tokens are signed asymmetrically and carry a ``kid`` header.
+    """
+    # JWKS served when tokens are signed with a shared secret
+    EMPTY_JWKS = b'{"keys":[]}'
+
+    def __init__(
+        self,
+        secret_key: Optional[str],
+        algorithm: str,
+        expire_minutes: int,
+        keyring: Optional[SigningKeyRing] = None,
+    ):
+        self.algorithm = algorithm
+        self.expires_delta = timedelta(minutes=int(expire_minutes))
+        self._expires_seconds = int(self.expires_delta.total_seconds())
+        self.keyring = keyring
+        self.fast_path = keyring is None and algorithm == "HS256"
+        if keyring is not None:
+            self._key = keyring.signing_key
+            self._headers = {"kid": keyring.active_kid}
+            self.jwks_bytes = keyring.jwks_bytes
+        else:
+            self._key = jwk.construct(secret_key, algorithm)
+            self._headers = None
+            self.jwks_bytes = self.EMPTY_JWKS
+        self.jwks_etag = '"%s"' % hashlib.sha256(self.jwks_bytes).hexdigest()[:32]
+        if self.fast_path:
+            self._mac = hmac.new(secret_key.encode(), digestmod=hashlib.sha256)
+            self._header = _b64encode(json.dumps(
+                {"alg": algorithm, "typ": "JWT"}, separators=(",", ":"), sort_keys=True
+            ).encode())
+
+    def encode(self, data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
+        """Sign ``data`` with exp and iat claims added."""
+        now = time.time()
+        lifetime = int(expires_delta.total_seconds()) if expires_delta else self._expires_seconds
+        # iat keeps sub-second precision so a token issued right after a
+        # revocation, within the same second, is not caught by it
+        claims = dict(data, exp=int(now) + lifetime, iat=now)
+        if not self.fast_path:
+            return jwt.encode(claims, self._key, algorithm=self.algorithm, headers=self._headers)
+        signing_input = self._header + b"." + _b64encode(_json_dumps(claims))
+        mac = self._mac.copy()
+        mac.update(signing_input)
+        return (signing_input + b"." + _b64encode(mac.digest())).decode()
+
+    def decode(self, token: str) -> Dict[str, Any]:
+        """
+        Verify ``token`` and return its claims.
+
+        Raises:
+            ExpiredSignatureError: If the token has expired
+            JWTError: If the token is invalid
+        """
+        if self.fast_path:
+            payload = self._decode_hs256(token)
+            if payload is not None:
+                return payload
+        if self.keyring is not None:
+            key = self.keyring.verification_key(jwt.get_unverified_header(token).get("kid"))
+            if key is None:
+                raise JWTError("Unknown signing key")
+            return jwt.decode(token, key, algorithms=[self.algorithm])
+        return jwt.decode(token, self._key, algorithms=[self.algorithm])
+
+    def _decode_hs256(self, token: str) -> Optional[Dict[str, Any]]:
+        # Returns None when the token should take the python-jose path
+        try:
+            header, claims, signature = token.encode("ascii").split(b".")
+        except (UnicodeEncodeError, ValueError):
+            raise JWTError("Not enough segments")
+        if header != self._header:
+            return None
+        mac = self._mac.copy()
+        mac.update(header + b"." + claims)
+        try:
+            valid = hmac.compare_digest(mac.digest(), _b64decode(signature))
+            if not valid:
+                raise JWTError("Signature verification failed.")
+            payload = json.loads(_b64decode(claims))
+        except (binascii.Error, ValueError):
+            raise JWTError("Invalid payload string")
+        if (
+            not isinstance(payload, dict)
+            or not isinstance(payload.get("exp"), int)
+            or not isinstance(payload.get("iat", 0), (int, float))
+            or not isinstance(payload.get("sub", ""), str)
+            or not _JOSE_VALIDATED_CLAIMS.isdisjoint(payload)
+        ):
+            return None
+        if payload["exp"] < int(time.time()):
+            raise ExpiredSignatureError("Signature has expired.")
+        return payload
+
+
+@functools.lru_cache(maxsize=None)
+def get_token_codec() -> TokenCodec:
+    """Token codec for the configured key; built on first use or at startup."""
+    keyring = None
+    if settings.ALGORITHM in ASYMMETRIC_ALGORITHMS:
+        keyring = SigningKeyRing.from_directory(
+            settings.JWT_SIGNING_KEYS_DIR,
+            settings.ALGORITHM,
+            settings.JWT_ACTIVE_KID,
+        )
+    return TokenCodec(
+        settings.SECRET_KEY,
+        settings.ALGORITHM,
+        settings.ACCESS_TOKEN_EXPIRE_MINUTES,
+        keyring=keyring,
+    )
+
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     """
     Create a JWT access token.
@@ -28,32 +290,56 @@ def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta]
     Returns:
         The encoded JWT token as a string
     """
-    to_encode = data.copy()
-    
-    # Set expiration time using timezone-aware datetime
-    if expires_delta:
-        expire = datetime.now(timezone.utc) + expires_delta
-    else:
-        expire = datetime.now(timezone.utc) + timedelta(
-            minutes=int(settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-        )
-    
-    # Add expiration time to token payload
-    to_encode.update({"exp": expire})
-    
-    # Create JWT token
-    encoded_jwt = jwt.encode(
-        to_encode, 
-        settings.SECRET_KEY, 
-        algorithm=settings.ALGORITHM
-    )
-    
-    return encoded_jwt
+    with phase("jwt-encode"):
+        return get_token_codec().encode(data, expires_delta)
+
+def access_token_claims(user: Any) -> Dict[str, Any]:
+    """
+    Claims minted into a user's access token.
+
+    With JWT_COMPACT_CLAIMS the email is dropped and role/tenant_id use
+    short names; decode_token expands them again.
+    """
+    if settings.JWT_COMPACT_CLAIMS:
+        return {"sub": str(user.id), "rol": user.role, "tid": user.tenant_id}
+    return {
+        "sub": str(user.id),
+        "email": user.email,
+        "tenant_id": user.tenant_id,
+        "role": user.role
+    }
+
+def expand_claims(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Rename compact claims to their long names in place."""
+    for name, short in COMPACT_CLAIM_NAMES.items():
+        if short in payload:
+            payload[name] = payload.pop(short)
+    return payload
+
+def generate_refresh_token() -> str:
+    """Generate an opaque refresh token."""
+    return secrets.token_urlsafe(32)
+
+def hash_refresh_token(token: str) -> str:
+    """Storage key for a refresh token: HMAC-SHA256 under REFRESH_TOKEN_SECRET."""
+    return hmac.new(
+        settings.REFRESH_TOKEN_SECRET.encode(), token.encode(), hashlib.sha256
+    ).hexdigest()
+
+# Payloads of tokens that already passed signature verification, keyed by
+# token digest. Entries never outlive the token's own exp claim.
+token_cache = TTLCache(
+    max_size=settings.TOKEN_CACHE_MAX_SIZE,
+    ttl_seconds=settings.TOKEN_CACHE_TTL_SECONDS,
+)
 
 def decode_token(token: str) -> Dict[str, Any]:
     """
     Decode and verify a JWT token.
     
+    Verified payloads are cached, so a token presented again before it
+    expires skips base64/JSON decoding and the signature check.
+    
     Args:
         token: The JWT token to decode
     
@@ -63,9 +349,24 @@ def decode_token(token: str) -> Dict[str, Any]:
     Raises:
         JWTError: If the token is invalid
     """
-    payload = jwt.decode(
-        token, 
-        settings.SECRET_KEY, 
-        algorithms=[settings.ALGORITHM]
-    )
-    return payload
\ No newline at end of file
+    key = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(key)
+    if payload is None:
+        payload = expand_claims(get_token_codec().decode(token))
+        exp = payload.get("exp")
+        token_cache.set(key, payload, ttl=exp - time.time() if exp is not None else None)
+    # Hand out a copy so callers cannot alter the cached claims
+    return dict(payload)
+
+# Access tokens revoked before their expiry (deactivation, password change)
+revocation_list = TokenRevocationList(
+    max_token_age_seconds=int(settings.ACCESS_TOKEN_EXPIRE_MINUTES or 0) * 60
+)
+
+def revoke_user_tokens(user_id: int, at: Optional[float] = None) -> None:
+    """
+    Reject every access token issued to ``user_id`` before ``at`` (default
+    now) in this worker. Other workers pick it up from token_revocations;
+    see crud/token_revocation.py.
+    """
+    revocation_list.revoke_user(user_id, at)
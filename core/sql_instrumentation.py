@@ -0,0 +1,115 @@
+# core/sql_instrumentation.py
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+slow_query_logger = logging.getLogger(__name__ + ".slow")
+
+# Placeholder lists of any length collapse to one shape, so
+# "IN (?, ?)" and "IN (?, ?, ?)" count as the same statement
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:\?|%s|\$\d+|:\w+)(?:\s*,\s*(?:\?|%s|\$\d+|:\w+))+\s*\)")
+
+
+def statement_shape(statement: str) -> str:
+    """Normalize a statement so repeated executions compare equal."""
+    return _PLACEHOLDER_LIST.sub("(...)", " ".join(statement.split()))
+
+
+class RequestQueryStats:
+    """SQL statements executed while handling one request."""
+    __slots__ = ("count", "total_seconds", "shapes")
+
+    def __init__(self):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.shapes: Counter = Counter()
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.total_seconds += seconds
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statement shapes executed at least ``threshold`` times."""
+        return [(shape, n) for shape, n in self.shapes.most_common() if n >= threshold]
+
+
+_request_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar(
+    "request_query_stats", default=None
+)
+
+def current_query_stats() -> Optional[RequestQueryStats]:
+    """Stats for the request being handled, if any."""
+    return _request_stats.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    seconds = time.perf_counter() - conn.info["query_start_time"].pop()
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.record(statement, seconds)
+    if seconds * 1000 >= settings.SQL_SLOW_QUERY_MS:
+        slow_query_logger.warning("slow query (%.1f ms): %s", seconds * 1000, statement_shape(statement))
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Time every statement run on ``engine``.
+
+    Pass ``AsyncEngine.sync_engine`` for async engines; the hooks run inside
+    the greenlet that shares the calling task's context.
+    """
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class SQLInstrumentationMiddleware:
+    """
+    Collect per-request SQL counts and timings.
+
+    Repeated statement shapes are logged as likely N+1 patterns. With
+    SQL_DEBUG_HEADERS on, the totals are also returned as response headers.
+    """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats()
+        token = _request_stats.set(stats)
+        threshold = settings.SQL_N_PLUS_ONE_THRESHOLD
+
+        async def send_with_stats(message: Message) -> None:
+            if message["type"] == "http.response.start" and settings.SQL_DEBUG_HEADERS:
+                headers = MutableHeaders(scope=message)
+                headers.append("X-SQL-Query-Count", str(stats.count))
+                headers.append("X-SQL-Query-Time-Ms", f"{stats.total_seconds * 1000:.2f}")
+                headers.append("X-SQL-Repeated-Statements", str(len(stats.repeated(threshold))))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            _request_stats.reset(token)
+            for shape, n in stats.repeated(threshold):
+                logger.warning(
+                    "possible N+1: %s %s ran %d times: %s",
+                    scope["method"], scope["path"], n, shape,
+                )
@@ -0,0 +1,178 @@
+# core/timing.py
+import logging
+import random
+import time
+from contextlib import nullcontext
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from fastapi.responses import JSONResponse
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.config import settings
+from core.sql_instrumentation import current_query_stats
+
+logger = logging.getLogger(__name__)
+
+_NOT_SAMPLED = nullcontext()
+
+
+class RequestTimings:
+    """
+    Time spent per named phase while handling one request.
+
+    Phases can nest or overlap (a user lookup includes its SQL), so they
+    are not expected to add up to the total. Updates are not locked; sync
+    dependencies run in the threadpool, and an occasional lost update
+    there is acceptable for diagnostics.
+    """
+    __slots__ = ("phases", "started")
+
+    def __init__(self):
+        # name -> [total seconds, count]
+        self.phases: Dict[str, List[float]] = {}
+        self.started = time.perf_counter()
+
+    def add(self, name: str, seconds: float) -> None:
+        entry = self.phases.get(name)
+        if entry is None:
+            self.phases[name] = [seconds, 1]
+        else:
+            entry[0] += seconds
+            entry[1] += 1
+
+_request_timings: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def current_timings() -> Optional[RequestTimings]:
+    """Timings of the current request, or None when it isn't sampled."""
+    return _request_timings.get()
+
+
+class _Phase:
+    __slots__ = ("timings", "name", "started")
+
+    def __init__(self, timings: RequestTimings, name: str):
+        self.timings = timings
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc) -> None:
+        self.timings.add(self.name, time.perf_counter() - self.started)
+
+
+def phase(name: str):
+    """
+    Context manager that adds the time spent in its block to phase ``name``
+    of the current request, e.g. ``with phase("jwt"): ...``.
+
+    Outside a sampled request it is a shared no-op, so instrumented code
+    costs one context variable lookup.
+    """
+    timings = _request_timings.get()
+    if timings is None:
+        return _NOT_SAMPLED
+    return _Phase(timings, name)
+
+
+def record(name: str, seconds: float) -> None:
+    """Add an already measured duration to phase ``name``."""
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.add(name, seconds)
+
+
+class TimedJSONResponse(JSONResponse):
+    """
+    JSONResponse that times its encoding as the "serialize" phase.
+
+    Rendering starts once the endpoint has returned and FastAPI has
+    validated and jsonable_encoder()-ed its result, so the time up to
+    that point is recorded as the "app" phase. Set it as the app's
+    default_response_class.
+    """
+    def render(self, content) -> bytes:
+        timings = _request_timings.get()
+        if timings is None:
+            return super().render(content)
+        if "app" not in timings.phases:
+            timings.add("app", time.perf_counter() - timings.started)
+        with _Phase(timings, "serialize"):
+            return super().render(content)
+
+
+def server_timing_header(timings: RequestTimings, total: float) -> str:
+    entries = [
+        f'{name};dur={seconds * 1000:.2f}' + (f';desc="x{int(count)}"' if count > 1 else "")
+        for name, (seconds, count) in timings.phases.items()
+    ]
+    stats = current_query_stats()
+    if stats is not None and stats.count:
+        entries.append(f'db;dur={stats.total_seconds * 1000:.2f};desc="{stats.count} queries"')
+    entries.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(entries)
+
+
+class ServerTimingMiddleware:
+    """
+    Break sampled requests down into phases.
+
+    A SERVER_TIMING_SAMPLE_RATE share of requests (0 to 1) collects
+    phase() timings; for those a ``Server-Timing`` header is added (with
+    SERVER_TIMING_HEADER) and one structured log line written (with
+    SERVER_TIMING_LOG). "total" is the time until the response headers.
+    "app" is the time until TimedJSONResponse starts encoding, or until
+    the headers for other responses; "serialize" is the encoding itself.
+
+    Add it before SQLInstrumentationMiddleware so that it runs inside the
+    SQL stats context and can report query time as the "db" phase.
+    """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        rate = settings.SERVER_TIMING_SAMPLE_RATE
+        if scope["type"] != "http" or rate <= 0 or (rate < 1 and random.random() >= rate):
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _request_timings.set(timings)
+        started = timings.started
+        header = None
+        status = None
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal header, status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                elapsed = time.perf_counter() - started
+                if "app" not in timings.phases:
+                    timings.add("app", elapsed)
+                header = server_timing_header(timings, elapsed)
+                if settings.SERVER_TIMING_HEADER:
+                    MutableHeaders(scope=message).append("Server-Timing", header)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_timings.reset(token)
+            if settings.SERVER_TIMING_LOG:
+                logger.info(
+                    "%s %s %s server-timing: %s",
+                    scope["method"], scope["path"], status, header,
+                    extra={
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "status": status,
+                        "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+                        "phases_ms": {
+                            name: round(seconds * 1000, 2)
+                            for name, (seconds, _) in timings.phases.items()
+                        },
+                    },
+                )
@@ -0,0 +1,169 @@
+# core/traffic_capture.py
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qsl
+
+from jose import JWTError
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.config import settings
+from core.security import decode_token
+
+
+def principal_class(scope: Scope) -> str:
+    """
+    Role claim of the request's bearer token; "anonymous" without an
+    Authorization header and "invalid" when the token does not verify.
+    """
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() != "bearer" or not token:
+                return "invalid"
+            try:
+                # Cached, so the endpoint's own decode of this token is free
+                return str(decode_token(token).get("role") or "invalid")
+            except JWTError:
+                return "invalid"
+    return "anonymous"
+
+
+class TrafficCapture:
+    """
+    Appends one JSON object per line to a size-rotated file.
+
+    Lines are queued to a writer thread, so requests never wait on disk.
+    Nothing is written until start() is called.
+
+    RotatingFileHandler only works within one process: two processes on
+    the same file would rotate it under each other. So with several
+    workers, start(per_process=True) gives each one its own file, named
+    with its pid (traffic.<pid>.ndjson). replay.py merges the files by
+    timestamp.
+    """
+    def __init__(self, path: str, max_bytes: int, backups: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        # File actually being written; differs from path per process
+        self.file_path = path
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._listener: Optional[logging.handlers.QueueListener] = None
+
+    @property
+    def running(self) -> bool:
+        return self._listener is not None
+
+    def start(self, per_process: bool = False) -> None:
+        if self._listener is not None:
+            return
+        if per_process:
+            root, ext = os.path.splitext(self.path)
+            self.file_path = f"{root}.{os.getpid()}{ext}"
+        else:
+            self.file_path = self.path
+        handler = logging.handlers.RotatingFileHandler(
+            self.file_path, maxBytes=self.max_bytes, backupCount=self.backups, encoding="utf-8"
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        self._listener = logging.handlers.QueueListener(self._queue, handler)
+        self._listener.start()
+
+    def stop(self) -> None:
+        """Write out everything queued so far and close the file."""
+        if self._listener is None:
+            return
+        self._listener.stop()
+        for handler in self._listener.handlers:
+            handler.close()
+        self._listener = None
+
+    def write(self, entry: Dict[str, Any]) -> None:
+        if self._listener is not None:
+            line = json.dumps(entry, separators=(",", ":"))
+            self._queue.put_nowait(logging.makeLogRecord({"msg": line}))
+
+
+traffic_capture = TrafficCapture(
+    settings.TRAFFIC_CAPTURE_PATH,
+    max_bytes=settings.TRAFFIC_CAPTURE_MAX_BYTES,
+    backups=settings.TRAFFIC_CAPTURE_BACKUPS,
+)
+
+
+class TrafficCaptureMiddleware:
+    """
+    Record request metadata for benchmarks/replay.py.
+
+    With TRAFFIC_CAPTURE_ENABLED, a TRAFFIC_CAPTURE_SAMPLE_RATE share of
+    requests is written to traffic_capture as: start time, method, route
+    template, query parameter names, principal class (token role,
+    "anonymous" or "invalid"), request and response body sizes, status
+    and duration. Paths, query values, headers and bodies are never
+    recorded.
+
+    Add it last so that it is the outermost middleware and its duration
+    covers the whole stack.
+    """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        rate = settings.TRAFFIC_CAPTURE_SAMPLE_RATE
+        if (
+            scope["type"] != "http"
+            or not settings.TRAFFIC_CAPTURE_ENABLED
+            or not traffic_capture.running
+            or rate <= 0
+            or (rate < 1 and random.random() >= rate)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        timestamp = time.time()
+        started = time.perf_counter()
+        principal = principal_class(scope)
+        request_bytes = 0
+        response_bytes = 0
+        status = 500
+
+        async def receive_counting() -> Message:
+            nonlocal request_bytes
+            message = await receive()
+            if message["type"] == "http.request":
+                request_bytes += len(message.get("body", b""))
+            return message
+
+        async def send_counting(message: Message) -> None:
+            nonlocal response_bytes, status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive_counting, send_counting)
+        finally:
+            # The router stores the matched route in the scope; raw paths
+            # could carry identifiers
+            route = scope.get("route")
+            traffic_capture.write({
+                "ts": round(timestamp, 6),
+                "method": scope["method"],
+                "route": getattr(route, "path", "unmatched"),
+                "query": sorted({
+                    key for key, _ in parse_qsl(scope.get("query_string", b"").decode("latin-1"), keep_blank_values=True)
+                }),
+                "principal": principal,
+                "request_bytes": request_bytes,
+                "response_bytes": response_bytes,
+                "status": status,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+            })
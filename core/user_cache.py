@@ -0,0 +1,67 @@
+# core/user_cache.py
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+from core.cache import TTLCache
+from core.config import settings
+from core.database import mark_recent_write
+from core.security import revoke_user_tokens
+from crud.token_revocation import record_revocation
+from models.user import User
+
+# Principals of recently seen users, keyed by user id
+user_cache = TTLCache(
+    max_size=settings.USER_CACHE_MAX_SIZE,
+    ttl_seconds=settings.USER_CACHE_TTL_SECONDS,
+)
+
+def invalidate_user(user_id: int) -> None:
+    """
+    Drop a cached principal.
+
+    The ORM hooks below cover changes made through the session; call this
+    directly after bulk ``update()``/``delete()`` statements or raw SQL.
+    """
+    user_cache.invalidate(int(user_id))
+
+# Session.info key: user id -> not-before time of a token revocation the
+# change wrote, or None
+_PENDING = "user_cache_pending"
+
+def _pending(target: User) -> dict:
+    return object_session(target).info.setdefault(_PENDING, {})
+
+def _revoke(connection, target: User) -> None:
+    pending = _pending(target)
+    if pending.get(target.id) is None:
+        pending[target.id] = record_revocation(connection, target.id)
+
+# The mapper hooks run at flush time, before the change is committed; a
+# reader could still load and cache the old row until then, and the
+# transaction may roll back. So they only note the user on the session
+# and the cache and revocation list are updated after commit. Revocations
+# are written to token_revocations in the same transaction, which is how
+# the other workers learn about them.
+@event.listens_for(User, "after_update")
+def _user_updated(mapper, connection, target: User) -> None:
+    # Deactivation also ends any sessions still holding access tokens
+    if False in inspect(target).attrs.is_active.history.added:
+        _revoke(connection, target)
+    else:
+        _pending(target).setdefault(target.id, None)
+
+@event.listens_for(User, "after_delete")
+def _user_deleted(mapper, connection, target: User) -> None:
+    _revoke(connection, target)
+
+@event.listens_for(Session, "after_commit")
+def _apply_user_changes(session: Session) -> None:
+    for user_id, not_before in session.info.pop(_PENDING, {}).items():
+        invalidate_user(user_id)
+        mark_recent_write(("user", user_id))
+        if not_before is not None:
+            revoke_user_tokens(user_id, at=not_before)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_user_changes(session: Session) -> None:
+    session.info.pop(_PENDING, None)
@@ -0,0 +1,204 @@
+# core/user_import.py
+import asyncio
+import codecs
+import csv
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from core.database import mark_recent_write
+from core.security import HashingQueueFull, bulk_hash_pool, get_password_hash
+from crud.user import create_users, normalize_email
+from schemas.user.bulk_import import UserImportError, UserImportResponse, UserImportRow
+
+NDJSON_TYPES = ("application/x-ndjson", "application/jsonl", "application/json-seq")
+CSV_TYPES = ("text/csv",)
+
+# (row number, parsed fields or None, parse error or None)
+ParsedRow = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+
+class UnsupportedImportFormat(ValueError):
+    pass
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decode a UTF-8 byte stream (BOM optional) into lines as it arrives."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    buffer = ""
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer.rstrip("\r")
+
+
+async def _parse_ndjson(lines: AsyncIterator[str]) -> AsyncIterator[ParsedRow]:
+    row = 0
+    async for line in lines:
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            fields = json.loads(line)
+        except ValueError as e:
+            yield row, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(fields, dict):
+            yield row, None, "Expected a JSON object"
+            continue
+        yield row, fields, None
+
+
+async def _parse_csv(lines: AsyncIterator[str]) -> AsyncIterator[ParsedRow]:
+    # One record per line; quoted fields may not contain newlines
+    header: Optional[List[str]] = None
+    row = 0
+    async for line in lines:
+        if not line.strip():
+            continue
+        values = next(csv.reader([line]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        row += 1
+        if len(values) != len(header):
+            yield row, None, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+        # Empty cells mean "not given" so optional fields keep their defaults
+        yield row, {k: v for k, v in zip(header, values) if v != ""}, None
+
+
+def parse_rows(chunks: AsyncIterator[bytes], content_type: str) -> AsyncIterator[ParsedRow]:
+    """
+    Stream rows out of an NDJSON or CSV upload.
+
+    Raises:
+        UnsupportedImportFormat: For any other content type
+    """
+    media_type = content_type.split(";")[0].strip().lower()
+    if media_type in NDJSON_TYPES:
+        return _parse_ndjson(iter_lines(chunks))
+    if media_type in CSV_TYPES:
+        return _parse_csv(iter_lines(chunks))
+    raise UnsupportedImportFormat(media_type)
+
+
+def _validation_message(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc']) or 'row'}: {err['msg']}"
+        for err in exc.errors()
+    )
+
+
+async def _hash_password(slots: asyncio.Semaphore, password: str) -> str:
+    async with slots:
+        return await bulk_hash_pool.run(get_password_hash, password)
+
+
+async def _import_batch(
+    db: AsyncSession,
+    tenant_id: int,
+    batch: List[Tuple[int, UserImportRow]],
+    errors: List[UserImportError],
+    slots: asyncio.Semaphore,
+) -> int:
+    # bcrypt releases the GIL, so the batch hashes in parallel; ``slots``
+    # keeps this import's share of the pool to one job per worker
+    hashes = await asyncio.gather(
+        *(_hash_password(slots, row.password) for _, row in batch), return_exceptions=True
+    )
+    for result in hashes:
+        if isinstance(result, BaseException) and not isinstance(result, HashingQueueFull):
+            raise result
+    if any(isinstance(result, HashingQueueFull) for result in hashes):
+        # Earlier batches are already committed; report this one as failed
+        # so the caller knows exactly which rows to send again
+        for row_no, row in batch:
+            errors.append(UserImportError(
+                row=row_no, email=normalize_email(row.email), error="Server busy, retry this row"
+            ))
+        return 0
+    values = [
+        {
+            "email": normalize_email(row.email),
+            "phone_number": row.phone_number,
+            "password": hashed,
+            "tenant_id": tenant_id,
+            "role": row.role,
+            "is_active": True,
+        }
+        for (_, row), hashed in zip(batch, hashes)
+    ]
+    created = await create_users(db, values)
+    await db.commit()
+    # Imported accounts are often read back (listed, logged into) right away
+    for email in created:
+        mark_recent_write(("email", email))
+    if created:
+        mark_recent_write(("tenant", tenant_id))
+
+    for (row_no, _), value in zip(batch, values):
+        if value["email"] not in created:
+            errors.append(UserImportError(row=row_no, email=value["email"], error="Email already registered"))
+    return len(created)
+
+
+async def import_users(
+    db: AsyncSession,
+    tenant_id: int,
+    rows: AsyncIterator[ParsedRow],
+    batch_size: Optional[int] = None,
+) -> UserImportResponse:
+    """
+    Create users for one tenant from parsed import rows.
+
+    Rows are validated one by one and inserted in batches, each committed
+    on its own. A bad row is reported in ``errors`` and never aborts the
+    rest of the import. Hashing waits for this import's own slots on
+    bulk_hash_pool, so concurrent imports queue rather than overflow it.
+    """
+    batch_size = batch_size or settings.BULK_IMPORT_BATCH_SIZE
+    slots = asyncio.Semaphore(bulk_hash_pool.max_workers)
+    errors: List[UserImportError] = []
+    created = 0
+    batch: List[Tuple[int, UserImportRow]] = []
+    seen = set()
+
+    async for row_no, fields, parse_error in rows:
+        if parse_error is not None:
+            errors.append(UserImportError(row=row_no, error=parse_error))
+            continue
+        try:
+            row = UserImportRow.model_validate(fields)
+        except ValidationError as e:
+            email = fields.get("email")
+            errors.append(UserImportError(
+                row=row_no, email=email if isinstance(email, str) else None, error=_validation_message(e)
+            ))
+            continue
+
+        # Later duplicates in the same file would be skipped by ON CONFLICT
+        # without telling which row won; report them here instead
+        email = normalize_email(row.email)
+        if email in seen:
+            errors.append(UserImportError(row=row_no, email=email, error="Duplicate email in import"))
+            continue
+        seen.add(email)
+
+        batch.append((row_no, row))
+        if len(batch) >= batch_size:
+            created += await _import_batch(db, tenant_id, batch, errors, slots)
+            batch = []
+
+    if batch:
+        created += await _import_batch(db, tenant_id, batch, errors, slots)
+
+    errors.sort(key=lambda err: err.row)
+    return UserImportResponse(created=created, failed=len(errors), errors=errors)
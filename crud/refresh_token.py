@@ -0,0 +1,126 @@
+# crud/refresh_token.py
+import secrets
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+
+from sqlalchemy import delete, select, update, bindparam
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from core.security import generate_refresh_token, hash_refresh_token, revoke_user_tokens
+from crud.token_revocation import record_revocation
+from models.refresh_token import RefreshToken
+from models.user import User
+
+
+class InvalidRefreshToken(Exception):
+    """Raised when a refresh token is unknown, expired, revoked or reused."""
+
+
+# Token and its user in one indexed read on refresh_tokens.token_hash
+token_with_user_stmt = (
+    select(RefreshToken, User)
+    .join(User, User.id == RefreshToken.user_id)
+    .where(RefreshToken.token_hash == bindparam("token_hash"))
+)
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes even for timezone-aware columns
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+async def issue_refresh_token(
+    db: AsyncSession, user_id: int, family_id: Optional[str] = None
+) -> str:
+    """
+    Store a new refresh token for ``user_id`` and return it.
+
+    The caller commits. Omitting ``family_id`` starts a new family (a login).
+    """
+    token = generate_refresh_token()
+    db.add(RefreshToken(
+        token_hash=hash_refresh_token(token),
+        user_id=user_id,
+        family_id=family_id or secrets.token_hex(16),
+        expires_at=datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+    ))
+    return token
+
+async def revoke_refresh_family(db: AsyncSession, family_id: str) -> None:
+    """Revoke every live token in a family. The caller commits."""
+    await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.now(timezone.utc))
+    )
+
+async def rotate_refresh_token(db: AsyncSession, token: str) -> Tuple[User, str]:
+    """
+    Exchange a refresh token for its successor.
+
+    Each token is single use. Presenting one that was already used means it
+    leaked: the whole family is revoked along with the user's access tokens.
+
+    Raises:
+        InvalidRefreshToken: If the token cannot be exchanged
+    """
+    result = await db.execute(token_with_user_stmt, {"token_hash": hash_refresh_token(token)})
+    row = result.first()
+    if row is None:
+        raise InvalidRefreshToken()
+    stored, user = row
+
+    if stored.revoked_at is not None:
+        raise InvalidRefreshToken()
+    now = datetime.now(timezone.utc)
+    if _as_utc(stored.expires_at) <= now or not user.is_active:
+        raise InvalidRefreshToken()
+
+    # Conditional update so two concurrent refreshes cannot both succeed
+    marked = await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.id == stored.id, RefreshToken.used_at.is_(None))
+        .values(used_at=now)
+    )
+    if marked.rowcount != 1:
+        await revoke_refresh_family(db, stored.family_id)
+        not_before = await db.run_sync(lambda session: record_revocation(session.connection(), user.id))
+        await db.commit()
+        revoke_user_tokens(user.id, at=not_before)
+        raise InvalidRefreshToken()
+
+    new_token = await issue_refresh_token(db, user.id, family_id=stored.family_id)
+    await db.commit()
+    return user, new_token
+
+async def purge_refresh_tokens(
+    db: AsyncSession, grace: Optional[timedelta] = None, batch_size: int = 1000
+) -> int:
+    """
+    Delete refresh tokens that expired more than ``grace`` ago, committing
+    every ``batch_size`` rows so no long-running delete holds locks.
+
+    Used and revoked tokens are kept until then as well; reuse detection
+    needs them for as long as their family can still be exchanged.
+
+    Returns:
+        The number of tokens deleted
+    """
+    if grace is None:
+        grace = timedelta(days=settings.REFRESH_TOKEN_PURGE_GRACE_DAYS)
+    cutoff = datetime.now(timezone.utc) - grace
+    deleted = 0
+    while True:
+        batch = (
+            select(RefreshToken.id)
+            .where(RefreshToken.expires_at < cutoff)
+            .limit(batch_size)
+            .scalar_subquery()
+        )
+        result = await db.execute(
+            delete(RefreshToken).where(RefreshToken.id.in_(batch)),
+            execution_options={"synchronize_session": False},
+        )
+        await db.commit()
+        deleted += result.rowcount
+        if result.rowcount < batch_size:
+            return deleted
@@ -0,0 +1,39 @@
+# crud/token_revocation.py
+import time
+from typing import List, Optional, Tuple
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.token_revocation import TokenRevocation
+
+
+def record_revocation(connection: Connection, user_id: int, at: Optional[float] = None) -> float:
+    """
+    Insert a revocation of ``user_id``'s access tokens on ``connection``,
+    inside the caller's transaction, and return its not-before time.
+
+    Takes a sync connection so the ORM flush hooks can call it; async
+    callers go through ``AsyncSession.run_sync``.
+    """
+    not_before = time.time() if at is None else at
+    connection.execute(insert(TokenRevocation).values(user_id=user_id, not_before=not_before))
+    return not_before
+
+async def revocations_since(db: AsyncSession, since: float) -> List[Tuple[int, float]]:
+    """(user_id, not_before) of every revocation at or after ``since``."""
+    result = await db.execute(
+        select(TokenRevocation.user_id, TokenRevocation.not_before)
+        .where(TokenRevocation.not_before >= since)
+    )
+    return [tuple(row) for row in result]
+
+async def purge_token_revocations(db: AsyncSession, before: float) -> int:
+    """
+    Delete revocations older than ``before``; no token they could match is
+    still valid. Returns the number deleted.
+    """
+    result = await db.execute(delete(TokenRevocation).where(TokenRevocation.not_before < before))
+    await db.commit()
+    return result.rowcount
@@ -0,0 +1,141 @@
+# crud/user.py
+from typing import Any, Dict, List, Optional, Set
+from sqlalchemy import Select, func, select, bindparam
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.user import User
+
+# Hot lookups render the same SQL text on every call (the statement below is
+# built once; Session.get caches its own). That text is what asyncpg keys its
+# per-connection prepared statement cache on, so after the first use on a
+# connection these skip parse/plan entirely.
+#
+# lower() on both sides matches the unique functional index on lower(email),
+# so the lookup is one index probe whatever casing the client sends.
+user_by_email_stmt = select(User).where(func.lower(User.email) == func.lower(bindparam("email")))
+
+def normalize_email(email: str) -> str:
+    """Canonical form emails are stored in: trimmed and lower-cased."""
+    return email.strip().lower()
+
+async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
+    """Fetch a user by email, ignoring case."""
+    result = await db.execute(user_by_email_stmt, {"email": email.strip()})
+    return result.scalars().first()
+
+async def get_user_by_id(db: AsyncSession, user_id: int) -> Optional[User]:
+    """
+    Fetch a user by primary key.
+
+    Goes through Session.get so a row already loaded in this session (e.g.
+    by get_current_user) is returned from the identity map without SQL.
+    """
+    return await db.get(User, user_id)
+
+# Dialects whose INSERT supports ON CONFLICT ... DO NOTHING ... RETURNING
+_UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+async def create_user(db: AsyncSession, **values) -> Optional[int]:
+    """
+    Insert a user unless the email is already registered.
+
+    On PostgreSQL and SQLite this is one atomic
+    ``INSERT ... ON CONFLICT (lower(email)) DO NOTHING RETURNING id``, so
+    concurrent signups for the same address cannot both succeed. Other
+    dialects fall back to SELECT then INSERT. The caller commits.
+
+    Returns:
+        The new user's id, or None if the email is taken
+    """
+    insert = _UPSERT_INSERTS.get(db.get_bind().dialect.name)
+    if insert is None:
+        if await get_user_by_email(db, values["email"]) is not None:
+            return None
+        user = User(**values)
+        db.add(user)
+        await db.flush()
+        return user.id
+
+    stmt = (
+        insert(User)
+        .values(**values)
+        .on_conflict_do_nothing(index_elements=[func.lower(User.email)])
+        .returning(User.id)
+    )
+    result = await db.execute(stmt)
+    return result.scalar_one_or_none()
+
+async def create_users(db: AsyncSession, rows: List[Dict[str, Any]]) -> Set[str]:
+    """
+    Insert many users, skipping emails that are already registered.
+
+    All rows must have the same keys. On PostgreSQL and SQLite this is one
+    executemany of INSERT ... ON CONFLICT DO NOTHING RETURNING email, which
+    SQLAlchemy sends as multi-row INSERTs ("insertmanyvalues"). The caller
+    commits.
+
+    Returns:
+        The emails that were inserted
+    """
+    if not rows:
+        return set()
+    insert = _UPSERT_INSERTS.get(db.get_bind().dialect.name)
+    if insert is None:
+        created = set()
+        for row in rows:
+            if await create_user(db, **row) is not None:
+                created.add(row["email"])
+        return created
+
+    stmt = (
+        insert(User)
+        .on_conflict_do_nothing(index_elements=[func.lower(User.email)])
+        .returning(User.email)
+    )
+    result = await db.execute(stmt, rows)
+    return set(result.scalars().all())
+
+def tenant_users_stmt(tenant_id: int, *criteria) -> Select:
+    """
+    SELECT the users of one tenant.
+
+    tenant_id is always the leading condition so the (tenant_id, ...)
+    indexes on users serve the query instead of a scan of every tenant.
+    Further conditions are ANDed after it.
+    """
+    return select(User).where(User.tenant_id == tenant_id, *criteria)
+
+async def get_tenant_user_by_email(db: AsyncSession, tenant_id: int, email: str) -> Optional[User]:
+    """Fetch a user by email within one tenant."""
+    result = await db.execute(tenant_users_stmt(tenant_id, User.email == normalize_email(email)))
+    return result.scalars().first()
+
+async def list_tenant_users(
+    db: AsyncSession,
+    tenant_id: int,
+    role: Optional[str] = None,
+    active_only: bool = True,
+    after_id: Optional[int] = None,
+    limit: int = 100,
+) -> List[User]:
+    """
+    List a tenant's users in id order, one page at a time.
+
+    Args:
+        role: Only users with this role
+        active_only: Skip deactivated users; matches the partial index
+        after_id: Last id of the previous page (keyset pagination)
+        limit: Page size
+    """
+    criteria = []
+    if role is not None:
+        criteria.append(User.role == role)
+    if active_only:
+        # Same expression as the partial index predicate so the planner uses it
+        criteria.append(User.is_active.is_(True))
+    if after_id is not None:
+        criteria.append(User.id > after_id)
+    stmt = tenant_users_stmt(tenant_id, *criteria).order_by(User.id).limit(limit)
+    result = await db.execute(stmt)
+    return list(result.scalars().all())
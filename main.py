@@ -1,16 +1,36 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from routers.v1 import ping
+from fastapi.responses import JSONResponse
+from routers.v1 import ping, metrics
 from core.config import settings
+from core.security import HashingQueueFull
+from core.rate_limit import RateLimitExceeded, retry_after_header
+from core.sql_instrumentation import SQLInstrumentationMiddleware
+from core.metrics import MetricsMiddleware
+from core.timing import ServerTimingMiddleware, TimedJSONResponse
+from core.traffic_capture import TrafficCaptureMiddleware
+from core import lifecycle
 from routers.v1.auth import router as auth_router
 from routers.v1.user import router as user_router
+from routers.v1.admin import router as admin_router
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm pools, bcrypt and caches before reporting ready; drain on the way out
+    await lifecycle.startup(app)
+    yield
+    await lifecycle.shutdown(app)
 
 app = FastAPI(
+    lifespan=lifespan,
     title="OrderMe Pre-Order Platform",
     description="API for managing pre-orders with user authentication, product management, and order processing",
     version="0.1.0",
     docs_url="/api/v1/docs",
     redoc_url="/api/v1/redoc",
+    # Times JSON encoding for Server-Timing's "serialize" phase
+    default_response_class=TimedJSONResponse,
 )
 
 
@@ -26,16 +46,49 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Server-Timing phases for sampled requests; inside the SQL middleware so
+# it can report query time
+app.add_middleware(ServerTimingMiddleware)
+
+# Per-request SQL counts and timings
+app.add_middleware(SQLInstrumentationMiddleware)
+
+# Route latency and in-flight requests for /metrics
+app.add_middleware(MetricsMiddleware)
+
+# Optional request metadata capture for benchmarks/replay.py; outermost so
+# its timings cover every other middleware
+app.add_middleware(TrafficCaptureMiddleware)
+
 # Include routers
 app.include_router(ping.router, prefix="/api/v1")
+app.include_router(metrics.router)
 app.include_router(auth_router, prefix="/auth")
 app.include_router(user_router, prefix="/api/v1")
+app.include_router(admin_router, prefix="/api/v1")
   # Add the auth router
 # Include additional routers as you develop them
 # app.include_router(users.router, prefix="/api/v1")
 # app.include_router(products.router, prefix="/api/v1")
 # app.include_router(orders.router, prefix="/api/v1")
 
+@app.exception_handler(HashingQueueFull)
+async def hashing_queue_full_handler(request: Request, exc: HashingQueueFull):
+    # Shed load instead of queueing more bcrypt work behind a full pool
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server is busy, please retry shortly"},
+        headers={"Retry-After": "1"},
+    )
+
+@app.exception_handler(RateLimitExceeded)
+async def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "Too many login attempts, please retry later"},
+        headers={"Retry-After": retry_after_header(exc)},
+    )
+
 @app.get("/", tags=["Root"])
 async def root():
     return {
@@ -44,5 +97,6 @@ async def root():
     }
 
 if __name__ == "__main__":
+    # Development server; use server.py in production
     import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
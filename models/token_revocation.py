@@ -0,0 +1,16 @@
+# models/token_revocation.py
+from sqlalchemy import Column, Float, Integer
+from core.database import Base
+
+class TokenRevocation(Base):
+    __tablename__ = "token_revocations"
+
+    id = Column(Integer, primary_key=True)
+    # No foreign key: the revocation must outlive a deleted user
+    user_id = Column(Integer, nullable=False)
+    # time.time() of the revocation; access tokens with an earlier iat are
+    # rejected. Indexed for the workers' polling and the purge.
+    not_before = Column(Float, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<TokenRevocation user={self.user_id} not_before={self.not_before}>"
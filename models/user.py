@@ -1,5 +1,5 @@
 # models/user.py
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from core.database import Base
@@ -17,6 +17,23 @@ class User(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    # Tenant-scoped queries lead with tenant_id so these apply; see
+    # crud.user.tenant_users_stmt
+    __table_args__ = (
+        # Emails are unique ignoring case; serves the login lookup
+        Index("uq_users_email_lower", func.lower(email), unique=True),
+        Index("ix_users_tenant_id_email", "tenant_id", "email"),
+        Index("ix_users_tenant_id_role", "tenant_id", "role"),
+        # Only active users, in id order for keyset pagination
+        Index(
+            "ix_users_tenant_id_active",
+            "tenant_id",
+            "id",
+            postgresql_where=is_active.is_(True),
+            sqlite_where=is_active.is_(True),
+        ),
+    )
+
     # Relationships can be added when you implement order models
     # orders = relationship("Order", back_populates="user")
     
@@ -0,0 +1,2 @@
+# routers/v1/admin/__init__.py
+from routers.v1.admin.router import router
\ No newline at end of file
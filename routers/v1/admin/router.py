@@ -0,0 +1,47 @@
+# routers/v1/admin/router.py
+from fastapi import APIRouter, Depends
+from core.config import settings
+from core.database import engine, get_async_engine, max_connections_per_worker, pool_status, replica_engines
+from core.deps import RoleChecker
+from models.user import User
+
+# Create the router
+router = APIRouter(tags=["Admin"])
+
+allow_platform_admin = RoleChecker(["platform_admin"])
+
+@router.get("/admin/db/pool", summary="Database connection pool status")
+async def db_pool(current_user: User = Depends(allow_platform_admin)):
+    """
+    Live pool occupancy and checkout waits for this worker, plus the
+    connection budget all workers on the host can open at most.
+    """
+    engines = {
+        "async": pool_status(get_async_engine().sync_engine.pool),
+        "sync": pool_status(engine.pool),
+    }
+    for i, replica in enumerate(replica_engines):
+        engines[f"replica-{i}"] = pool_status(replica.sync_engine.pool)
+    for status in engines.values():
+        if status.get("checkout_count"):
+            status["wait_seconds_avg"] = status["wait_seconds_total"] / status["checkout_count"]
+
+    # Each replica is a separate server, so only the primary's two engines add up
+    per_worker = max_connections_per_worker()
+    return {
+        "config": {
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pool_timeout": settings.DB_POOL_TIMEOUT,
+            "pool_recycle": settings.DB_POOL_RECYCLE,
+            "pool_use_lifo": settings.DB_POOL_USE_LIFO,
+            "pre_ping": settings.DB_POOL_PRE_PING,
+            "liveness_interval": settings.DB_POOL_LIVENESS_INTERVAL,
+            "replicas": len(replica_engines),
+            "replica_selection": settings.DB_REPLICA_SELECTION,
+        },
+        "engines": engines,
+        "workers": settings.WEB_CONCURRENCY,
+        "max_connections_per_worker": per_worker,
+        "max_connections_all_workers": per_worker * settings.WEB_CONCURRENCY,
+    }
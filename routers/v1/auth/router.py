@@ -1,51 +1,85 @@
-from fastapi import APIRouter, HTTPException, Depends, status
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends, Request, Response, status
 from fastapi.security import OAuth2PasswordRequestForm
-from core.database import get_db
-from sqlalchemy.orm import Session
-from models.user import User
+from core.database import (
+    get_async_db, get_async_read_db, mark_recent_write, reads_from_replica, use_primary, written_recently,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+from crud.user import create_user, get_user_by_email, normalize_email
 from schemas.auth.signup import SignupRequest, SignupResponse
 from schemas.auth.login import LoginRequest, LoginResponse
-from schemas.auth.token import Token
-from core.security import verify_password, create_access_token, get_password_hash
+from schemas.auth.token import Token, RefreshRequest
+from models.user import User
+from crud.refresh_token import issue_refresh_token, rotate_refresh_token, InvalidRefreshToken
+from core.config import settings
+from core.rate_limit import login_throttle
+from core.security import verify_password_async, create_access_token, access_token_claims, get_password_hash_async, get_token_codec
 
 router = APIRouter(tags=["Authentication"])
 
+def client_ip(request: Request) -> Optional[str]:
+    # Run uvicorn with --proxy-headers behind a proxy so this is the real client
+    return request.client.host if request.client else None
+
+async def find_login_user(db: AsyncSession, email: str) -> Optional[User]:
+    """
+    Load the user logging in, from a replica when one is configured.
+
+    A replica miss is retried on the primary: the account may have just
+    been created through another worker, whose read-your-writes window
+    this process cannot see.
+    """
+    if written_recently(("email", normalize_email(email))):
+        use_primary(db)
+    user = await get_user_by_email(db, email)
+    if user is None and reads_from_replica(db):
+        use_primary(db)
+        user = await get_user_by_email(db, email)
+    return user
+
 @router.post("/signup/", response_model=SignupResponse, status_code=201)
-async def signup(request: SignupRequest, db: Session = Depends(get_db)):
-    # Check if user already exists
-    existing_user = db.query(User).filter(User.email == request.email).first()
-    if existing_user:
-        raise HTTPException(status_code=400, detail="Email already registered")
-    
+async def signup(request: SignupRequest, db: AsyncSession = Depends(get_async_db)):
     # Hash the password
-    hashed_password = get_password_hash(request.password)
+    hashed_password = await get_password_hash_async(request.password)
     
-    # Create new user
-    new_user = User(
-        email=request.email, 
+    # Create the user in one statement; None means the email is taken
+    email = normalize_email(request.email)
+    user_id = await create_user(
+        db,
+        email=email,
         phone_number=request.phone_number,
-        password=hashed_password, 
+        password=hashed_password,
         tenant_id=request.tenant_id,
         role="customer"  # Default role is customer
     )
+    if user_id is None:
+        raise HTTPException(status_code=400, detail="Email already registered")
+    await db.commit()
     
-    # Add user to the database
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    # Replicas may not have the new row yet; read it from the primary for a while
+    mark_recent_write(("email", email))
+    mark_recent_write(("user", user_id))
+    mark_recent_write(("tenant", request.tenant_id))
     
     return {"msg": "User created successfully"}
 
 @router.post("/login", response_model=LoginResponse)
-async def login(request: LoginRequest, db: Session = Depends(get_db)):
+async def login(
+    request: LoginRequest,
+    http_request: Request,
+    db: AsyncSession = Depends(get_async_read_db)
+):
     """
     Authenticate a user and return a JWT token
     """
+    # Throttle before any query or bcrypt work
+    await login_throttle.check(email=normalize_email(request.email), ip=client_ip(http_request))
+    
     # Find the user by email
-    user = db.query(User).filter(User.email == request.email).first()
+    user = await find_login_user(db, request.email)
     
     # Check if user exists and password is correct
-    if not user or not verify_password(request.password, user.password):
+    if not user or not await verify_password_async(request.password, user.password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials"
@@ -59,13 +93,9 @@ async def login(request: LoginRequest, db: Session = Depends(get_db)):
         )
     
     # Create access token
-    token_data = {
-        "sub": str(user.id),
-        "email": user.email,
-        "tenant_id": user.tenant_id,
-        "role": user.role
-    }
-    access_token = create_access_token(token_data)
+    access_token = create_access_token(access_token_claims(user))
+    refresh_token = await issue_refresh_token(db, user.id)
+    await db.commit()
     
     # Return token with user info
     return {
@@ -73,22 +103,27 @@ async def login(request: LoginRequest, db: Session = Depends(get_db)):
         "token_type": "bearer",
         "user_id": user.id,
         "role": user.role,
-        "tenant_id": user.tenant_id
+        "tenant_id": user.tenant_id,
+        "refresh_token": refresh_token
     }
 
 @router.post("/token", response_model=Token)
 async def login_for_access_token(
+    http_request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
     OAuth2 compatible token endpoint
     """
+    # Throttle before any query or bcrypt work
+    await login_throttle.check(email=normalize_email(form_data.username), ip=client_ip(http_request))
+    
     # Find the user by email/username
-    user = db.query(User).filter(User.email == form_data.username).first()
+    user = await find_login_user(db, form_data.username)
     
     # Check if user exists and password is correct
-    if not user or not verify_password(form_data.password, user.password):
+    if not user or not await verify_password_async(form_data.password, user.password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials",
@@ -104,16 +139,47 @@ async def login_for_access_token(
         )
     
     # Create access token
-    token_data = {
-        "sub": str(user.id),
-        "email": user.email,
-        "tenant_id": user.tenant_id,
-        "role": user.role
-    }
-    access_token = create_access_token(token_data)
+    access_token = create_access_token(access_token_claims(user))
+    refresh_token = await issue_refresh_token(db, user.id)
+    await db.commit()
     
     # Return token
     return {
         "access_token": access_token,
-        "token_type": "bearer"
-    }
\ No newline at end of file
+        "token_type": "bearer",
+        "refresh_token": refresh_token
+    }
+
+@router.post("/refresh", response_model=Token)
+async def refresh_access_token(request: RefreshRequest, db: AsyncSession = Depends(get_async_db)):
+    """
+    Exchange a refresh token for a new access token and refresh token
+    """
+    try:
+        user, refresh_token = await rotate_refresh_token(db, request.refresh_token)
+    except InvalidRefreshToken:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    return {
+        "access_token": create_access_token(access_token_claims(user)),
+        "token_type": "bearer",
+        "refresh_token": refresh_token
+    }
+
+@router.get("/.well-known/jwks.json", include_in_schema=False)
+async def jwks(request: Request):
+    """
+    Public keys for verifying access tokens without calling this API
+    """
+    codec = get_token_codec()
+    headers = {
+        "Cache-Control": f"public, max-age={settings.JWKS_CACHE_MAX_AGE}",
+        "ETag": codec.jwks_etag,
+    }
+    if request.headers.get("if-none-match") == codec.jwks_etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=codec.jwks_bytes, media_type="application/json", headers=headers)
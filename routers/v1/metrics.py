@@ -0,0 +1,27 @@
+import hmac
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import Response
+
+from core.config import settings
+from core.metrics import registry, CONTENT_TYPE
+
+router = APIRouter()
+
+def require_metrics_access(request: Request) -> None:
+    """
+    Only scrapers may read /metrics: it exposes pool, cache, hashing queue
+    and per-route data. See METRICS_ALLOWED_IPS and METRICS_TOKEN.
+    """
+    if request.client is not None and request.client.host in settings.METRICS_ALLOWED_IPS:
+        return
+    token = settings.METRICS_TOKEN
+    scheme, _, credentials = request.headers.get("Authorization", "").partition(" ")
+    if token and scheme.lower() == "bearer" and hmac.compare_digest(credentials.encode(), token.encode()):
+        return
+    raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed to read metrics")
+
+@router.get("/metrics", include_in_schema=False, dependencies=[Depends(require_metrics_access)])
+async def metrics():
+    # Rendered on the event loop thread, which is the only writer
+    return Response(content=registry.render(), media_type=CONTENT_TYPE)
@@ -1,7 +1,16 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
 
 router = APIRouter()
 
 @router.get("/ping")
 def ping():
     return {"message": "pong"}
+
+
+@router.get("/ready")
+def ready(request: Request):
+    # Ready once startup warmup has finished, and no longer while shutting down
+    if getattr(request.app.state, "ready", False):
+        return {"status": "ready"}
+    return JSONResponse(status_code=503, content={"status": "starting"})
@@ -1,7 +1,13 @@
 # routers/v1/user/router.py
-from fastapi import APIRouter, Depends
-from core.deps import get_current_active_user, RoleChecker
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.database import get_async_db, get_async_read_db, use_primary, written_recently
+from core.deps import get_current_user_record, RoleChecker
+from core.user_import import UnsupportedImportFormat, import_users, parse_rows
+from crud.user import list_tenant_users
 from models.user import User
+from schemas.user.bulk_import import UserImportResponse
 
 # Create the router
 router = APIRouter(tags=["Users"])
@@ -13,7 +19,7 @@ allow_platform_admin = RoleChecker(["platform_admin"])
 allow_admin = RoleChecker(["tenant_admin", "platform_admin"])
 
 @router.get("/users/me", summary="Get current user information")
-async def get_user_me(current_user: User = Depends(get_current_active_user)):
+async def get_user_me(current_user: User = Depends(get_current_user_record)):
     """
     Get information about the currently authenticated user.
     """
@@ -36,4 +42,83 @@ async def customer_only(current_user: User = Depends(allow_customer)):
     """
     This endpoint is only accessible to customers
     """
-    return {"message": "You have customer access", "user_id": current_user.id}
\ No newline at end of file
+    return {"message": "You have customer access", "user_id": current_user.id}
+
+def resolve_tenant(current_user: User, tenant_id: Optional[int]) -> int:
+    """
+    Tenant an admin endpoint acts on: always the caller's own for tenant
+    admins, and the explicitly requested one for platform admins.
+    """
+    if current_user.role == "tenant_admin":
+        if tenant_id is not None and tenant_id != current_user.tenant_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Insufficient permissions"
+            )
+        return current_user.tenant_id
+    if tenant_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="tenant_id is required"
+        )
+    return tenant_id
+
+@router.get("/users", summary="List users of a tenant")
+async def list_users(
+    tenant_id: Optional[int] = Query(None, description="Required for platform admins"),
+    role: Optional[str] = None,
+    include_inactive: bool = False,
+    after_id: Optional[int] = Query(None, description="Last id of the previous page"),
+    limit: int = Query(100, ge=1, le=500),
+    current_user: User = Depends(allow_admin),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """
+    List users of the caller's tenant, or of any tenant for platform admins.
+    Pages are ordered by id; pass the returned next_after_id to continue.
+    """
+    tenant_id = resolve_tenant(current_user, tenant_id)
+    # Users just signed up or imported may not be on the replica yet
+    if written_recently(("tenant", tenant_id)):
+        use_primary(db)
+    users = await list_tenant_users(
+        db, tenant_id, role=role, active_only=not include_inactive, after_id=after_id, limit=limit
+    )
+    return {
+        "users": [
+            {
+                "id": user.id,
+                "email": user.email,
+                "tenant_id": user.tenant_id,
+                "role": user.role,
+                "is_active": user.is_active,
+            }
+            for user in users
+        ],
+        "next_after_id": users[-1].id if len(users) == limit else None,
+    }
+
+@router.post("/users/import", response_model=UserImportResponse, summary="Bulk import users into a tenant")
+async def bulk_import_users(
+    request: Request,
+    tenant_id: Optional[int] = Query(None, description="Required for platform admins"),
+    current_user: User = Depends(allow_admin),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Create users from an NDJSON (application/x-ndjson) or CSV (text/csv)
+    body with email, password and optional phone_number and role fields.
+
+    The body is read as a stream and inserted in batches; rows that fail
+    validation or whose email is taken are listed in ``errors`` while the
+    rest are still created.
+    """
+    tenant_id = resolve_tenant(current_user, tenant_id)
+    try:
+        rows = parse_rows(request.stream(), request.headers.get("content-type", ""))
+    except UnsupportedImportFormat:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Send application/x-ndjson or text/csv"
+        )
+    return await import_users(db, tenant_id, rows)
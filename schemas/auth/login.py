@@ -1,5 +1,6 @@
 # schemas/auth/login.py
 from pydantic import BaseModel, EmailStr, Field
+from typing import Optional
 
 class LoginRequest(BaseModel):
     email: EmailStr
@@ -10,4 +11,5 @@ class LoginResponse(BaseModel):
     token_type: str = "bearer"
     user_id: int
     role: str
-    tenant_id: int
\ No newline at end of file
+    tenant_id: int
+    refresh_token: Optional[str] = None
\ No newline at end of file
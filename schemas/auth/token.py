@@ -5,7 +5,11 @@ from typing import Optional
 class Token(BaseModel):
     access_token: str
     token_type: str = "bearer"
+    refresh_token: Optional[str] = None
 
 class TokenPayload(BaseModel):
     sub: Optional[str] = None
-    tenant_id: Optional[int] = None
\ No newline at end of file
+    tenant_id: Optional[int] = None
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
@@ -0,0 +1,19 @@
+# schemas/user/bulk_import.py
+from pydantic import BaseModel, EmailStr, Field
+from typing import List, Literal, Optional
+
+class UserImportRow(BaseModel):
+    email: EmailStr
+    password: str = Field(..., min_length=1)
+    phone_number: Optional[str] = None
+    role: Literal["customer", "tenant_admin"] = "customer"
+
+class UserImportError(BaseModel):
+    row: int  # 1-based, not counting a CSV header
+    email: Optional[str] = None
+    error: str
+
+class UserImportResponse(BaseModel):
+    created: int
+    failed: int
+    errors: List[UserImportError]
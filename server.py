@@ -0,0 +1,242 @@
+# server.py
+"""
+Production entry point: ``python server.py [--workers N] [--port 8000]``.
+
+The master process imports the app once, freezes the garbage collector so
+everything imported stays shared copy-on-write, and forks the workers.
+Each worker runs uvicorn (uvloop and httptools when installed) on the
+master's listening socket, or with --reuse-port on its own SO_REUSEPORT
+socket so the kernel balances connections. The master restarts workers
+that exit, including ones recycled after --max-requests, and forwards
+SIGTERM/SIGINT so workers finish open requests before exiting.
+
+``python main.py`` remains the single-process, auto-reloading dev server.
+"""
+import argparse
+import gc
+import logging
+import os
+import random
+import signal
+import socket
+import sys
+import time
+from typing import Dict, List, Optional
+
+import uvicorn
+
+from core.config import settings
+from core.database import max_connections_per_worker, reset_pools_after_fork
+
+logger = logging.getLogger("server")
+
+# A worker that dies sooner than this after starting is crashing, not
+# being recycled; wait before forking its replacement
+MIN_WORKER_LIFETIME = 1.0
+
+
+def auto_workers(
+    cpu_count: Optional[int] = None,
+    db_max_connections: int = 0,
+    connections_per_worker: int = 1,
+) -> int:
+    """
+    One worker per CPU, but no more than the database connection budget
+    allows when ``db_max_connections`` is set.
+    """
+    workers = cpu_count or os.cpu_count() or 1
+    if db_max_connections > 0:
+        workers = min(workers, db_max_connections // connections_per_worker)
+    return max(1, workers)
+
+
+def event_loop() -> str:
+    try:
+        import uvloop  # noqa: F401
+    except ImportError:
+        return "asyncio"
+    return "uvloop"
+
+
+def http_protocol() -> str:
+    try:
+        import httptools  # noqa: F401
+    except ImportError:
+        return "h11"
+    return "httptools"
+
+
+def bind_socket(host: str, port: int, reuse_port: bool = False, backlog: int = 2048) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def worker_config(app, options: argparse.Namespace) -> uvicorn.Config:
+    """uvicorn settings for one worker; each draws its own recycle jitter."""
+    limit_max_requests = None
+    if options.max_requests > 0:
+        limit_max_requests = options.max_requests + random.randint(0, options.max_requests_jitter)
+    return uvicorn.Config(
+        app,
+        loop=event_loop(),
+        http=http_protocol(),
+        lifespan="on",
+        limit_max_requests=limit_max_requests,
+        timeout_graceful_shutdown=options.graceful_timeout,
+        proxy_headers=True,
+        forwarded_allow_ips=options.forwarded_allow_ips,
+        access_log=options.access_log,
+        log_level=options.log_level,
+    )
+
+
+def run_worker(app, options: argparse.Namespace, sock: Optional[socket.socket]) -> None:
+    # Forked children share the parent's random state; reseed so recycle
+    # jitter differs between workers
+    random.seed()
+    reset_pools_after_fork()
+    for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+        signal.signal(signum, signal.SIG_DFL)
+    if sock is None:
+        sock = bind_socket(options.host, options.port, reuse_port=True)
+    # uvicorn handles SIGTERM itself: stop accepting, finish open requests
+    # (our lifespan then drains and disposes the engines)
+    uvicorn.Server(worker_config(app, options)).run(sockets=[sock])
+
+
+class Supervisor:
+    """Forks the workers and keeps ``workers`` of them running until stopped."""
+
+    def __init__(self, app, options: argparse.Namespace, sock: Optional[socket.socket]):
+        self.app = app
+        self.options = options
+        self.sock = sock
+        self.workers: Dict[int, float] = {}  # pid -> start time
+        self.stopping = False
+
+    def spawn(self) -> None:
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                run_worker(self.app, self.options, self.sock)
+            except BaseException:
+                logger.exception("Worker failed")
+                code = 1
+            finally:
+                os._exit(code)
+        self.workers[pid] = time.monotonic()
+        logger.info("Started worker %d", pid)
+
+    def stop(self, signum, frame) -> None:
+        self.stopping = True
+
+    def reap(self) -> List[int]:
+        """Collect exited workers without blocking; returns their pids."""
+        exited = []
+        while self.workers:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                break
+            started = self.workers.pop(pid, None)
+            if started is None:
+                continue
+            exited.append(pid)
+            code = os.waitstatus_to_exitcode(status)
+            if not self.stopping:
+                if code == 0:
+                    logger.info("Worker %d exited (recycled), replacing it", pid)
+                else:
+                    logger.warning("Worker %d exited with %d, replacing it", pid, code)
+                if time.monotonic() - started < MIN_WORKER_LIFETIME:
+                    time.sleep(MIN_WORKER_LIFETIME)
+        return exited
+
+    def shutdown(self) -> None:
+        """Forward SIGTERM, wait for graceful exit, then kill stragglers."""
+        for pid in self.workers:
+            os.kill(pid, signal.SIGTERM)
+        deadline = time.monotonic() + self.options.graceful_timeout + 5
+        while self.workers and time.monotonic() < deadline:
+            self.reap()
+            time.sleep(0.1)
+        for pid in list(self.workers):
+            logger.warning("Worker %d did not stop in time, killing it", pid)
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+            self.workers.pop(pid)
+
+    def run(self) -> None:
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        for _ in range(self.options.workers):
+            self.spawn()
+        while not self.stopping:
+            for _ in self.reap():
+                if not self.stopping:
+                    self.spawn()
+            time.sleep(0.2)
+        self.shutdown()
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the API with pre-forked uvicorn workers")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument(
+        "--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", "0")),
+        help="Worker processes (default: from CPUs and DB_MAX_CONNECTIONS)",
+    )
+    parser.add_argument(
+        "--reuse-port", action="store_true",
+        help="Give each worker its own SO_REUSEPORT socket instead of sharing one",
+    )
+    parser.add_argument("--max-requests", type=int, default=settings.WEB_MAX_REQUESTS)
+    parser.add_argument("--max-requests-jitter", type=int, default=settings.WEB_MAX_REQUESTS_JITTER)
+    parser.add_argument("--graceful-timeout", type=float, default=settings.WEB_GRACEFUL_TIMEOUT)
+    parser.add_argument("--forwarded-allow-ips", default=os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1"))
+    parser.add_argument("--no-access-log", dest="access_log", action="store_false")
+    parser.add_argument("--log-level", default="info")
+    options = parser.parse_args(argv)
+    if options.workers <= 0:
+        options.workers = auto_workers(
+            db_max_connections=settings.DB_MAX_CONNECTIONS,
+            connections_per_worker=max_connections_per_worker(),
+        )
+    return options
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    options = parse_args(argv)
+    logging.basicConfig(format="%(asctime)s %(name)s %(message)s")
+    logger.setLevel(options.log_level.upper())
+    # Reported by /api/v1/admin/db/pool for the connection budget
+    settings.WEB_CONCURRENCY = options.workers
+
+    # Preload: import everything once in the master, then freeze it so the
+    # workers' garbage collections don't touch (and un-share) those pages
+    from main import app
+    gc.collect()
+    gc.freeze()
+
+    sock = None if options.reuse_port else bind_socket(options.host, options.port)
+    logger.info(
+        "Serving on %s:%d with %d workers (loop=%s, http=%s%s)",
+        options.host, options.port, options.workers, event_loop(), http_protocol(),
+        ", SO_REUSEPORT" if options.reuse_port else "",
+    )
+    Supervisor(app, options, sock).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,26 @@
+# tests/admin/test_pool.py
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from core.security import create_access_token
+from models.user import User
+
+
+def auth_header(db: Session, role: str) -> dict:
+    user = User(email=f"{role}@example.com", password="x", tenant_id=1, role=role)
+    db.add(user)
+    db.commit()
+    token = create_access_token({"sub": str(user.id), "role": role, "tenant_id": 1})
+    return {"Authorization": f"Bearer {token}"}
+
+def test_pool_status_requires_platform_admin(client: TestClient, db: Session):
+    response = client.get("/api/v1/admin/db/pool", headers=auth_header(db, "tenant_admin"))
+    assert response.status_code == 403
+
+def test_pool_status(client: TestClient, db: Session):
+    response = client.get("/api/v1/admin/db/pool", headers=auth_header(db, "platform_admin"))
+    assert response.status_code == 200
+    data = response.json()
+    assert set(data["engines"]) == {"async", "sync"}
+    assert "checked_out" in data["engines"]["async"]
+    assert data["max_connections_all_workers"] == data["max_connections_per_worker"] * data["workers"]
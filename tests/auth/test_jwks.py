@@ -0,0 +1,32 @@
+# tests/auth/test_jwks.py
+import importlib
+
+import ecdsa
+from fastapi.testclient import TestClient
+
+from core.keys import SigningKeyRing
+from core.security import TokenCodec
+
+
+def test_jwks_empty_for_shared_secret(client: TestClient):
+    response = client.get("/auth/.well-known/jwks.json")
+    assert response.status_code == 200
+    assert response.json() == {"keys": []}
+    assert response.headers["Cache-Control"].startswith("public, max-age=")
+
+
+def test_jwks_serves_public_keys(client: TestClient, tmp_path, monkeypatch):
+    (tmp_path / "k1.pem").write_bytes(ecdsa.SigningKey.generate(curve=ecdsa.NIST256p).to_pem())
+    codec = TokenCodec(None, "ES256", 30, keyring=SigningKeyRing.from_directory(str(tmp_path), "ES256", "k1"))
+    # The package re-exports the APIRouter under the module's name
+    router_module = importlib.import_module("routers.v1.auth.router")
+    monkeypatch.setattr(router_module, "get_token_codec", lambda: codec)
+
+    response = client.get("/auth/.well-known/jwks.json")
+    assert response.status_code == 200
+    assert [key["kid"] for key in response.json()["keys"]] == ["k1"]
+
+    # Clients revalidating with the ETag get a 304
+    etag = response.headers["ETag"]
+    response = client.get("/auth/.well-known/jwks.json", headers={"If-None-Match": etag})
+    assert response.status_code == 304
@@ -10,7 +10,9 @@ from passlib.context import CryptContext
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
 
 from models.user import User
-from core.security import get_password_hash
+from core.security import get_password_hash, password_hash_pool
+from crud.user import user_by_email_stmt
+from sqlalchemy import text
 
 # Password context for hashing in tests
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -111,4 +113,64 @@ def test_login_nonexistent_user(client: TestClient):
     
     # Check response
     assert response.status_code == 401
-    assert response.json() == {"detail": "Invalid credentials"}
\ No newline at end of file
+    assert response.json() == {"detail": "Invalid credentials"}
+
+def test_login_rejected_when_hash_pool_full(client: TestClient, db: Session, monkeypatch):
+    hashed_password = get_password_hash("testpassword123")
+    db.add(User(email="busy@example.com", password=hashed_password, tenant_id=1))
+    db.commit()
+
+    # No room on the hashing pool: shed the request instead of queueing it
+    monkeypatch.setattr(password_hash_pool, "max_pending", 0)
+    response = client.post(
+        "/auth/login",
+        json={"email": "busy@example.com", "password": "testpassword123"},
+    )
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_login_ignores_email_case(client: TestClient, db: Session):
+    db.add(User(email="mixed@example.com", password=get_password_hash("testpassword123"), tenant_id=1))
+    db.commit()
+
+    response = client.post(
+        "/auth/login",
+        json={"email": "Mixed@Example.COM", "password": "testpassword123"},
+    )
+    assert response.status_code == 200
+
+    response = client.post(
+        "/auth/token",
+        data={"username": " MIXED@example.com ", "password": "testpassword123"},
+    )
+    assert response.status_code == 200
+
+def test_email_lookup_uses_lower_index(db: Session):
+    sql = user_by_email_stmt.compile(db.bind, compile_kwargs={"literal_binds": True}).string
+    sql = sql.replace("lower(:email)", "lower('A@example.com')")
+    plan = " ".join(row[-1] for row in db.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+    assert "uq_users_email_lower" in plan
+
+def test_login_is_throttled_before_any_work(client: TestClient, db: Session, monkeypatch):
+    from core.config import settings
+    from core.rate_limit import login_throttle
+    monkeypatch.setitem(login_throttle.limits, "email", (2, 60))
+    monkeypatch.setattr(settings, "SQL_DEBUG_HEADERS", True)
+    db.add(User(email="target@example.com", password=get_password_hash("right"), tenant_id=1))
+    db.commit()
+
+    for _ in range(2):
+        response = client.post("/auth/login", json={"email": "target@example.com", "password": "wrong"})
+        assert response.status_code == 401
+
+    hashed_before = password_hash_pool.stats()["completed"]
+    response = client.post("/auth/login", json={"email": "TARGET@example.com", "password": "right"})
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert response.headers["X-SQL-Query-Count"] == "0"
+    assert password_hash_pool.stats()["completed"] == hashed_before
+
+    response = client.post("/auth/token", data={"username": "target@example.com", "password": "right"})
+    assert response.status_code == 429
@@ -0,0 +1,113 @@
+# tests/auth/test_refresh.py
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from models.refresh_token import RefreshToken
+from models.token_revocation import TokenRevocation
+from models.user import User
+from core.security import get_password_hash
+from crud.refresh_token import purge_refresh_tokens
+
+
+def login(client: TestClient, db: Session) -> dict:
+    db.add(User(
+        email="refresh@example.com",
+        password=get_password_hash("testpassword123"),
+        tenant_id=1,
+        role="customer",
+        is_active=True
+    ))
+    db.commit()
+    response = client.post(
+        "/auth/login",
+        json={"email": "refresh@example.com", "password": "testpassword123"},
+    )
+    assert response.status_code == 200
+    return response.json()
+
+def refresh(client: TestClient, token: str):
+    return client.post("/auth/refresh", json={"refresh_token": token})
+
+def test_login_returns_refresh_token(client: TestClient, db: Session):
+    data = login(client, db)
+    assert data["refresh_token"]
+
+    # Only a hash is stored
+    stored = db.query(RefreshToken).one()
+    assert stored.token_hash != data["refresh_token"]
+
+def test_refresh_rotates_token(client: TestClient, db: Session):
+    data = login(client, db)
+
+    response = refresh(client, data["refresh_token"])
+    assert response.status_code == 200
+    rotated = response.json()
+    assert rotated["token_type"] == "bearer"
+    assert rotated["refresh_token"] != data["refresh_token"]
+
+    me = client.get("/api/v1/users/me", headers={"Authorization": f"Bearer {rotated['access_token']}"})
+    assert me.status_code == 200
+    assert me.json()["email"] == "refresh@example.com"
+
+    # The rotated token is good for exactly one more exchange
+    assert refresh(client, rotated["refresh_token"]).status_code == 200
+
+def test_reused_refresh_token_revokes_family(client: TestClient, db: Session):
+    data = login(client, db)
+    rotated = refresh(client, data["refresh_token"]).json()
+
+    response = refresh(client, data["refresh_token"])
+    assert response.status_code == 401
+    assert response.json() == {"detail": "Invalid refresh token"}
+
+    # Reuse means the family leaked: its newest token is dead too
+    assert refresh(client, rotated["refresh_token"]).status_code == 401
+    # So are its access tokens, in every worker
+    headers = {"Authorization": f"Bearer {rotated['access_token']}"}
+    assert client.get("/api/v1/users/me", headers=headers).status_code == 401
+    assert [r.user_id for r in db.query(TokenRevocation)] == [db.query(User).one().id]
+
+    # A login in the same second as the revocation is not caught by it
+    response = client.post("/auth/login", json={"email": "refresh@example.com", "password": "testpassword123"})
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    assert client.get("/api/v1/users/me", headers=headers).status_code == 200
+
+def test_unknown_refresh_token(client: TestClient):
+    assert refresh(client, "not-a-real-token").status_code == 401
+
+def test_expired_refresh_token(client: TestClient, db: Session):
+    data = login(client, db)
+    stored = db.query(RefreshToken).one()
+    stored.expires_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+    db.commit()
+
+    assert refresh(client, data["refresh_token"]).status_code == 401
+
+def test_purge_deletes_tokens_past_the_grace_period(client: TestClient, db: Session):
+    login(client, db)
+    user_id = db.query(User).one().id
+    now = datetime.now(timezone.utc)
+    db.add_all([
+        RefreshToken(token_hash="a" * 64, user_id=user_id, family_id="f1", expires_at=now - timedelta(days=8)),
+        RefreshToken(token_hash="b" * 64, user_id=user_id, family_id="f2", expires_at=now - timedelta(days=9)),
+        RefreshToken(token_hash="c" * 64, user_id=user_id, family_id="f3", expires_at=now - timedelta(days=1)),
+    ])
+    db.commit()
+
+    engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+
+    async def purge():
+        async with AsyncSession(engine) as session:
+            return await purge_refresh_tokens(session, grace=timedelta(days=7), batch_size=1)
+
+    assert asyncio.run(purge()) == 2
+    db.expire_all()
+    # The live login token and the one still inside the grace period remain
+    remaining = {t.family_id for t in db.query(RefreshToken)}
+    assert len(remaining) == 2
+    assert "f3" in remaining and not {"f1", "f2"} & remaining
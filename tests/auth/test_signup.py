@@ -6,6 +6,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../.
 
 from fastapi.testclient import TestClient
 from main import app
+from models.user import User
 
 def test_signup(client: TestClient):
     # Test the user signup with valid data
@@ -46,4 +47,41 @@ def test_signup_existing_user(client: TestClient):
     )
 
     assert response.status_code == 400
-    assert response.json() == {"detail": "Email already registered"}
\ No newline at end of file
+    assert response.json() == {"detail": "Email already registered"}
+
+def test_signup_normalizes_email(client: TestClient, db):
+    response = client.post(
+        "/auth/signup/",
+        json={"email": "New.User@Example.com", "password": "securepassword123", "tenant_id": 1},
+    )
+    assert response.status_code == 201
+    assert db.query(User.email).scalar() == "new.user@example.com"
+
+    # The same address in another casing is a duplicate
+    response = client.post(
+        "/auth/signup/",
+        json={"email": "NEW.USER@example.com", "password": "securepassword123", "tenant_id": 1},
+    )
+    assert response.status_code == 400
+
+def test_signup_is_a_single_statement(client: TestClient, monkeypatch):
+    from core.config import settings
+    monkeypatch.setattr(settings, "SQL_DEBUG_HEADERS", True)
+    payload = {"email": "once@example.com", "password": "securepassword123", "tenant_id": 1}
+
+    response = client.post("/auth/signup/", json=payload)
+    assert response.status_code == 201
+    assert response.headers["X-SQL-Query-Count"] == "1"
+
+    # A duplicate is detected by the same INSERT, not a prior SELECT
+    response = client.post("/auth/signup/", json=payload)
+    assert response.status_code == 400
+    assert response.headers["X-SQL-Query-Count"] == "1"
+
+def test_signup_without_upsert_support(client: TestClient, monkeypatch):
+    import crud.user
+    monkeypatch.setattr(crud.user, "_UPSERT_INSERTS", {})
+    payload = {"email": "fallback@example.com", "password": "securepassword123", "tenant_id": 1}
+
+    assert client.post("/auth/signup/", json=payload).status_code == 201
+    assert client.post("/auth/signup/", json=payload).status_code == 400
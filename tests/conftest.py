@@ -1,16 +1,30 @@
+import asyncio
 import sys
 import os
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool, StaticPool
 
 # Add the project root directory to Python's path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
+# No real database behind the app engines in tests to warm, purge or poll, and
+# one bcrypt warmup per TestClient would add up; tests/core/test_lifecycle.py
+# covers the warmup
+os.environ.setdefault("WARMUP_POOL_CONNECTIONS", "0")
+os.environ.setdefault("WARMUP_PASSWORD_HASHING", "false")
+os.environ.setdefault("REFRESH_TOKEN_PURGE_INTERVAL_SECONDS", "0")
+os.environ.setdefault("TOKEN_REVOCATION_POLL_SECONDS", "0")
+
 from main import app
-from core.database import Base, get_db
+from core.database import Base, get_db, get_async_db, get_async_read_db
+from core.rate_limit import login_throttle
+from core.security import revocation_list, token_cache
+from core.sql_instrumentation import instrument_engine
+from core.user_cache import user_cache
 
 # Create in-memory SQLite database for testing
 SQLALCHEMY_TEST_DATABASE_URL = "sqlite:///./test.db"
@@ -22,6 +36,25 @@ test_engine = create_engine(
 
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
 
+# Async engine on the same SQLite file for the async request path. NullPool
+# because TestClient runs each app instance on its own event loop.
+SQLALCHEMY_TEST_ASYNC_DATABASE_URL = "sqlite+aiosqlite:///./test.db"
+test_async_engine = create_async_engine(SQLALCHEMY_TEST_ASYNC_DATABASE_URL, poolclass=NullPool)
+instrument_engine(test_async_engine.sync_engine)
+
+TestingAsyncSessionLocal = async_sessionmaker(
+    test_async_engine, autoflush=False, expire_on_commit=False
+)
+
+@pytest.fixture(autouse=True)
+def reset_auth_state():
+    # Ids are reused across tests, so cached principals must not leak
+    yield
+    user_cache.clear()
+    token_cache.clear()
+    revocation_list.clear()
+    asyncio.run(login_throttle.reset())
+
 @pytest.fixture
 def db():
     # Create tables
@@ -46,7 +79,13 @@ def client(db):
         finally:
             pass
     
+    async def override_get_async_db():
+        async with TestingAsyncSessionLocal() as async_db:
+            yield async_db
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_async_read_db] = override_get_async_db
     
     with TestClient(app) as test_client:
         yield test_client
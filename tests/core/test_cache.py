@@ -0,0 +1,70 @@
+# tests/core/test_cache.py
+from core.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTTLCache:
+    def test_hit_and_miss(self):
+        cache = TTLCache(max_size=10, ttl_seconds=30)
+        assert cache.get("a") is None
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_ratio"] == 0.5
+
+    def test_entries_expire(self):
+        clock = FakeClock()
+        cache = TTLCache(max_size=10, ttl_seconds=30, clock=clock)
+        cache.set("a", 1)
+        cache.set("b", 2, ttl=5)
+
+        clock.now = 10
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+
+        clock.now = 31
+        assert cache.get("a") is None
+        assert cache.stats()["expirations"] == 2
+
+    def test_ttl_is_capped(self):
+        clock = FakeClock()
+        cache = TTLCache(max_size=10, ttl_seconds=30, clock=clock)
+        cache.set("a", 1, ttl=3600)
+        clock.now = 31
+        assert cache.get("a") is None
+
+    def test_least_recently_used_is_evicted(self):
+        cache = TTLCache(max_size=2, ttl_seconds=30)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.stats()["evictions"] == 1
+
+    def test_invalidate(self):
+        cache = TTLCache(max_size=10, ttl_seconds=30)
+        cache.set("a", 1)
+        assert cache.invalidate("a") is True
+        assert cache.invalidate("a") is False
+        assert cache.get("a") is None
+        assert cache.stats()["invalidations"] == 1
+
+    def test_disabled(self):
+        cache = TTLCache(max_size=10, ttl_seconds=0)
+        cache.set("a", 1)
+        assert cache.get("a") is None
+        assert len(cache) == 0
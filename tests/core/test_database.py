@@ -0,0 +1,168 @@
+# tests/core/test_database.py
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.pool import QueuePool
+
+import core.database as database
+from core.database import (
+    Base, ReplicaSelector, RoutingSession, install_idle_ping, mark_recent_write,
+    to_async_url, written_recently,
+)
+from models.user import User
+
+
+class TestAsyncUrl:
+    def test_postgres_uses_asyncpg(self):
+        assert to_async_url("postgresql://u:p@db:5432/app") == "postgresql+asyncpg://u:p@db:5432/app"
+        assert to_async_url("postgresql+psycopg2://u:p@db/app") == "postgresql+asyncpg://u:p@db/app"
+
+    def test_async_url_is_kept(self):
+        assert to_async_url("postgresql+asyncpg://u:p@db/app") == "postgresql+asyncpg://u:p@db/app"
+
+    def test_sqlite_uses_aiosqlite(self):
+        assert to_async_url("sqlite:///./test.db") == "sqlite+aiosqlite:///./test.db"
+
+
+class TestIdlePing:
+    def make_engine(self, tmp_path, interval):
+        engine = create_engine(f"sqlite:///{tmp_path}/ping.db", poolclass=QueuePool, pool_size=1)
+        install_idle_ping(engine, interval)
+        return engine
+
+    def test_idle_connection_is_pinged_and_replaced(self, tmp_path, monkeypatch):
+        engine = self.make_engine(tmp_path, interval=0)
+        with engine.connect() as conn:
+            stale = conn.connection.dbapi_connection
+
+        pings = []
+        def ping(dbapi_connection):
+            pings.append(dbapi_connection)
+            if dbapi_connection is stale:
+                raise OSError("server closed the connection")
+            return True
+        monkeypatch.setattr(engine.dialect, "do_ping", ping)
+
+        # The failed ping discards the stale connection; a fresh one is used
+        with engine.connect() as conn:
+            assert conn.connection.dbapi_connection is not stale
+        assert pings == [stale]
+
+    def test_recently_used_connection_is_not_pinged(self, tmp_path, monkeypatch):
+        engine = self.make_engine(tmp_path, interval=60)
+        with engine.connect():
+            pass
+        pings = []
+        monkeypatch.setattr(engine.dialect, "do_ping", lambda c: pings.append(c) or True)
+        with engine.connect():
+            pass
+        assert pings == []
+
+
+def fake_engine(name, checked_out=0):
+    pool = SimpleNamespace(checkedout=lambda: checked_out)
+    return SimpleNamespace(name=name, sync_engine=SimpleNamespace(pool=pool))
+
+
+class TestReplicaSelector:
+    def test_round_robin(self):
+        a, b = fake_engine("a"), fake_engine("b")
+        selector = ReplicaSelector([a, b])
+        assert [selector.choose() for _ in range(4)] == [a, b, a, b]
+
+    def test_least_connections(self):
+        busy, idle = fake_engine("busy", checked_out=3), fake_engine("idle", checked_out=1)
+        assert ReplicaSelector([busy, idle], "least_connections").choose() is idle
+
+    def test_unknown_strategy(self):
+        with pytest.raises(ValueError):
+            ReplicaSelector([fake_engine("a")], "random")
+
+
+class TestRoutingSession:
+    @pytest.fixture
+    def engines(self, tmp_path):
+        primary = create_engine(f"sqlite:///{tmp_path}/primary.db")
+        replica = create_engine(f"sqlite:///{tmp_path}/replica.db")
+        for engine in (primary, replica):
+            Base.metadata.create_all(bind=engine, tables=[User.__table__])
+        yield primary, replica
+        primary.dispose()
+        replica.dispose()
+
+    def emails(self, engine):
+        with engine.connect() as conn:
+            return conn.scalars(select(User.email)).all()
+
+    def user(self, email):
+        return User(email=email, password="x", tenant_id=1, role="customer")
+
+    def test_reads_use_replica_and_writes_use_primary(self, engines):
+        primary, replica = engines
+        with RoutingSession(bind=primary, info={"replica": replica}) as session:
+            session.add(self.user("flushed@example.com"))
+            session.execute(insert(User).values(email="dml@example.com", password="x", tenant_id=1, role="customer"))
+            session.commit()
+            # The replica has not caught up, so reads there see nothing
+            assert session.scalars(select(User)).all() == []
+
+        assert sorted(self.emails(primary)) == ["dml@example.com", "flushed@example.com"]
+        assert self.emails(replica) == []
+
+    def test_use_primary(self, engines):
+        primary, replica = engines
+        with RoutingSession(bind=primary) as session:
+            session.add(self.user("new@example.com"))
+            session.commit()
+
+        with RoutingSession(bind=primary, info={"replica": replica, "use_primary": True}) as session:
+            assert session.scalars(select(User.email)).all() == ["new@example.com"]
+
+    def test_login_lookup_falls_back_to_primary(self, engines, tmp_path):
+        from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+        from routers.v1.auth.router import find_login_user
+
+        primary, replica = engines
+        with RoutingSession(bind=primary) as session:
+            session.add(self.user("elsewhere@example.com"))
+            session.commit()
+        async_primary = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/primary.db")
+        async_replica = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/replica.db")
+
+        async def lookup(email):
+            # Signed up through another worker: no read-your-writes mark here
+            async with AsyncSession(
+                bind=async_primary, sync_session_class=RoutingSession,
+                info={"replica": async_replica.sync_engine},
+            ) as db:
+                user = await find_login_user(db, email)
+                return user and user.email, bool(db.info.get("use_primary"))
+
+        try:
+            assert asyncio.run(lookup("elsewhere@example.com")) == ("elsewhere@example.com", True)
+            assert asyncio.run(lookup("nobody@example.com")) == (None, True)
+        finally:
+            asyncio.run(async_primary.dispose())
+            asyncio.run(async_replica.dispose())
+
+    def test_without_replica_everything_uses_primary(self, engines):
+        primary, _ = engines
+        with RoutingSession(bind=primary) as session:
+            session.add(self.user("solo@example.com"))
+            session.commit()
+            assert session.scalars(select(User.email)).all() == ["solo@example.com"]
+
+
+class TestReadYourWrites:
+    def test_marks_only_when_replicas_exist(self, monkeypatch):
+        monkeypatch.setattr(database, "replica_engines", [])
+        mark_recent_write(("user", 1))
+        assert not written_recently(("user", 1))
+
+        monkeypatch.setattr(database, "replica_engines", [fake_engine("a")])
+        mark_recent_write(("user", 1))
+        assert written_recently(("user", 1))
+        assert not written_recently(("user", 2))
+        database.recent_writes.clear()
@@ -5,14 +5,16 @@ from fastapi.testclient import TestClient
 from datetime import datetime, timedelta, timezone
 from jose import jwt
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool, StaticPool
 
-from core.security import create_access_token
-from core.deps import get_current_user, get_current_active_user, RoleChecker
+from core.security import create_access_token, revocation_list, revoke_user_tokens
+from core.user_cache import user_cache
+from core.deps import get_current_user, get_current_active_user, get_current_user_record, RoleChecker
 from core.config import settings
 from models.user import User
-from core.database import Base, get_db
+from core.database import Base, get_async_db, get_async_read_db
 
 # Create in-memory SQLite database for testing
 SQLALCHEMY_TEST_DATABASE_URL = "sqlite:///./test.db"
@@ -24,18 +26,19 @@ test_engine = create_engine(
 
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
 
+test_async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(test_async_engine, expire_on_commit=False)
+
 # Sample app for testing dependencies
 app = FastAPI()
 
-# Override the get_db dependency for testing
-def override_get_db():
-    db = TestingSessionLocal()
-    try:
+# Override the get_async_db dependency for testing
+async def override_get_async_db():
+    async with TestingAsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
-app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_async_db] = override_get_async_db
+app.dependency_overrides[get_async_read_db] = override_get_async_db
 
 # Create role checker for testing
 allow_customer = RoleChecker(["customer"])
@@ -51,6 +54,10 @@ def read_users_me(current_user: User = Depends(get_current_user)):
 def read_users_me_active(current_user: User = Depends(get_current_active_user)):
     return {"user_id": current_user.id, "email": current_user.email, "role": current_user.role}
 
+@app.get("/users/me/record")
+def read_users_me_record(current_user: User = Depends(get_current_user_record)):
+    return {"user_id": current_user.id, "phone_number": current_user.phone_number}
+
 @app.get("/customers-only")
 def customers_only(current_user: User = Depends(allow_customer)):
     return {"access": "granted", "role": current_user.role}
@@ -224,4 +231,132 @@ class TestUserDependency:
             "/customer-or-tenant",
             headers={"Authorization": f"Bearer {token}"}
         )
-        assert response.status_code == 200
\ No newline at end of file
+        assert response.status_code == 200
+
+    def test_claims_only_skips_user_lookup(self, monkeypatch):
+        monkeypatch.setattr(settings, "AUTH_CLAIMS_ONLY", True)
+        # User 99 is not in the database; claims alone are enough
+        token = create_test_token(user_id=99, email="ghost@example.com", role="tenant_admin")
+        response = self.client.get(
+            "/tenant-admin-only",
+            headers={"Authorization": f"Bearer {token}"}
+        )
+        assert response.status_code == 200
+        assert response.json() == {"access": "granted", "role": "tenant_admin"}
+
+    def test_claims_only_record_loads_row(self, monkeypatch):
+        monkeypatch.setattr(settings, "AUTH_CLAIMS_ONLY", True)
+        token = create_test_token()
+        response = self.client.get(
+            "/users/me/record",
+            headers={"Authorization": f"Bearer {token}"}
+        )
+        assert response.status_code == 200
+        assert response.json() == {"user_id": 1, "phone_number": "1234567890"}
+
+        token = create_test_token(user_id=99)
+        response = self.client.get(
+            "/users/me/record",
+            headers={"Authorization": f"Bearer {token}"}
+        )
+        assert response.status_code == 401
+
+    def test_claims_only_requires_role(self, monkeypatch):
+        monkeypatch.setattr(settings, "AUTH_CLAIMS_ONLY", True)
+        token = create_access_token({"sub": "1"})
+        response = self.client.get(
+            "/users/me",
+            headers={"Authorization": f"Bearer {token}"}
+        )
+        assert response.status_code == 401
+
+    @pytest.mark.parametrize("claims_only", [False, True])
+    def test_revoked_token_rejected(self, monkeypatch, claims_only):
+        monkeypatch.setattr(settings, "AUTH_CLAIMS_ONLY", claims_only)
+        token = create_test_token()
+        revoke_user_tokens(1)
+        response = self.client.get(
+            "/users/me",
+            headers={"Authorization": f"Bearer {token}"}
+        )
+        assert response.status_code == 401
+        assert response.json() == {"detail": "Could not validate credentials"}
+
+        # Other users keep working
+        token = create_test_token(user_id=3, email="admin@example.com", role="tenant_admin")
+        response = self.client.get(
+            "/users/me",
+            headers={"Authorization": f"Bearer {token}"}
+        )
+        assert response.status_code == 200
+
+
+    def test_principal_cache_skips_lookup(self):
+        token = create_test_token()
+        headers = {"Authorization": f"Bearer {token}"}
+        assert self.client.get("/users/me", headers=headers).status_code == 200
+        assert user_cache.get(1).email == "test@example.com"
+
+        # Remove the row behind the ORM's back: the cached principal is served
+        db = TestingSessionLocal()
+        db.execute(User.__table__.delete().where(User.id == 1))
+        db.commit()
+        db.close()
+        assert self.client.get("/users/me", headers=headers).status_code == 200
+
+    def test_user_update_invalidates_cache(self):
+        token = create_test_token()
+        headers = {"Authorization": f"Bearer {token}"}
+        assert self.client.get("/users/me/active", headers=headers).status_code == 200
+
+        db = TestingSessionLocal()
+        user = db.get(User, 1)
+        user.role = "tenant_admin"
+        db.commit()
+        db.close()
+
+        assert user_cache.get(1) is None
+        response = self.client.get("/users/me", headers=headers)
+        assert response.json()["role"] == "tenant_admin"
+
+    def test_deactivation_revokes_tokens(self):
+        token = create_test_token()
+        headers = {"Authorization": f"Bearer {token}"}
+        assert self.client.get("/users/me/active", headers=headers).status_code == 200
+
+        db = TestingSessionLocal()
+        db.get(User, 1).is_active = False
+        db.commit()
+        db.close()
+
+        response = self.client.get("/users/me/active", headers=headers)
+        assert response.status_code == 401
+
+    def test_cache_kept_until_commit(self):
+        token = create_test_token()
+        headers = {"Authorization": f"Bearer {token}"}
+        assert self.client.get("/users/me/active", headers=headers).status_code == 200
+
+        db = TestingSessionLocal()
+        db.get(User, 1).is_active = False
+        db.flush()
+        # Flushed but uncommitted: nothing is invalidated or revoked yet
+        assert user_cache.get(1) is not None
+        assert not revocation_list.is_revoked({"sub": "1", "iat": 0})
+        db.commit()
+        db.close()
+        assert user_cache.get(1) is None
+
+    def test_rollback_neither_invalidates_nor_revokes(self):
+        token = create_test_token()
+        headers = {"Authorization": f"Bearer {token}"}
+        assert self.client.get("/users/me/active", headers=headers).status_code == 200
+
+        db = TestingSessionLocal()
+        db.get(User, 1).is_active = False
+        db.flush()
+        db.rollback()
+        db.close()
+
+        assert user_cache.get(1) is not None
+        assert self.client.get("/users/me/active", headers=headers).status_code == 200
@@ -0,0 +1,75 @@
+# tests/core/test_keys.py
+import ecdsa
+import pytest
+from jose import jwt, JWTError
+
+from core.keys import SigningKeyRing
+from core.security import TokenCodec
+
+
+def write_key(directory, kid, public=False):
+    key = ecdsa.SigningKey.generate(curve=ecdsa.NIST256p)
+    pem = key.get_verifying_key().to_pem() if public else key.to_pem()
+    (directory / f"{kid}.pem").write_bytes(pem)
+
+
+class TestSigningKeyRing:
+    def test_signs_with_active_kid(self, tmp_path):
+        write_key(tmp_path, "2024-01")
+        keyring = SigningKeyRing.from_directory(str(tmp_path), "ES256", "2024-01")
+        codec = TokenCodec(None, "ES256", 30, keyring=keyring)
+
+        token = codec.encode({"sub": "1"})
+        assert jwt.get_unverified_header(token) == {"alg": "ES256", "kid": "2024-01", "typ": "JWT"}
+        assert codec.decode(token)["sub"] == "1"
+
+    def test_rotation_keeps_old_tokens_valid(self, tmp_path):
+        write_key(tmp_path, "old")
+        old_codec = TokenCodec(None, "ES256", 30, keyring=SigningKeyRing.from_directory(str(tmp_path), "ES256", "old"))
+        old_token = old_codec.encode({"sub": "1"})
+
+        # New key becomes active; the retired one is kept as a public key
+        (tmp_path / "old.pem").write_bytes(
+            ecdsa.SigningKey.from_pem((tmp_path / "old.pem").read_bytes()).get_verifying_key().to_pem()
+        )
+        write_key(tmp_path, "new")
+        codec = TokenCodec(None, "ES256", 30, keyring=SigningKeyRing.from_directory(str(tmp_path), "ES256", "new"))
+
+        assert codec.decode(old_token)["sub"] == "1"
+        assert jwt.get_unverified_header(codec.encode({"sub": "1"}))["kid"] == "new"
+
+    def test_unknown_kid_is_rejected(self, tmp_path):
+        write_key(tmp_path, "a")
+        other = tmp_path / "other"
+        other.mkdir()
+        write_key(other, "b")
+        codec = TokenCodec(None, "ES256", 30, keyring=SigningKeyRing.from_directory(str(tmp_path), "ES256", "a"))
+        foreign = TokenCodec(None, "ES256", 30, keyring=SigningKeyRing.from_directory(str(other), "ES256", "b"))
+
+        with pytest.raises(JWTError):
+            codec.decode(foreign.encode({"sub": "1"}))
+
+    def test_jwks(self, tmp_path):
+        write_key(tmp_path, "a")
+        write_key(tmp_path, "b", public=True)
+        keyring = SigningKeyRing.from_directory(str(tmp_path), "ES256", "a")
+
+        keys = {key["kid"]: key for key in keyring.jwks()["keys"]}
+        assert set(keys) == {"a", "b"}
+        assert keys["a"]["use"] == "sig"
+        assert keys["a"]["alg"] == "ES256"
+        assert "d" not in keys["a"]  # never publish private material
+
+    def test_active_kid_must_exist(self, tmp_path):
+        write_key(tmp_path, "a")
+        with pytest.raises(ValueError):
+            SigningKeyRing.from_directory(str(tmp_path), "ES256", "missing")
+
+    def test_key_directory_is_required(self):
+        with pytest.raises(ValueError, match="JWT_SIGNING_KEYS_DIR"):
+            SigningKeyRing.from_directory(None, "ES256", "a")
+
+    def test_active_key_must_be_private(self, tmp_path):
+        write_key(tmp_path, "a", public=True)
+        with pytest.raises(ValueError, match="public key"):
+            SigningKeyRing.from_directory(str(tmp_path), "ES256", "a")
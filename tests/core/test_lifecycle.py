@@ -0,0 +1,100 @@
+# tests/core/test_lifecycle.py
+import asyncio
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from core import lifecycle
+from core.config import settings
+from core.database import Base
+from core.metrics import http_requests_in_flight
+from core.security import password_hash_pool, revocation_list
+from main import app
+from models.token_revocation import TokenRevocation
+from models.user import User
+
+
+@pytest.fixture
+def sqlite_engine(tmp_path):
+    url = f"sqlite:///{tmp_path}/warm.db"
+    sync_engine = create_engine(url)
+    Base.metadata.create_all(bind=sync_engine)
+    sync_engine.dispose()
+    engine = create_async_engine(url.replace("sqlite://", "sqlite+aiosqlite://"), pool_size=3)
+    yield engine
+    asyncio.run(engine.dispose())
+
+
+def test_prefill_pool_opens_and_warms_connections(sqlite_engine):
+    assert asyncio.run(lifecycle.prefill_pool(sqlite_engine, 3)) == 3
+    pool = sqlite_engine.sync_engine.pool
+    assert pool.checkedin() == 3
+    assert pool.checkedout() == 0
+    # The hot statements are compiled and cached on the engine
+    assert len(sqlite_engine.sync_engine._compiled_cache) >= 3
+
+def test_startup_tolerates_database_errors(tmp_path, monkeypatch):
+    broken = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/missing/dir.db")
+    monkeypatch.setattr(lifecycle, "get_async_engine", lambda: broken)
+    monkeypatch.setattr(settings, "WARMUP_POOL_CONNECTIONS", 1)
+    warm_app = FastAPI()
+
+    report = asyncio.run(lifecycle.startup(warm_app))
+    assert report["pool_connections"] == 0
+    assert warm_app.state.ready
+
+    monkeypatch.setattr(settings, "WARMUP_STRICT", True)
+    with pytest.raises(Exception):
+        asyncio.run(lifecycle.startup(FastAPI()))
+
+def test_startup_warms_password_hashing(monkeypatch):
+    monkeypatch.setattr(settings, "WARMUP_PASSWORD_HASHING", True)
+    completed = password_hash_pool.stats()["completed"]
+    report = asyncio.run(lifecycle.startup(FastAPI()))
+    assert "hashing_seconds" in report
+    assert password_hash_pool.stats()["completed"] == completed + 2
+
+def test_drain_waits_for_in_flight_requests():
+    async def scenario():
+        http_requests_in_flight.inc()
+        asyncio.get_running_loop().call_later(0.05, http_requests_in_flight.dec)
+        return await lifecycle.drain(timeout=2, poll_interval=0.01)
+
+    assert asyncio.run(scenario())
+
+    http_requests_in_flight.inc()
+    try:
+        assert not asyncio.run(lifecycle.drain(timeout=0.02, poll_interval=0.01))
+    finally:
+        http_requests_in_flight.dec()
+
+def test_ready_follows_lifespan():
+    with TestClient(app) as client:
+        assert client.get("/api/v1/ready").json() == {"status": "ready"}
+    assert app.state.ready is False
+    assert TestClient(app).get("/api/v1/ready").status_code == 503
+
+def test_revocations_reach_other_workers(db: Session, monkeypatch):
+    user = User(email="revoked@example.com", password="x", tenant_id=1)
+    db.add(user)
+    db.commit()
+    issued_before = time.time()
+    user.is_active = False
+    db.commit()
+    assert db.query(TokenRevocation).filter_by(user_id=user.id).count() == 1
+
+    # Another worker, or this one after a restart, knows nothing yet
+    revocation_list.clear()
+    monkeypatch.setattr(
+        lifecycle, "get_async_engine",
+        lambda: create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool),
+    )
+    since = asyncio.run(lifecycle.load_token_revocations(0.0))
+    assert revocation_list.is_revoked({"sub": str(user.id), "iat": issued_before}) is True
+    assert since > 0
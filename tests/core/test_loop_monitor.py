@@ -0,0 +1,54 @@
+# tests/core/test_loop_monitor.py
+import asyncio
+import logging
+import time
+
+from core.loop_monitor import LoopMonitor, event_loop_blocked
+
+
+def block_the_loop(seconds):
+    # Stands in for a sync DB call or bcrypt inside an async handler
+    time.sleep(seconds)
+
+async def handler(seconds):
+    block_the_loop(seconds)
+
+async def run(monitor, body):
+    await monitor.start()
+    try:
+        await asyncio.sleep(0.05)
+        await body()
+        await asyncio.sleep(0.1)
+    finally:
+        await monitor.stop()
+
+
+def test_blocking_call_is_caught_with_its_stack(caplog):
+    monitor = LoopMonitor(interval=0.01, threshold=0.05)
+    blocked_before = event_loop_blocked._values.get((), 0)
+
+    with caplog.at_level(logging.WARNING, logger="core.loop_monitor"):
+        asyncio.run(run(monitor, lambda: handler(0.3)))
+
+    assert monitor.blocked == 1
+    assert event_loop_blocked._values[()] == blocked_before + 1
+    report = monitor.last_report
+    assert report["event_loop_lag_ms"] >= 200
+    assert any("block_the_loop" in entry for entry in report["blocking_stack"])
+    assert report["blocking_location"].endswith("in block_the_loop")
+    assert "test_loop_monitor.py" in report["blocking_location"]
+
+    record = next(r for r in caplog.records if r.name == "core.loop_monitor")
+    assert record.blocking_location == report["blocking_location"]
+    assert "event loop blocked" in record.getMessage()
+
+def test_non_blocking_work_is_not_reported():
+    monitor = LoopMonitor(interval=0.01, threshold=0.05)
+
+    async def cooperative():
+        for _ in range(10):
+            await asyncio.sleep(0.01)
+
+    asyncio.run(run(monitor, cooperative))
+    assert monitor.blocked == 0
+    assert monitor.last_report is None
@@ -0,0 +1,75 @@
+# tests/core/test_metrics.py
+import pytest
+from fastapi.testclient import TestClient
+
+from core.config import settings
+from core.metrics import Counter, Gauge, Histogram, Registry
+
+
+class TestRegistry:
+    def test_counter_and_gauge(self):
+        registry = Registry()
+        requests = registry.register(Counter("requests_total", "Requests", ("method",)))
+        in_flight = registry.register(Gauge("in_flight", "In flight"))
+        requests.inc("GET")
+        requests.inc("GET")
+        requests.inc("POST", amount=3)
+        in_flight.inc()
+        in_flight.inc()
+        in_flight.dec()
+
+        text = registry.render()
+        assert "# TYPE requests_total counter" in text
+        assert 'requests_total{method="GET"} 2' in text
+        assert 'requests_total{method="POST"} 3' in text
+        assert "in_flight 1" in text
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = Registry()
+        latency = registry.register(Histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0)))
+        for value in (0.05, 0.5, 0.5, 5.0):
+            latency.observe(value, "/x")
+
+        text = registry.render()
+        assert 'latency_seconds_bucket{route="/x",le="0.1"} 1' in text
+        assert 'latency_seconds_bucket{route="/x",le="1"} 3' in text
+        assert 'latency_seconds_bucket{route="/x",le="+Inf"} 4' in text
+        assert 'latency_seconds_count{route="/x"} 4' in text
+        assert 'latency_seconds_sum{route="/x"} 6.05' in text
+
+    def test_label_values_are_escaped(self):
+        registry = Registry()
+        registry.register(Counter("c", "C", ("path",))).inc('a"b\\c')
+        assert 'c{path="a\\"b\\\\c"} 1' in registry.render()
+
+    def test_collectors(self):
+        registry = Registry()
+        registry.register_collector(lambda: [("queue_depth", "gauge", "Depth", [("", {}, 7)])])
+        assert "queue_depth 7" in registry.render()
+
+
+@pytest.fixture
+def scraper(monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_ALLOWED_IPS", ["testclient"])
+
+def test_metrics_endpoint(client: TestClient, scraper):
+    client.get("/api/v1/ping")
+    client.get("/api/v1/users/me")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/v1/ping",status="200"}' in text
+    assert 'route="/api/v1/users/me",status="401"' in text
+    assert "http_requests_in_flight 1" in text
+    assert 'db_pool_checked_out{engine="async"}' in text
+    assert 'password_hash_queue_depth{pool="interactive"} 0' in text
+    assert 'password_hash_queue_depth{pool="bulk"} 0' in text
+    assert 'cache_hit_ratio{cache="token"}' in text
+
+def test_metrics_need_an_allowed_address_or_the_token(client: TestClient, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape-secret")
+    assert client.get("/metrics").status_code == 403
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 403
+    assert client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"}).status_code == 200
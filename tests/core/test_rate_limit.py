@@ -0,0 +1,67 @@
+# tests/core/test_rate_limit.py
+import asyncio
+
+import pytest
+
+from core.rate_limit import LoginThrottle, MemoryBackend, RateLimitExceeded
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def consume(backend, key, capacity=3, rate=1.0):
+    return asyncio.run(backend.consume(key, capacity, rate))
+
+
+class TestMemoryBackend:
+    def test_bucket_drains_and_refills(self):
+        clock = FakeClock()
+        backend = MemoryBackend(clock=clock)
+        assert [consume(backend, "k") for _ in range(3)] == [0, 0, 0]
+        assert consume(backend, "k") == pytest.approx(1.0)
+
+        clock.now += 0.5
+        assert consume(backend, "k") == pytest.approx(0.5)
+        clock.now += 0.5
+        assert consume(backend, "k") == 0
+
+    def test_keys_are_independent(self):
+        backend = MemoryBackend(clock=FakeClock())
+        for _ in range(3):
+            consume(backend, "a")
+        assert consume(backend, "a") > 0
+        assert consume(backend, "b") == 0
+
+    def test_least_recently_used_keys_are_dropped(self):
+        backend = MemoryBackend(max_keys=2, clock=FakeClock())
+        for key in ("a", "b", "c"):
+            consume(backend, key)
+        assert list(backend._buckets) == ["b", "c"]
+
+
+class TestLoginThrottle:
+    def make(self, clock, **kwargs):
+        return LoginThrottle(MemoryBackend(clock=clock), {"email": (2, 60), "ip": (3, 60)}, **kwargs)
+
+    def test_limits_each_key(self):
+        throttle = self.make(FakeClock())
+        asyncio.run(throttle.check(email="a@x.com", ip="1.1.1.1"))
+        asyncio.run(throttle.check(email="a@x.com", ip="1.1.1.1"))
+        with pytest.raises(RateLimitExceeded) as exc:
+            asyncio.run(throttle.check(email="a@x.com", ip="2.2.2.2"))
+        assert exc.value.retry_after == pytest.approx(30)
+
+        # The address has one attempt left for other accounts, then stops
+        asyncio.run(throttle.check(email="b@x.com", ip="1.1.1.1"))
+        with pytest.raises(RateLimitExceeded):
+            asyncio.run(throttle.check(email="c@x.com", ip="1.1.1.1"))
+
+    def test_disabled(self):
+        throttle = self.make(FakeClock(), enabled=False)
+        for _ in range(5):
+            asyncio.run(throttle.check(email="a@x.com", ip="1.1.1.1"))
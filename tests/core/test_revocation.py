@@ -0,0 +1,47 @@
+# tests/core/test_revocation.py
+import time
+
+from core.revocation import TokenRevocationList
+from core.security import create_access_token, decode_token, revocation_list, revoke_user_tokens
+
+
+class TestTokenRevocationList:
+    def test_tokens_issued_before_revocation_are_rejected(self):
+        revocations = TokenRevocationList(max_token_age_seconds=1800)
+        now = int(time.time())
+        revocations.revoke_user(7, at=now)
+
+        assert revocations.is_revoked({"sub": "7", "iat": now - 10}) is True
+        assert revocations.is_revoked({"sub": "7", "iat": now + 10}) is False
+        assert revocations.is_revoked({"sub": "8", "iat": now - 10}) is False
+
+    def test_token_issued_in_the_same_second_after_revocation_is_accepted(self):
+        revocations = TokenRevocationList(max_token_age_seconds=1800)
+        now = time.time()
+        revocations.revoke_user(7, at=now)
+
+        assert revocations.is_revoked({"sub": "7", "iat": now - 0.001}) is True
+        assert revocations.is_revoked({"sub": "7", "iat": now + 0.001}) is False
+
+    def test_earlier_revocation_does_not_override_a_later_one(self):
+        revocations = TokenRevocationList(max_token_age_seconds=1800)
+        now = time.time()
+        revocations.revoke_user(7, at=now)
+        revocations.revoke_user(7, at=now - 10)
+        assert revocations.is_revoked({"sub": "7", "iat": now - 5}) is True
+
+    def test_token_without_iat_is_revoked(self):
+        revocations = TokenRevocationList(max_token_age_seconds=1800)
+        revocations.revoke_user(7)
+        assert revocations.is_revoked({"sub": "7"}) is True
+
+    def test_stale_entries_are_pruned(self):
+        revocations = TokenRevocationList(max_token_age_seconds=60)
+        revocations.revoke_user(1, at=time.time() - 3600)
+        revocations.revoke_user(2)
+        assert len(revocations) == 1
+
+def test_token_minted_right_after_revocation_is_accepted():
+    revoke_user_tokens(7)
+    token = create_access_token({"sub": "7"})
+    assert revocation_list.is_revoked(decode_token(token)) is False
@@ -1,15 +1,26 @@
 # tests/core/test_security.py
+import asyncio
+import hashlib
+import threading
 import pytest
 from datetime import datetime, timedelta, timezone
-from jose import jwt, JWTError
+from jose import jwt, JWTError, ExpiredSignatureError
 
 # Import the functions we'll implement
 from core.security import (
     verify_password,
     get_password_hash,
     create_access_token,
-    decode_token
+    decode_token,
+    verify_password_async,
+    get_password_hash_async,
+    PasswordHashPool,
+    HashingQueueFull,
+    TokenCodec,
+    access_token_claims,
 )
+from core import security
+from core.cache import TTLCache
 from core.config import settings
 
 class TestSecurity:
@@ -96,4 +107,140 @@ class TestSecurity:
     def test_decode_invalid_token(self):
         # Test decoding an invalid token
         with pytest.raises(JWTError):
-            decode_token("invalid.token.string")
\ No newline at end of file
+            decode_token("invalid.token.string")
+
+    def test_password_hash_async(self):
+        # Async variants run on the hashing pool and stay compatible
+        hashed = asyncio.run(get_password_hash_async("testpassword123"))
+        assert hashed.startswith("$2b$")
+        assert verify_password("testpassword123", hashed) is True
+        assert asyncio.run(verify_password_async("testpassword123", hashed)) is True
+        assert asyncio.run(verify_password_async("wrongpassword", hashed)) is False
+
+
+class TestTokenCodec:
+    def setup_method(self):
+        self.codec = TokenCodec("codec-secret", "HS256", 30)
+
+    def test_fast_path_matches_jose(self):
+        token = self.codec.encode({"sub": "1", "role": "customer"})
+        claims = jwt.decode(token, "codec-secret", algorithms=["HS256"])
+        assert token == jwt.encode(claims, "codec-secret", algorithm="HS256")
+        assert self.codec.decode(token) == claims
+
+    def test_decodes_jose_tokens(self):
+        token = jwt.encode({"sub": "1", "exp": 2**31}, "codec-secret", algorithm="HS256")
+        assert self.codec.decode(token) == {"sub": "1", "exp": 2**31}
+
+    def test_rejects_bad_signature(self):
+        token = self.codec.encode({"sub": "1"})
+        other = TokenCodec("other-secret", "HS256", 30).encode({"sub": "1"})
+        with pytest.raises(JWTError):
+            self.codec.decode(token.rsplit(".", 1)[0] + "." + other.rsplit(".", 1)[1])
+        with pytest.raises(JWTError):
+            self.codec.decode("invalid.token.string")
+        with pytest.raises(JWTError):
+            self.codec.decode("not-a-token")
+
+    def test_rejects_expired(self):
+        token = self.codec.encode({"sub": "1"}, expires_delta=timedelta(minutes=-5))
+        with pytest.raises(ExpiredSignatureError):
+            self.codec.decode(token)
+
+    def test_other_claims_are_validated_by_jose(self):
+        token = self.codec.encode({"sub": "1", "aud": "someone-else"})
+        with pytest.raises(JWTError):
+            self.codec.decode(token)
+
+    def test_other_algorithms_use_jose(self):
+        codec = TokenCodec("codec-secret", "HS512", 30)
+        token = codec.encode({"sub": "1"})
+        assert jwt.get_unverified_header(token)["alg"] == "HS512"
+        assert codec.decode(token)["sub"] == "1"
+
+    def test_compact_claims(self, monkeypatch):
+        class StubUser:
+            id, email, role, tenant_id = 5, "user@example.com", "tenant_admin", 3
+
+        monkeypatch.setattr(settings, "JWT_COMPACT_CLAIMS", True)
+        claims = access_token_claims(StubUser)
+        assert claims == {"sub": "5", "rol": "tenant_admin", "tid": 3}
+
+        payload = decode_token(create_access_token(claims))
+        assert payload["role"] == "tenant_admin"
+        assert payload["tenant_id"] == 3
+        assert "email" not in payload
+
+
+class TestTokenCache:
+    def setup_method(self):
+        self.now = 0.0
+        self.cache = TTLCache(max_size=100, ttl_seconds=3600, clock=lambda: self.now)
+
+    def test_repeated_decode_is_cached(self, monkeypatch):
+        monkeypatch.setattr(security, "token_cache", self.cache)
+        token = create_access_token({"sub": "1", "tenant_id": 1})
+
+        first = decode_token(token)
+        monkeypatch.setattr(security.jwt, "decode", None)  # must not be called again
+        second = decode_token(token)
+
+        assert first == second
+        assert self.cache.stats()["hits"] == 1
+
+    def test_cached_payload_is_not_shared(self, monkeypatch):
+        monkeypatch.setattr(security, "token_cache", self.cache)
+        token = create_access_token({"sub": "1"})
+        decode_token(token)["sub"] = "2"
+        assert decode_token(token)["sub"] == "1"
+
+    def test_entry_expires_with_token(self, monkeypatch):
+        monkeypatch.setattr(security, "token_cache", self.cache)
+        token = create_access_token({"sub": "1"}, expires_delta=timedelta(minutes=5))
+        decode_token(token)
+
+        # Just past the token's exp the entry is gone, well before the cache TTL
+        self.now = 5 * 60 + 5
+        assert len(self.cache) == 1
+        assert self.cache.get(hashlib.sha256(token.encode()).digest()) is None
+
+    def test_expired_token_is_not_cached(self, monkeypatch):
+        monkeypatch.setattr(security, "token_cache", self.cache)
+        token = create_access_token({"sub": "1"}, expires_delta=timedelta(minutes=-5))
+        with pytest.raises(ExpiredSignatureError):
+            decode_token(token)
+        assert len(self.cache) == 0
+
+
+class TestPasswordHashPool:
+    def test_rejects_when_full(self):
+        pool = PasswordHashPool(max_workers=1, max_pending=1)
+        release = threading.Event()
+
+        async def scenario():
+            blocked = asyncio.ensure_future(pool.run(release.wait))
+            await asyncio.sleep(0.05)
+            with pytest.raises(HashingQueueFull):
+                await pool.run(lambda: None)
+            release.set()
+            await blocked
+
+        asyncio.run(scenario())
+        stats = pool.stats()
+        assert stats["rejected"] == 1
+        assert stats["completed"] == 1
+        assert stats["queued"] == 0
+        pool.shutdown()
+
+    def test_stats_track_wait_time(self):
+        pool = PasswordHashPool(max_workers=1, max_pending=4)
+
+        async def scenario():
+            await asyncio.gather(*(pool.run(sum, [1, 2]) for _ in range(3)))
+
+        asyncio.run(scenario())
+        stats = pool.stats()
+        assert stats["completed"] == 3
+        assert stats["wait_seconds_total"] >= 0
+        assert stats["wait_seconds_max"] <= stats["wait_seconds_total"]
+        pool.shutdown()
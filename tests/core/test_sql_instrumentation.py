@@ -0,0 +1,78 @@
+# tests/core/test_sql_instrumentation.py
+import logging
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from core.config import settings
+from core.sql_instrumentation import (
+    RequestQueryStats,
+    SQLInstrumentationMiddleware,
+    instrument_engine,
+    statement_shape,
+)
+
+engine = create_engine("sqlite://")
+instrument_engine(engine)
+
+app = FastAPI()
+app.add_middleware(SQLInstrumentationMiddleware)
+
+@app.get("/queries/{n}")
+def run_queries(n: int):
+    with engine.connect() as conn:
+        for i in range(n):
+            conn.execute(text("SELECT :i"), {"i": i})
+        conn.execute(text("SELECT 1 WHERE 1 IN (1, 2, 3)"))
+    return {"ok": True}
+
+
+class TestStatementShape:
+    def test_whitespace_and_placeholder_lists(self):
+        assert statement_shape("SELECT *\n  FROM users WHERE id IN (?, ?)") == statement_shape(
+            "SELECT * FROM users WHERE id IN (?, ?, ?, ?)"
+        )
+        assert statement_shape("SELECT * FROM users WHERE id IN ($1, $2)") == "SELECT * FROM users WHERE id IN (...)"
+
+    def test_repeated(self):
+        stats = RequestQueryStats()
+        for _ in range(3):
+            stats.record("SELECT * FROM users WHERE id = ?", 0.001)
+        stats.record("SELECT 1", 0.001)
+        assert stats.count == 4
+        assert stats.repeated(3) == [("SELECT * FROM users WHERE id = ?", 3)]
+
+
+class TestMiddleware:
+    def test_debug_headers(self, monkeypatch):
+        monkeypatch.setattr(settings, "SQL_DEBUG_HEADERS", True)
+        response = TestClient(app).get("/queries/2")
+        assert response.headers["X-SQL-Query-Count"] == "3"
+        assert float(response.headers["X-SQL-Query-Time-Ms"]) >= 0
+        assert response.headers["X-SQL-Repeated-Statements"] == "0"
+
+    def test_headers_off_by_default(self, monkeypatch):
+        monkeypatch.setattr(settings, "SQL_DEBUG_HEADERS", False)
+        response = TestClient(app).get("/queries/1")
+        assert "X-SQL-Query-Count" not in response.headers
+
+    def test_n_plus_one_is_logged(self, monkeypatch, caplog):
+        monkeypatch.setattr(settings, "SQL_N_PLUS_ONE_THRESHOLD", 5)
+        with caplog.at_level(logging.WARNING, logger="core.sql_instrumentation"):
+            TestClient(app).get("/queries/6")
+        assert any("possible N+1" in record.message for record in caplog.records)
+
+    def test_slow_query_log(self, monkeypatch, caplog):
+        monkeypatch.setattr(settings, "SQL_SLOW_QUERY_MS", 0)
+        with caplog.at_level(logging.WARNING, logger="core.sql_instrumentation.slow"):
+            TestClient(app).get("/queries/1")
+        assert any("slow query" in record.message for record in caplog.records)
+
+
+def test_async_engine_queries_are_counted(client, monkeypatch):
+    # The real app path: async session on aiosqlite, hooks on sync_engine
+    monkeypatch.setattr(settings, "SQL_DEBUG_HEADERS", True)
+    response = client.post("/auth/login", json={"email": "nobody@example.com", "password": "x"})
+    assert response.status_code == 401
+    assert response.headers["X-SQL-Query-Count"] == "1"
@@ -0,0 +1,81 @@
+# tests/core/test_timing.py
+import logging
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from core.security import get_password_hash
+from core.timing import ServerTimingMiddleware, TimedJSONResponse, current_timings, phase, record
+from models.user import User
+
+app = FastAPI(default_response_class=TimedJSONResponse)
+app.add_middleware(ServerTimingMiddleware)
+
+@app.get("/work")
+async def work():
+    with phase("step"):
+        time.sleep(0.01)
+    with phase("step"):
+        pass
+    record("external", 0.002)
+    return {"sampled": current_timings() is not None}
+
+
+def parse(header: str) -> dict:
+    entries = {}
+    for entry in header.split(", "):
+        name, *params = entry.split(";")
+        entries[name] = dict(p.split("=", 1) for p in params)
+    return entries
+
+
+def test_phase_is_a_no_op_outside_sampled_requests():
+    with phase("anything"):
+        pass
+    record("anything", 1.0)
+    assert current_timings() is None
+
+def test_header_for_sampled_requests(monkeypatch):
+    monkeypatch.setattr(settings, "SERVER_TIMING_SAMPLE_RATE", 1.0)
+    response = TestClient(app).get("/work")
+    assert response.json() == {"sampled": True}
+    timing = parse(response.headers["Server-Timing"])
+    assert float(timing["step"]["dur"]) >= 10
+    assert timing["step"]["desc"] == '"x2"'
+    assert float(timing["external"]["dur"]) == 2
+    assert float(timing["app"]["dur"]) >= float(timing["step"]["dur"])
+    assert "serialize" in timing
+    assert float(timing["total"]["dur"]) >= float(timing["app"]["dur"])
+
+def test_nothing_collected_when_off(monkeypatch):
+    monkeypatch.setattr(settings, "SERVER_TIMING_SAMPLE_RATE", 0.0)
+    response = TestClient(app).get("/work")
+    assert response.json() == {"sampled": False}
+    assert "Server-Timing" not in response.headers
+
+def test_log_line(monkeypatch, caplog):
+    monkeypatch.setattr(settings, "SERVER_TIMING_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(settings, "SERVER_TIMING_HEADER", False)
+    monkeypatch.setattr(settings, "SERVER_TIMING_LOG", True)
+    with caplog.at_level(logging.INFO, logger="core.timing"):
+        response = TestClient(app).get("/work")
+    assert "Server-Timing" not in response.headers
+    record_ = next(r for r in caplog.records if r.name == "core.timing")
+    assert record_.path == "/work"
+    assert record_.status == 200
+    assert set(record_.phases_ms) == {"step", "external", "app", "serialize"}
+
+def test_auth_phases(client: TestClient, db: Session, monkeypatch):
+    monkeypatch.setattr(settings, "SERVER_TIMING_SAMPLE_RATE", 1.0)
+    db.add(User(email="timed@example.com", password=get_password_hash("pw123456"), tenant_id=1))
+    db.commit()
+
+    response = client.post("/auth/login", json={"email": "timed@example.com", "password": "pw123456"})
+    assert {"bcrypt", "jwt-encode", "db", "app", "serialize", "total"} <= set(parse(response.headers["Server-Timing"]))
+
+    token = response.json()["access_token"]
+    response = client.get("/api/v1/users/me", headers={"Authorization": f"Bearer {token}"})
+    assert {"jwt", "user", "db", "total"} <= set(parse(response.headers["Server-Timing"]))
@@ -0,0 +1,79 @@
+# tests/core/test_traffic_capture.py
+import json
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from core import traffic_capture as capture_module
+from core.config import settings
+from core.security import get_password_hash
+from core.traffic_capture import TrafficCapture
+from models.user import User
+
+
+@pytest.fixture
+def capture(tmp_path, monkeypatch):
+    capture = TrafficCapture(str(tmp_path / "traffic.ndjson"), max_bytes=1024 * 1024, backups=2)
+    monkeypatch.setattr(capture_module, "traffic_capture", capture)
+    monkeypatch.setattr(settings, "TRAFFIC_CAPTURE_ENABLED", True)
+    monkeypatch.setattr(settings, "TRAFFIC_CAPTURE_SAMPLE_RATE", 1.0)
+    capture.start()
+    yield capture
+    capture.stop()
+
+
+def captured(capture: TrafficCapture) -> list:
+    capture.stop()
+    with open(capture.path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_records_sanitized_metadata(client: TestClient, db: Session, capture):
+    db.add(User(email="traffic@example.com", password=get_password_hash("pw123456"), tenant_id=3))
+    db.commit()
+
+    login = client.post("/auth/login", json={"email": "traffic@example.com", "password": "pw123456"})
+    token = login.json()["access_token"]
+    client.get("/api/v1/users/me?verbose=1", headers={"Authorization": f"Bearer {token}"})
+    client.get("/api/v1/users/me", headers={"Authorization": "Bearer not-a-jwt"})
+
+    entries = captured(capture)
+    assert [(e["method"], e["route"], e["principal"], e["status"]) for e in entries] == [
+        ("POST", "/auth/login", "anonymous", 200),
+        ("GET", "/api/v1/users/me", "customer", 200),
+        ("GET", "/api/v1/users/me", "invalid", 401),
+    ]
+    assert entries[0]["request_bytes"] == len(b'{"email":"traffic@example.com","password":"pw123456"}')
+    assert entries[0]["response_bytes"] == len(login.content)
+    assert entries[1]["query"] == ["verbose"]
+    assert all(e["duration_ms"] > 0 for e in entries)
+    with open(capture.path) as f:
+        raw = f.read()
+    assert "traffic@example.com" not in raw and "pw123456" not in raw and token not in raw
+
+def test_nothing_recorded_when_disabled(client: TestClient, capture, monkeypatch):
+    monkeypatch.setattr(settings, "TRAFFIC_CAPTURE_ENABLED", False)
+    client.get("/api/v1/ping")
+    assert captured(capture) == []
+
+def test_file_rotates(tmp_path):
+    capture = TrafficCapture(str(tmp_path / "traffic.ndjson"), max_bytes=200, backups=2)
+    capture.start()
+    for i in range(50):
+        capture.write({"i": i, "route": "/padding" * 4})
+    capture.stop()
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "traffic.ndjson", "traffic.ndjson.1", "traffic.ndjson.2",
+    ]
+    with open(tmp_path / "traffic.ndjson") as f:
+        assert json.loads(f.readlines()[-1])["i"] == 49
+
+def test_one_file_per_worker(tmp_path):
+    capture = TrafficCapture(str(tmp_path / "traffic.ndjson"), max_bytes=1024, backups=1)
+    capture.start(per_process=True)
+    capture.write({"i": 1})
+    capture.stop()
+    assert capture.file_path == str(tmp_path / f"traffic.{os.getpid()}.ndjson")
+    assert [p.name for p in tmp_path.iterdir()] == [f"traffic.{os.getpid()}.ndjson"]
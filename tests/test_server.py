@@ -0,0 +1,77 @@
+# tests/test_server.py
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+import pytest
+
+import server
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+class TestAutoWorkers:
+    def test_one_per_cpu(self):
+        assert server.auto_workers(cpu_count=8) == 8
+
+    def test_capped_by_connection_budget(self):
+        assert server.auto_workers(cpu_count=8, db_max_connections=100, connections_per_worker=30) == 3
+
+    def test_at_least_one(self):
+        assert server.auto_workers(cpu_count=8, db_max_connections=10, connections_per_worker=30) == 1
+
+
+def test_worker_config_jitters_max_requests():
+    options = server.parse_args(["--workers", "2", "--max-requests", "100", "--max-requests-jitter", "10"])
+    limits = {server.worker_config(object(), options).limit_max_requests for _ in range(50)}
+    assert limits <= set(range(100, 111))
+    assert len(limits) > 1
+
+    options = server.parse_args(["--workers", "2"])
+    assert server.worker_config(object(), options).limit_max_requests is None
+
+def test_prefers_uvloop_and_httptools():
+    pytest.importorskip("uvloop")
+    pytest.importorskip("httptools")
+    assert (server.event_loop(), server.http_protocol()) == ("uvloop", "httptools")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def get(url: str, timeout: float = 10) -> int:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with urllib.request.urlopen(url, timeout=2) as response:
+                return response.status
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.1)
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_workers_recycle_and_stop_on_sigterm():
+    port = free_port()
+    env = {**os.environ, "WARMUP_POOL_CONNECTIONS": "0", "WARMUP_PASSWORD_HASHING": "false"}
+    proc = subprocess.Popen(
+        [sys.executable, "server.py", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", "2", "--max-requests", "2", "--no-access-log", "--log-level", "warning"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        # Well past 2 workers x 2 requests, so workers were replaced along the way
+        for _ in range(10):
+            assert get(f"http://127.0.0.1:{port}/api/v1/ping") == 200
+        proc.send_signal(signal.SIGTERM)
+        assert proc.wait(timeout=15) == 0
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
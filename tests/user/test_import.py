@@ -0,0 +1,147 @@
+# tests/user/test_import.py
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+import core.database as database
+import core.user_import
+from core.database import written_recently
+from core.security import PasswordHashPool, create_access_token, verify_password
+from models.user import User
+
+
+@pytest.fixture(autouse=True)
+def cheap_hashes(monkeypatch):
+    # Full-cost bcrypt for every imported row would dominate the test run
+    monkeypatch.setattr(core.user_import, "get_password_hash", lambda password: f"hashed:{password}")
+
+def admin_header(db: Session, role: str = "tenant_admin", tenant_id: int = 1) -> dict:
+    admin = User(email=f"{role}@t{tenant_id}.com", password="x", tenant_id=tenant_id, role=role)
+    db.add(admin)
+    db.commit()
+    token = create_access_token({"sub": str(admin.id), "role": role, "tenant_id": tenant_id})
+    return {"Authorization": f"Bearer {token}"}
+
+def ndjson(*rows) -> str:
+    return "\n".join(row if isinstance(row, str) else json.dumps(row) for row in rows) + "\n"
+
+def test_import_ndjson_reports_bad_rows(client: TestClient, db: Session, monkeypatch):
+    monkeypatch.setattr(core.user_import.settings, "BULK_IMPORT_BATCH_SIZE", 2)
+    db.add(User(email="taken@example.com", password="x", tenant_id=1))
+    db.commit()
+    body = ndjson(
+        {"email": "A@Example.com", "password": "pw-a"},
+        {"email": "not-an-email", "password": "pw"},
+        "{broken",
+        {"email": "TAKEN@example.com", "password": "pw"},
+        {"email": "b@example.com", "password": "pw-b", "role": "tenant_admin", "phone_number": "555"},
+        {"email": "a@example.com", "password": "pw"},
+    )
+
+    response = client.post(
+        "/api/v1/users/import",
+        content=body,
+        headers={**admin_header(db), "Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["created"] == 2
+    assert [(e["row"], e["email"]) for e in data["errors"]] == [
+        (2, "not-an-email"), (3, None), (4, "taken@example.com"), (6, "a@example.com"),
+    ]
+    assert data["failed"] == 4
+
+    imported = {u.email: u for u in db.query(User).filter(User.email.in_(["a@example.com", "b@example.com"]))}
+    assert imported["a@example.com"].password == "hashed:pw-a"
+    assert imported["a@example.com"].role == "customer"
+    assert imported["b@example.com"].role == "tenant_admin"
+    assert imported["b@example.com"].phone_number == "555"
+    assert {u.tenant_id for u in imported.values()} == {1}
+
+def test_import_csv(client: TestClient, db: Session):
+    body = "﻿email,password,phone_number\r\nc1@example.com,pw1,\r\nc2@example.com,pw2,123\r\nshort@example.com\r\n"
+    response = client.post(
+        "/api/v1/users/import",
+        content=body.encode(),
+        headers={**admin_header(db), "Content-Type": "text/csv; charset=utf-8"},
+    )
+    data = response.json()
+    assert data["created"] == 2
+    assert data["errors"] == [{"row": 3, "email": None, "error": "Expected 3 columns, got 1"}]
+    assert db.query(User).filter_by(email="c1@example.com").one().phone_number is None
+
+def test_import_rejects_other_formats(client: TestClient, db: Session):
+    response = client.post(
+        "/api/v1/users/import", content="{}", headers={**admin_header(db), "Content-Type": "application/json"}
+    )
+    assert response.status_code == 415
+
+def test_import_tenant_scope(client: TestClient, db: Session):
+    body = ndjson({"email": "x@example.com", "password": "pw"})
+    headers = {**admin_header(db), "Content-Type": "application/x-ndjson"}
+    assert client.post("/api/v1/users/import?tenant_id=2", content=body, headers=headers).status_code == 403
+
+    headers = {**admin_header(db, "platform_admin", 0), "Content-Type": "application/x-ndjson"}
+    assert client.post("/api/v1/users/import?tenant_id=2", content=body, headers=headers).json()["created"] == 1
+    assert db.query(User).filter_by(email="x@example.com").one().tenant_id == 2
+
+def test_imported_passwords_verify(client: TestClient, db: Session, monkeypatch):
+    monkeypatch.undo()
+    body = ndjson({"email": "real@example.com", "password": "s3cret"})
+    client.post("/api/v1/users/import", content=body, headers={**admin_header(db), "Content-Type": "application/x-ndjson"})
+    assert verify_password("s3cret", db.query(User).filter_by(email="real@example.com").one().password)
+
+def test_imported_users_are_read_from_primary(client: TestClient, db: Session, monkeypatch):
+    monkeypatch.setattr(database, "replica_engines", [object()])
+    response = client.post(
+        "/api/v1/users/import",
+        content=ndjson({"email": "Fresh@example.com", "password": "pw"}),
+        headers={**admin_header(db, tenant_id=4), "Content-Type": "application/x-ndjson"},
+    )
+    assert response.json()["created"] == 1
+    assert written_recently(("email", "fresh@example.com"))
+    assert written_recently(("tenant", 4))
+    database.recent_writes.clear()
+
+@pytest.fixture
+def small_hash_pool(monkeypatch):
+    pool = PasswordHashPool(max_workers=1, max_pending=2)
+    monkeypatch.setattr(core.user_import, "bulk_hash_pool", pool)
+    yield pool
+    pool.shutdown()
+
+def test_concurrent_imports_wait_for_the_pool(client: TestClient, db: Session, monkeypatch, small_hash_pool):
+    httpx = pytest.importorskip("httpx")
+    from main import app
+
+    monkeypatch.setattr(core.user_import.settings, "BULK_IMPORT_BATCH_SIZE", 3)
+    headers = {**admin_header(db), "Content-Type": "application/x-ndjson"}
+    bodies = [ndjson(*({"email": f"{name}{i}@example.com", "password": "pw"} for i in range(6))) for name in "ab"]
+
+    async def import_both():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as async_client:
+            return await asyncio.gather(*(
+                async_client.post("/api/v1/users/import", content=body, headers=headers) for body in bodies
+            ))
+
+    responses = asyncio.run(import_both())
+    assert [r.status_code for r in responses] == [200, 200]
+    assert [r.json()["created"] for r in responses] == [6, 6]
+    assert small_hash_pool.stats()["rejected"] == 0
+
+def test_full_pool_fails_the_batch_not_the_import(client: TestClient, db: Session, monkeypatch, small_hash_pool):
+    monkeypatch.setattr(core.user_import.settings, "BULK_IMPORT_BATCH_SIZE", 2)
+    monkeypatch.setattr(small_hash_pool, "max_pending", 0)
+    response = client.post(
+        "/api/v1/users/import",
+        content=ndjson(*({"email": f"busy{i}@example.com", "password": "pw"} for i in range(3))),
+        headers={**admin_header(db), "Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["created"] == 0
+    assert [(e["row"], e["error"]) for e in data["errors"]] == [(row, "Server busy, retry this row") for row in (1, 2, 3)]
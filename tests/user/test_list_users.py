@@ -0,0 +1,70 @@
+# tests/user/test_list_users.py
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from core.security import create_access_token
+from crud.user import tenant_users_stmt
+from models.user import User
+
+
+def add_user(db: Session, email: str, tenant_id: int, role: str = "customer", is_active: bool = True) -> User:
+    user = User(email=email, password="x", tenant_id=tenant_id, role=role, is_active=is_active)
+    db.add(user)
+    db.commit()
+    return user
+
+def auth_header(user: User) -> dict:
+    token = create_access_token({"sub": str(user.id), "role": user.role, "tenant_id": user.tenant_id})
+    return {"Authorization": f"Bearer {token}"}
+
+def emails(response) -> list:
+    return [u["email"] for u in response.json()["users"]]
+
+def test_tenant_admin_sees_own_tenant_only(client: TestClient, db: Session):
+    admin = add_user(db, "admin@t1.com", 1, role="tenant_admin")
+    add_user(db, "a@t1.com", 1)
+    add_user(db, "gone@t1.com", 1, is_active=False)
+    add_user(db, "b@t2.com", 2)
+
+    response = client.get("/api/v1/users", headers=auth_header(admin))
+    assert response.status_code == 200
+    assert emails(response) == ["admin@t1.com", "a@t1.com"]
+
+    response = client.get("/api/v1/users?include_inactive=true&role=customer", headers=auth_header(admin))
+    assert emails(response) == ["a@t1.com", "gone@t1.com"]
+
+    response = client.get("/api/v1/users?tenant_id=2", headers=auth_header(admin))
+    assert response.status_code == 403
+
+def test_platform_admin_must_pick_tenant(client: TestClient, db: Session):
+    admin = add_user(db, "root@example.com", 0, role="platform_admin")
+    add_user(db, "b@t2.com", 2)
+
+    assert client.get("/api/v1/users", headers=auth_header(admin)).status_code == 400
+    response = client.get("/api/v1/users?tenant_id=2", headers=auth_header(admin))
+    assert emails(response) == ["b@t2.com"]
+
+def test_customers_cannot_list(client: TestClient, db: Session):
+    customer = add_user(db, "c@t1.com", 1)
+    assert client.get("/api/v1/users", headers=auth_header(customer)).status_code == 403
+
+def test_keyset_pagination(client: TestClient, db: Session):
+    admin = add_user(db, "admin@t1.com", 1, role="tenant_admin")
+    for i in range(3):
+        add_user(db, f"u{i}@t1.com", 1)
+
+    first = client.get("/api/v1/users?limit=2", headers=auth_header(admin)).json()
+    assert [u["email"] for u in first["users"]] == ["admin@t1.com", "u0@t1.com"]
+    second = client.get(f"/api/v1/users?limit=2&after_id={first['next_after_id']}", headers=auth_header(admin)).json()
+    assert [u["email"] for u in second["users"]] == ["u1@t1.com", "u2@t1.com"]
+    third = client.get(f"/api/v1/users?limit=2&after_id={second['next_after_id']}", headers=auth_header(admin)).json()
+    assert third == {"users": [], "next_after_id": None}
+
+def test_tenant_queries_use_tenant_indexes(db: Session):
+    def plan(stmt) -> str:
+        sql = stmt.compile(db.bind, compile_kwargs={"literal_binds": True})
+        return " ".join(row[-1] for row in db.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+
+    assert "ix_users_tenant_id_role" in plan(tenant_users_stmt(1, User.role == "customer"))
+    assert "ix_users_tenant_id_active" in plan(tenant_users_stmt(1, User.is_active.is_(True)).order_by(User.id))